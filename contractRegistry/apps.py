@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class ContractregistryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'contractRegistry'
+
+    def ready(self):
+        from contractRegistry.cache import contract_version_changed
+        from contractRegistry.models import ContractVersion
+        post_save.connect(contract_version_changed, sender=ContractVersion, dispatch_uid='contract_version_artifacts_saved')
+        post_delete.connect(contract_version_changed, sender=ContractVersion, dispatch_uid='contract_version_artifacts_deleted')
@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from .models import ContractVersion
+
+try:
+    import brotli
+except ImportError:  # Opcional: sin el paquete sólo se sirve gzip
+    brotli = None
+
+# Artefactos de una ContractVersion que se sirven por URL (serializados como JSON)
+ARTIFACT_FIELDS = {
+    'abi': 'abi',
+    'bytecode': 'bytecode',
+}
+
+
+@dataclass
+class Artifact:
+    """Cuerpo de un artefacto listo para servir: JSON, su hash y las versiones comprimidas."""
+    digest: str
+    body: bytes
+    gzip_body: bytes
+    brotli_body: bytes | None
+
+
+# Clave del contador de generación en la caché de Django: al editar o borrar una
+# versión en cualquier proceso, el resto descarta sus artefactos en memoria
+GENERATION_KEY = 'contractRegistry:artifacts:generation'
+
+# (versión, artefacto) -> Artifact. Las versiones no cambian en el uso normal, así que
+# cada artefacto se serializa y comprime una sola vez por proceso; sólo se reconstruye
+# tras `invalidate_artifacts` (ver cache.contract_version_changed)
+_artifacts: dict[tuple[int, str], Artifact] = {}
+_generation = None
+
+
+def serialize_artifact(value) -> tuple[bytes, str]:
+    """JSON canónico del artefacto y su hash de contenido (sobre el cuerpo sin comprimir)."""
+    body = json.dumps(value, separators=(',', ':'), sort_keys=True).encode()
+    return body, hashlib.sha256(body).hexdigest()[:16]
+
+
+def build_artifact(body: bytes, digest: str) -> Artifact:
+    return Artifact(
+        digest=digest,
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli_body=brotli.compress(body) if brotli else None,
+    )
+
+
+def sync_generation() -> None:
+    """Descarta los artefactos en memoria si otro proceso los invalidó."""
+    global _generation
+    generation = cache.get(GENERATION_KEY, 0)
+    if generation != _generation:
+        _artifacts.clear()
+        _generation = generation
+
+
+def version_artifact(version: ContractVersion, kind: str) -> Artifact:
+    """Artefacto `kind` ('abi' o 'bytecode') de una versión ya cargada."""
+    sync_generation()
+    key = (version.pk, kind)
+    artifact = _artifacts.get(key)
+    if artifact is None:
+        artifact = _artifacts[key] = build_artifact(*serialize_artifact(getattr(version, ARTIFACT_FIELDS[kind])))
+    return artifact
+
+
+def artifact_for(version_id: int, kind: str, digest: str = None) -> Artifact | None:
+    """
+    Como `version_artifact`, leyendo de la BD sólo el campo necesario. None si la
+    versión o el artefacto no existen, o si no coinciden con el `digest` pedido.
+
+    Una copia en memoria se responde tal cual aunque su hash no coincida (una URL
+    antigua o inventada no provoca lecturas ni compresiones). Al cargar de la BD el
+    hash se calcula antes de comprimir, y sólo se comprime si coincide.
+    """
+    if kind not in ARTIFACT_FIELDS:
+        return None
+    sync_generation()
+    key = (version_id, kind)
+    artifact = _artifacts.get(key)
+    if artifact is not None:
+        return artifact if digest is None or artifact.digest == digest else None
+
+    field = ARTIFACT_FIELDS[kind]
+    value = ContractVersion.objects.filter(pk=version_id).values_list(field, flat=True).first()
+    if value is None:
+        return None
+    body, body_digest = serialize_artifact(value)
+    if digest is not None and body_digest != digest:
+        return None
+    artifact = _artifacts[key] = build_artifact(body, body_digest)
+    return artifact
+
+
+def invalidate_artifacts(version_id: int = None) -> None:
+    """
+    Descarta los artefactos de una versión (o todos) en este proceso y cambia la
+    generación para que el resto de procesos descarte los suyos.
+    """
+    global _generation
+    if version_id is None:
+        _artifacts.clear()
+    else:
+        for kind in ARTIFACT_FIELDS:
+            _artifacts.pop((version_id, kind), None)
+    try:
+        _generation = cache.incr(GENERATION_KEY)
+    except ValueError:
+        # La clave no existía (o expiró): cualquier valor distinto de la copia local sirve
+        _generation = time.time_ns()
+        cache.set(GENERATION_KEY, _generation, None)
+
+
+def artifact_url(version: ContractVersion, kind: str) -> str:
+    """URL del artefacto con su hash de contenido: cambia sólo si cambia el contenido."""
+    return reverse('contractRegistry:artifact', kwargs={
+        'version_id': version.pk, 'kind': kind, 'digest': version_artifact(version, kind).digest,
+    })
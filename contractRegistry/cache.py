@@ -0,0 +1,89 @@
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import cache
+from .artifacts import artifact_url, invalidate_artifacts
+from .models import ContractVersion, DeployedContract
+
+# Clave del contador de generación en la caché de Django: cada proceso compara su
+# copia con este valor y descarta lo que tenga si cambió
+GENERATION_KEY = 'contractRegistry:current_deployments:generation'
+# Vigencia máxima de una entrada (por si la caché de Django es local al proceso y
+# la invalidación ocurrió en otro)
+CURRENT_DEPLOYMENT_TTL = getattr(settings, 'CURRENT_DEPLOYMENT_TTL', 300)
+
+
+@dataclass
+class CurrentDeployment:
+    """Despliegue vigente de un contrato base con su ABI ya preparado para los paneles."""
+    contract: DeployedContract
+    abi: list
+    # Evento -> entrada del ABI
+    events: dict = field(default_factory=dict)
+    # URL del ABI con hash de contenido (los paneles lo descargan en lugar de incrustarlo)
+    abi_url: str = ''
+
+
+# (contrato base, red) -> (instante de carga, CurrentDeployment o None)
+_deployments: dict[tuple[str, int | None], tuple[float, CurrentDeployment | None]] = {}
+_generation = None
+
+
+def current_deployment(base_contract_name: str, network_id: int = None) -> CurrentDeployment | None:
+    """
+    Despliegue marcado como actual del contrato base (en la red indicada o, si no,
+    el actualizado más recientemente), o None si no hay ninguno.
+
+    Se guarda en memoria del proceso: tras la primera carga, las peticiones no
+    consultan la BD para estos datos hasta que `invalidate_current_deployments`
+    cambie la generación o venza CURRENT_DEPLOYMENT_TTL.
+    """
+    global _generation
+    generation = cache.get(GENERATION_KEY, 0)
+    if generation != _generation:
+        _deployments.clear()
+        _generation = generation
+
+    key = (base_contract_name, network_id)
+    entry = _deployments.get(key)
+    if entry is not None and time.monotonic() - entry[0] < CURRENT_DEPLOYMENT_TTL:
+        return entry[1]
+
+    contracts = DeployedContract.objects.filter(base_contract__name=base_contract_name, is_current=True)
+    if network_id is not None:
+        contracts = contracts.filter(network_id=network_id)
+    contract = contracts.select_related('contract_version', 'base_contract', 'network').order_by('-updated_at').first()
+
+    deployment = None
+    if contract is not None:
+        abi = contract.contract_version.abi or []
+        deployment = CurrentDeployment(
+            contract=contract,
+            abi=abi,
+            events={item['name']: item for item in abi if item.get('type') == 'event'},
+            abi_url=artifact_url(contract.contract_version, 'abi'),
+        )
+    _deployments[key] = (time.monotonic(), deployment)
+    return deployment
+
+
+def invalidate_current_deployments() -> None:
+    """Descarta los despliegues en memoria de todos los procesos (al cambiar `is_current`)."""
+    global _generation
+    try:
+        _generation = cache.incr(GENERATION_KEY)
+    except ValueError:
+        # La clave no existía (o expiró): cualquier valor distinto de la copia local sirve
+        _generation = time.time_ns()
+        cache.set(GENERATION_KEY, _generation, None)
+    _deployments.clear()
+
+
+def contract_version_changed(sender, instance: ContractVersion, **kwargs) -> None:
+    """
+    Receptor de post_save/post_delete de ContractVersion (editada desde el admin):
+    sus artefactos cambian de hash, y con ellos el `abi_url` de los despliegues.
+    """
+    invalidate_artifacts(instance.pk)
+    invalidate_current_deployments()
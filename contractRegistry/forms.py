@@ -99,12 +99,14 @@ class DeployForm(forms.Form):
 class NetworkForm(forms.ModelForm):
     class Meta:
         model = Network
-        fields = ['name', 'rpc_url', 'chain_id']
+        fields = ['name', 'rpc_url', 'wss_url', 'chain_id', 'confirmation_depth']
         
         widgets = {
             'name': forms.TextInput(attrs=WIDGET_CLASSES),
             'rpc_url': forms.URLInput(attrs=WIDGET_CLASSES),
+            'wss_url': forms.URLInput(attrs={**WIDGET_CLASSES, 'placeholder': 'wss://...'}),
             'chain_id': forms.NumberInput(attrs=WIDGET_CLASSES),
+            'confirmation_depth': forms.NumberInput(attrs={**WIDGET_CLASSES, 'min': 0}),
         }
         
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:10
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0006_network_wss_url'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='network',
+            name='wss_url',
+            field=models.CharField(blank=True, help_text='Endpoint WebSocket (ws:// o wss://) para las suscripciones de eventos.', max_length=200, null=True, validators=[django.core.validators.URLValidator(schemes=['ws', 'wss'])]),
+        ),
+    ]
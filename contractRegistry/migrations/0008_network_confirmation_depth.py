@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0007_alter_network_wss_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='network',
+            name='confirmation_depth',
+            field=models.PositiveIntegerField(default=0, help_text='Confirmaciones que espera el suscriptor antes de guardar un evento (protege contra reorganizaciones).'),
+        ),
+    ]
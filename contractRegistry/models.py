@@ -1,3 +1,4 @@
+from django.core.validators import URLValidator
 from django.db import models
 from django.db.models import UniqueConstraint, Q
 from system_address_manager.models import AuthorizedAddress as DeployerAddress
@@ -48,12 +49,25 @@ class ContractVersion(models.Model):
 class Network(models.Model):
     """
     Almacena los detalles de conexión de una red blockchain (ej. Sepolia, Mainnet). 
-    Proporciona la URL de RPC y el Chain ID para Web3.py.
+    Proporciona la URL de RPC, la URL WebSocket (usada por el suscriptor de eventos)
+    y el Chain ID para Web3.py.
     """
     name = models.CharField(max_length=100, unique=True)
     rpc_url = models.URLField()
-    wss_url = models.URLField(blank=True, null=True)
+    # URLField sólo admite http(s)/ftp(s); el endpoint de suscripciones es ws:// o wss://
+    wss_url = models.CharField(
+        max_length=200,
+        blank=True,
+        null=True,
+        validators=[URLValidator(schemes=['ws', 'wss'])],
+        help_text="Endpoint WebSocket (ws:// o wss://) para las suscripciones de eventos.",
+    )
     chain_id = models.PositiveIntegerField(unique=True)
+    # Bloques de profundidad que debe alcanzar un log antes de guardarse (0 = inmediato)
+    confirmation_depth = models.PositiveIntegerField(
+        default=0,
+        help_text="Confirmaciones que espera el suscriptor antes de guardar un evento (protege contra reorganizaciones).",
+    )
     
     def __str__(self):
         return f"{self.name} (Chain ID: {self.chain_id})"
@@ -1,3 +1,63 @@
+import gzip
+import json
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+
+from contractRegistry import artifacts
+from contractRegistry.artifacts import artifact_url
+from contractRegistry.models import BaseContract, ContractVersion
+
+
+class ContractArtifactViewTests(TestCase):
+    """Los artefactos se sirven inmutables, comprimidos y sin reconstruirse ante URLs ajenas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        base_contract = BaseContract.objects.create(name='TicketManager')
+        cls.version = ContractVersion.objects.create(
+            base_contract=base_contract, version='1', bytecode='0x6080',
+            abi=[{'type': 'event', 'name': 'Deposit', 'inputs': []}],
+        )
+
+    def setUp(self):
+        # Los ids se reutilizan entre pruebas: no debe quedar un artefacto de otra versión
+        artifacts.invalidate_artifacts()
+
+    def test_serves_immutable_json_with_etag(self):
+        response = self.client.get(artifact_url(self.version, 'abi'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), self.version.abi)
+        self.assertIn('immutable', response['Cache-Control'])
+        revalidated = self.client.get(artifact_url(self.version, 'abi'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_serves_gzip_when_accepted(self):
+        response = self.client.get(artifact_url(self.version, 'bytecode'), HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content)), '0x6080')
+
+    def test_wrong_digest_is_404_without_rebuild(self):
+        url = reverse('contractRegistry:artifact', kwargs={'version_id': self.version.pk, 'kind': 'abi', 'digest': '0' * 16})
+        with mock.patch.object(artifacts, 'build_artifact', wraps=artifacts.build_artifact) as build:
+            # Sin copia en memoria: se lee la BD y se calcula el hash, pero no se comprime
+            self.assertEqual(self.client.get(url).status_code, 404)
+            self.assertEqual(build.call_count, 0)
+
+            self.client.get(artifact_url(self.version, 'abi'))
+            self.assertEqual(build.call_count, 1)
+            # Con copia en memoria: ni BD ni compresión
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url).status_code, 404)
+            self.assertEqual(build.call_count, 1)
+
+    def test_saving_a_version_changes_its_url(self):
+        old_url = artifact_url(self.version, 'abi')
+        self.version.abi = []
+        self.version.save()
 
-# Create your tests here.
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        self.assertEqual(json.loads(self.client.get(artifact_url(self.version, 'abi')).content), [])
@@ -18,6 +18,7 @@ urlpatterns = [
     path('version/<int:version_id>/', views.versionDetail, name='version_detail'),
     path('version/register/<int:contract_id>/', views.registerVersion, name='register_version'),
      path('version/version_args/<int:version_id>/', views.get_version_args, name='get_version_args'),
+    path('artifacts/<int:version_id>/<slug:kind>.<slug:digest>.json', views.contract_artifact, name='artifact'),
     
     # Despliegues
     path('deployed/list/', views.deployedContractList, name='deployed_contract_list'),
@@ -1,13 +1,17 @@
 from django.shortcuts import render, redirect
 from django.http import HttpResponse, JsonResponse, Http404
 from django.shortcuts import get_object_or_404
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
+from django.utils.cache import patch_vary_headers
 from .forms import DeployForm, NetworkForm, BaseContractForm, ContractVersionForm
 from .models import BaseContract, ContractVersion, DeployedContract, Network, DeploymentStatus
 from django.db import IntegrityError, transaction
 import random
 import json
+import re
 from .utils import extract_constructor_inputs_from_abi
+from .cache import invalidate_current_deployments
+from .artifacts import artifact_for, artifact_url
 # Create your views here.
 
 def index(request):
@@ -323,6 +327,7 @@ def deployContractFromVersion(request, version_id):
             deployed_contract.gas_used = gas_used
             deployed_contract.is_current = True
             deployed_contract.save()
+            invalidate_current_deployments()
             
             return redirect('contractRegistry:contract_detail', contract_id=contract_version.base_contract.id)
     else:
@@ -387,8 +392,9 @@ def signAndConfirmDeployment(request, deployed_contract_id):
             
             'network_rpc_url': deployed_contract.network.rpc_url,
             'chain_id': deployed_contract.network.chain_id,
-            'contract_abi': version.abi, 
-            'contract_bytecode': version.bytecode,
+            # ABI y bytecode se descargan aparte, desde URLs cacheables por hash de contenido
+            'abi_url': artifact_url(version, 'abi'),
+            'bytecode_url': artifact_url(version, 'bytecode'),
             'deployer_address': deployed_contract.deployerAddress.address,
             
             'constructor_params_values': final_params_values,
@@ -465,6 +471,9 @@ def final_deployment_step(request, deployed_contract_id):
             deployed_contract.is_current = True 
             
             deployed_contract.save()
+
+            # Los paneles guardan el despliegue actual en memoria: se descarta al confirmar
+            transaction.on_commit(invalidate_current_deployments)
             
         
         return JsonResponse({'status': 'actualizado', 'message': 'Despliegue confirmado y marcado como actual.'})
@@ -482,3 +491,38 @@ def final_deployment_step(request, deployed_contract_id):
     except Exception as e:
         print(f"Error al actualizar el despliegue: {e}")
         return JsonResponse({'error': f'Error interno del servidor: {e}'}, status=500)
+
+
+# Codificaciones aceptadas por el cliente (mismo criterio que GZipMiddleware)
+ACCEPTS_BROTLI = re.compile(r'\bbr\b')
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+
+@require_GET
+def contract_artifact(request, version_id, kind, digest):
+    """
+    Sirve el ABI o el bytecode de una ContractVersion como JSON. La URL lleva el
+    hash del contenido, así que la respuesta nunca cambia: se cachea un año en el
+    navegador y en proxies, con ETag para revalidar, y ya comprimida (brotli o gzip).
+    """
+    artifact = artifact_for(version_id, kind, digest)
+    if artifact is None:
+        raise Http404("Artefacto no encontrado.")
+
+    etag = f'"{artifact.digest}"'
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponse(status=304)
+    elif artifact.brotli_body is not None and ACCEPTS_BROTLI.search(accept_encoding):
+        response = HttpResponse(artifact.brotli_body, content_type='application/json')
+        response['Content-Encoding'] = 'br'
+    elif ACCEPTS_GZIP.search(accept_encoding):
+        response = HttpResponse(artifact.gzip_body, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(artifact.body, content_type='application/json')
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
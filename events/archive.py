@@ -0,0 +1,206 @@
+import gzip
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+
+from events.models import GlobalEventLog
+from events.stream import serialize_event_log
+
+# Tamaño a partir del cual se abre un segmento nuevo en el mismo día
+SEGMENT_MAX_BYTES = getattr(settings, 'EVENT_ARCHIVE_SEGMENT_BYTES', 64 * 2**20)
+# Registros por miembro gzip (la unidad que se indexa y se descomprime al leer)
+MEMBER_RECORDS = getattr(settings, 'EVENT_ARCHIVE_MEMBER_RECORDS', 1000)
+# Segundos máximos que un registro espera en memoria antes de escribirse
+MEMBER_MAX_AGE = getattr(settings, 'EVENT_ARCHIVE_MEMBER_MAX_AGE', 60)
+
+DATA_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.idx'
+
+
+def archive_record(event_log: GlobalEventLog, kind: str = 'event') -> dict:
+    """Mensaje del stream más los campos necesarios para restaurar el log en la BD."""
+    record = serialize_event_log(event_log, kind)
+    record.update({
+        'timestamp': event_log.timestamp.isoformat() if event_log.timestamp else None,
+        'tx_from': event_log.tx_from,
+        'gas_used': event_log.gas_used,
+    })
+    return record
+
+
+class SegmentWriter:
+    """
+    Segmento abierto de una red y un día: `<seq>.jsonl.gz` más su índice `<seq>.idx`.
+
+    El archivo de datos es una concatenación de miembros gzip (un gzip válido en sí
+    mismo) y sólo se agrega al final. Por cada miembro el índice guarda una línea
+    `bloque_min bloque_max offset longitud registros retractaciones`, que permite
+    descomprimir sólo los miembros que cubren un rango de bloques. El índice se
+    escribe después de los datos: si el proceso muere entre ambos, el miembro
+    huérfano simplemente no se indexa.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records: list[dict] = []
+        self.first_buffered_at = None
+        # Bytes ya escritos en el archivo de datos (decide la rotación)
+        self.size = os.path.getsize(path + DATA_SUFFIX) if os.path.exists(path + DATA_SUFFIX) else 0
+
+    def add(self, record: dict) -> None:
+        if not self.records:
+            self.first_buffered_at = time.monotonic()
+        self.records.append(record)
+
+    def due(self) -> bool:
+        return bool(self.records) and (
+            len(self.records) >= MEMBER_RECORDS or time.monotonic() - self.first_buffered_at >= MEMBER_MAX_AGE
+        )
+
+    def flush(self) -> None:
+        if not self.records:
+            return
+        payload = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in self.records).encode()
+        member = gzip.compress(payload)
+        blocks = [record['block_number'] for record in self.records]
+        retractions = sum(1 for record in self.records if record['type'] == 'retraction')
+
+        with open(self.path + DATA_SUFFIX, 'ab') as data:
+            offset = data.tell()
+            data.write(member)
+            self.size = offset + len(member)
+        with open(self.path + INDEX_SUFFIX, 'a') as index:
+            index.write(f"{min(blocks)} {max(blocks)} {offset} {len(member)} {len(self.records)} {retractions}\n")
+        self.records = []
+
+
+class SegmentArchive:
+    """
+    Archivo de eventos en disco, sólo de agregado, en `root/<red>/<AAAA-MM-DD>/`.
+
+    Sink del suscriptor: `write` recibe cada lote ya confirmado en la BD (logs y
+    retractaciones) y lo agrega al segmento abierto de su red y día (por fecha del
+    bloque si el log está enriquecido, si no por fecha de registro). Los segmentos
+    rotan al superar `SEGMENT_MAX_BYTES` o al cambiar el día. Las retractaciones se
+    guardan como registros de tipo `retraction`, que el lector aplica al leer.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        # (red, día) -> segmento abierto
+        self.segments: dict[tuple[int, str], SegmentWriter] = {}
+
+    def segment_for(self, network_id: int, day: str) -> SegmentWriter:
+        key = (network_id, day)
+        segment = self.segments.get(key)
+        if segment is not None and segment.size < SEGMENT_MAX_BYTES:
+            return segment
+        if segment is not None:
+            segment.flush()
+
+        # Un día anterior de la misma red ya no recibe más logs (salvo retractaciones tardías)
+        for other_key in [k for k in self.segments if k[0] == network_id and k[1] != day]:
+            self.segments.pop(other_key).flush()
+
+        directory = os.path.join(self.root, str(network_id), day)
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(
+            int(name.removesuffix(DATA_SUFFIX)) for name in os.listdir(directory) if name.endswith(DATA_SUFFIX)
+        )
+        sequence = existing[-1] if existing else 1
+        if segment is not None or (existing and os.path.getsize(os.path.join(directory, f"{sequence:06d}{DATA_SUFFIX}")) >= SEGMENT_MAX_BYTES):
+            sequence += 1
+        segment = self.segments[key] = SegmentWriter(os.path.join(directory, f"{sequence:06d}"))
+        return segment
+
+    def write(self, event_logs: list[GlobalEventLog], retractions: list[GlobalEventLog] = ()) -> None:
+        today = datetime.now(dt_timezone.utc).strftime('%Y-%m-%d')
+        touched = set()
+        for kind, items in (('event', event_logs), ('retraction', retractions)):
+            for event_log in items:
+                moment = event_log.block_timestamp or event_log.timestamp
+                day = moment.strftime('%Y-%m-%d') if moment else today
+                segment = self.segment_for(event_log.network_id, day)
+                segment.add(archive_record(event_log, kind))
+                touched.add(segment)
+        for segment in touched:
+            if segment.due():
+                segment.flush()
+
+    def close(self) -> None:
+        """Escribe lo que quede en memoria (al cerrar el suscriptor)."""
+        for segment in self.segments.values():
+            segment.flush()
+        self.segments.clear()
+
+
+# --- Lectura ---
+
+class ArchiveReader:
+    """
+    Lee un rango de bloques de una red directamente de los segmentos, sin tocar la BD.
+
+    Sólo se descomprimen los miembros cuyo rango de bloques (según el índice) se
+    cruza con el pedido. Los logs retractados dentro del rango no se devuelven.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def segments(self, network_id: int) -> list[str]:
+        """Rutas (sin sufijo) de los segmentos de la red, en orden de día y secuencia."""
+        network_dir = os.path.join(self.root, str(network_id))
+        if not os.path.isdir(network_dir):
+            return []
+        paths = []
+        for day in sorted(os.listdir(network_dir)):
+            day_dir = os.path.join(network_dir, day)
+            for name in sorted(os.listdir(day_dir)):
+                if name.endswith(INDEX_SUFFIX):
+                    paths.append(os.path.join(day_dir, name.removesuffix(INDEX_SUFFIX)))
+        return paths
+
+    def members(self, network_id: int, from_block: int, to_block: int):
+        """(ruta, offset, longitud, retractaciones) de cada miembro que cubre el rango."""
+        for path in self.segments(network_id):
+            with open(path + INDEX_SUFFIX) as index:
+                for line in index:
+                    fields = line.split()
+                    if len(fields) != 6:
+                        continue
+                    low, high, offset, length, _, retractions = map(int, fields)
+                    if high >= from_block and low <= to_block:
+                        yield path, offset, length, retractions
+
+    def read_member(self, path: str, offset: int, length: int):
+        with open(path + DATA_SUFFIX, 'rb') as data:
+            data.seek(offset)
+            payload = zlib.decompress(data.read(length), wbits=31)
+        for line in payload.splitlines():
+            yield json.loads(line)
+
+    def read_range(self, network_id: int, from_block: int, to_block: int, include_retracted: bool = False):
+        """Genera los registros de logs de la red en [from_block, to_block], en orden de escritura."""
+        members = list(self.members(network_id, from_block, to_block))
+        # Clave del log -> posición (miembro, línea) de su última retractación: un log
+        # se descarta sólo si fue retractado después de escribirse
+        retracted = {}
+        if not include_retracted:
+            for position, (path, offset, length, retractions) in enumerate(members):
+                if not retractions:
+                    continue
+                for line, record in enumerate(self.read_member(path, offset, length)):
+                    if record['type'] == 'retraction':
+                        retracted[(record['transaction_hash'], record['log_index'])] = (position, line)
+
+        for position, (path, offset, length, _) in enumerate(members):
+            for line, record in enumerate(self.read_member(path, offset, length)):
+                if record['type'] != 'event' or not from_block <= record['block_number'] <= to_block:
+                    continue
+                if retracted.get((record['transaction_hash'], record['log_index']), (-1, -1)) > (position, line):
+                    continue
+                yield record
@@ -0,0 +1,141 @@
+import asyncio
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import MismatchedABI
+
+from events.decoders import EventSpec, decoder_registry
+from events.models import EventSubscription
+from events.pipeline import CursorCheckpoint, EventLogWriter, build_event_log
+from events.rpc import JsonRpcError
+
+# Fragmentos con los que los distintos proveedores indican que el rango de
+# eth_getLogs devolvería demasiados resultados (Geth, Infura, Alchemy, QuickNode...).
+RANGE_ERROR_HINTS = (
+    'too many',
+    'limit exceeded',
+    'exceeds',
+    'query returned more than',
+    'block range',
+    'response size',
+    'range is too large',
+)
+
+
+def is_range_error(error: Exception) -> bool:
+    """Indica si el error del nodo se resuelve pidiendo un rango de bloques menor."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    message = str(error).lower()
+    return any(hint in message for hint in RANGE_ERROR_HINTS)
+
+
+class LogBackfiller:
+    """
+    Motor de recuperación histórica de logs vía eth_getLogs para una red.
+
+    Cada suscripción se recorre en `segments` tramos contiguos que avanzan en
+    paralelo; `concurrency` limita las peticiones simultáneas al nodo de esa red.
+    El tamaño del rango se adapta en cada tramo: se divide a la mitad cuando el nodo
+    responde que hay demasiados resultados y se duplica cuando la respuesta trae
+    menos de `small_result` logs. Los logs se escriben a través del mismo
+    EventLogWriter que usa el suscriptor en vivo.
+
+    `client` puede ser un JsonRpcClient (HTTP) o un Web3LogsClient (conexión AsyncWeb3
+    ya abierta); basta con que exponga `get_logs`.
+    """
+
+    def __init__(self, client, writer: EventLogWriter, initial_range: int = 2000, min_range: int = 1,
+                 max_range: int = 100000, small_result: int = 1000, concurrency: int = 4, segments: int | None = None,
+                 on_range=None, on_decode_error=None):
+        self.client = client
+        self.writer = writer
+        self.initial_range = initial_range
+        self.min_range = min_range
+        self.max_range = max_range
+        self.small_result = small_result
+        self.segments = segments or concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Callbacks opcionales: on_range(suscripción, desde, hasta, cantidad_de_logs)
+        # y on_decode_error(suscripción, log, excepción)
+        self.on_range = on_range
+        self.on_decode_error = on_decode_error
+
+    async def backfill(self, subscriptions: list[EventSubscription], from_block: int, to_block: int) -> None:
+        """Recupera los logs de todas las suscripciones de la red en [from_block, to_block]."""
+        tasks = []
+        for sub in subscriptions:
+            address = Web3.to_checksum_address(sub.deployed_contract.address)
+            try:
+                event = decoder_registry.get(sub.deployed_contract.contract_version).get_event(sub.event_name)
+            except KeyError as e:
+                # El evento no está en el ABI de la versión: no hay nada que recuperar
+                if self.on_decode_error:
+                    self.on_decode_error(sub, None, e)
+                continue
+
+            for start, end in split_range(from_block, to_block, self.segments):
+                tasks.append(self.scan_range(sub, address, event, start, end))
+
+        await asyncio.gather(*tasks)
+
+    async def backfill_to_cursor(self, network_id: int, subscriptions: list[EventSubscription], from_block: int, to_block: int) -> None:
+        """
+        Como `backfill`, moviendo el cursor de la red una sola vez al final. Los tramos
+        avanzan en paralelo, así que avanzarlo con cada lote saltaría los tramos
+        inferiores aún pendientes si el proceso se corta: la red queda retenida y la
+        marca que la libera hasta `to_block` se encola cuando todo el rango ya está en
+        la cola. Si algún tramo falla (o se pierde un lote), el cursor no se mueve.
+        """
+        generation = self.writer.hold(network_id)
+        await self.backfill(subscriptions, from_block, to_block)
+        await self.writer.put(CursorCheckpoint(network_id, to_block, generation, release=True))
+
+    async def scan_range(self, sub: EventSubscription, address: str, event: EventSpec, start: int, end: int) -> None:
+        """Recorre [start, end] con un tamaño de rango adaptativo."""
+        step = self.initial_range
+        cursor = start
+        event_topic = HexBytes(event.topic).to_0x_hex()
+
+        while cursor <= end:
+            upper = min(cursor + step - 1, end)
+            try:
+                async with self.semaphore:
+                    logs = await self.client.get_logs(address, [event_topic], cursor, upper)
+            except (JsonRpcError, asyncio.TimeoutError) as e:
+                if is_range_error(e) and step > self.min_range:
+                    step = max(self.min_range, step // 2)
+                    continue
+                raise
+
+            for log_receipt in logs:
+                try:
+                    decoded_event = event.decode_log(log_receipt)
+                except (MismatchedABI, ValueError) as e:
+                    if self.on_decode_error:
+                        self.on_decode_error(sub, log_receipt, e)
+                    continue
+                await self.writer.put(build_event_log(sub, decoded_event, log_receipt))
+
+            if self.on_range:
+                self.on_range(sub, cursor, upper, len(logs))
+
+            cursor = upper + 1
+            if len(logs) < self.small_result:
+                step = min(self.max_range, step * 2)
+
+
+def split_range(from_block: int, to_block: int, parts: int) -> list[tuple[int, int]]:
+    """Divide [from_block, to_block] en como mucho `parts` tramos contiguos."""
+    total = to_block - from_block + 1
+    if total <= 0:
+        return []
+    parts = max(1, min(parts, total))
+    size, extra = divmod(total, parts)
+    ranges = []
+    start = from_block
+    for i in range(parts):
+        end = start + size - 1 + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
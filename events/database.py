@@ -0,0 +1,38 @@
+from types import MethodType
+
+from django.conf import settings
+
+# PRAGMAs que se aplican a cada conexión SQLite nueva (ver EventsConfig.ready):
+# - WAL: los lectores (paneles) no bloquean al escritor (suscriptor) ni al revés.
+# - synchronous=NORMAL: en WAL sólo se sincroniza al hacer checkpoint; un corte de
+#   luz puede perder las últimas transacciones, pero no corrompe la base.
+# - busy_timeout: milisegundos de espera ante otro escritor antes de fallar.
+SQLITE_PRAGMAS = getattr(settings, 'SQLITE_PRAGMAS', {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': settings.DATABASES['default'].get('OPTIONS', {}).get('timeout', 20) * 1000,
+    'temp_store': 'MEMORY',
+    # Negativo: tamaño en KiB (64 MiB por conexión)
+    'cache_size': -65536,
+})
+# Modo de las transacciones de `atomic` en SQLite. Con el BEGIN diferido de Django 4.2
+# una transacción que lee y después escribe falla al instante con "database is
+# locked" si otro proceso escribió entre medio (busy_timeout no aplica); IMMEDIATE
+# toma el bloqueo de escritura al empezar y espera su turno. Equivale a la opción
+# "transaction_mode" de Django 5.1.
+SQLITE_TRANSACTION_MODE = getattr(settings, 'SQLITE_TRANSACTION_MODE', 'IMMEDIATE')
+
+
+def begin_transaction(self) -> None:
+    self.cursor().execute(f"BEGIN {SQLITE_TRANSACTION_MODE}")
+
+
+def configure_sqlite_connection(sender, connection, **kwargs) -> None:
+    """Receptor de `connection_created`: aplica SQLITE_PRAGMAS y SQLITE_TRANSACTION_MODE a las conexiones SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    if SQLITE_TRANSACTION_MODE:
+        connection._start_transaction_under_autocommit = MethodType(begin_transaction, connection)
@@ -0,0 +1,152 @@
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
+from eth_utils import collapse_if_tuple, event_abi_to_log_topic, to_checksum_address
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.events import get_event_data
+
+from contractRegistry.models import ContractVersion
+
+# Tipos cuyo valor indexado no viaja en el topic sino su keccak (no se pueden decodificar)
+DYNAMIC_TYPES = ('string', 'bytes')
+
+# Instancia sin proveedor: sólo se usa como códec para el camino genérico de web3
+offline_w3 = Web3()
+
+
+def is_hashed_topic(type_str: str) -> bool:
+    return type_str in DYNAMIC_TYPES or type_str.endswith(']') or type_str.startswith('(')
+
+
+class EventSpec:
+    """
+    Un evento del ABI con todo lo necesario para decodificarlo precalculado: topic0,
+    nombres y tipos de los argumentos indexados y no indexados, y los decodificadores
+    de eth_abi ya resueltos. Decodificar un log es entonces leer el stream de `data`
+    con un TupleDecoder fijo y los topics con decodificadores fijos.
+    """
+
+    def __init__(self, event_abi: dict):
+        self.abi = event_abi
+        self.name = event_abi['name']
+        self.topic = event_abi_to_log_topic(event_abi)
+
+        inputs = event_abi.get('inputs', [])
+        indexed = [item for item in inputs if item.get('indexed')]
+        non_indexed = [item for item in inputs if not item.get('indexed')]
+
+        self.indexed_names = [item['name'] for item in indexed]
+        self.indexed_types = [collapse_if_tuple(item) for item in indexed]
+        self.data_names = [item['name'] for item in non_indexed]
+        self.data_types = [collapse_if_tuple(item) for item in non_indexed]
+
+        # Los structs los devuelve web3 como diccionarios con nombre: se delegan a web3
+        # para no duplicar esa normalización. El resto usa el camino precompilado.
+        self.fast = not any('(' in type_str for type_str in self.indexed_types + self.data_types)
+
+        self.topic_decoders = [
+            None if is_hashed_topic(type_str) else registry.get_decoder(type_str)
+            for type_str in self.indexed_types
+        ]
+        self.data_decoder = TupleDecoder(decoders=[registry.get_decoder(type_str) for type_str in self.data_types])
+
+    def decode_log(self, log_receipt) -> dict:
+        """Decodifica un log con el mismo resultado (args, event, address...) que `process_log` de web3."""
+        if not self.fast:
+            return get_event_data(offline_w3.codec, self.abi, log_receipt)
+
+        topics = log_receipt['topics'][1:]
+        if len(topics) != len(self.topic_decoders):
+            raise ValueError(f"Se esperaban {len(self.topic_decoders)} topics indexados y llegaron {len(topics)}.")
+
+        args = {}
+        for name, type_str, decoder, topic in zip(self.indexed_names, self.indexed_types, self.topic_decoders, topics):
+            if decoder is None:
+                args[name] = HexBytes(topic)
+            else:
+                args[name] = normalize_value(type_str, decoder(ContextFramesBytesIO(HexBytes(topic))))
+
+        values = self.data_decoder(ContextFramesBytesIO(HexBytes(log_receipt['data'])))
+        for name, type_str, value in zip(self.data_names, self.data_types, values):
+            args[name] = normalize_value(type_str, value)
+
+        return {
+            'args': args,
+            'event': self.name,
+            'logIndex': log_receipt['logIndex'],
+            'transactionIndex': log_receipt['transactionIndex'],
+            'transactionHash': log_receipt['transactionHash'],
+            'address': log_receipt['address'],
+            'blockHash': log_receipt['blockHash'],
+            'blockNumber': log_receipt['blockNumber'],
+        }
+
+
+def normalize_value(type_str: str, value):
+    """Aplica a las direcciones el mismo formato checksum que devuelve web3."""
+    if type_str == 'address':
+        return to_checksum_address(value)
+    if type_str.startswith('address['):
+        return [to_checksum_address(item) for item in value]
+    return value
+
+
+class EventDecoder:
+    """Decodificadores de todos los eventos (no anónimos) de un ABI, indexados por topic0 y por nombre."""
+
+    def __init__(self, abi: list):
+        self.by_topic: dict[bytes, EventSpec] = {}
+        self.by_name: dict[str, EventSpec] = {}
+        for item in abi:
+            if item.get('type') != 'event' or item.get('anonymous'):
+                continue
+            spec = EventSpec(item)
+            self.by_topic[spec.topic] = spec
+            # Con eventos sobrecargados el nombre queda con la primera firma, igual que web3
+            self.by_name.setdefault(spec.name, spec)
+
+    def get_event(self, event_name: str) -> EventSpec:
+        """Devuelve el EventSpec del evento o lanza KeyError si no está en el ABI."""
+        return self.by_name[event_name]
+
+    def decode_log(self, log_receipt) -> dict | None:
+        spec = self.by_topic.get(bytes(log_receipt['topics'][0])) if log_receipt['topics'] else None
+        return spec.decode_log(log_receipt) if spec else None
+
+
+class DecoderRegistry:
+    """
+    Caché LRU de EventDecoder por ContractVersion. El ABI de una versión es inmutable,
+    así que cada decodificador se construye una sola vez; `max_versions` acota cuántas
+    versiones se mantienen en memoria.
+    """
+
+    def __init__(self, max_versions: int = 64):
+        self.max_versions = max_versions
+        self._decoders: OrderedDict[int, EventDecoder] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, contract_version: ContractVersion) -> EventDecoder:
+        with self._lock:
+            decoder = self._decoders.get(contract_version.pk)
+            if decoder is not None:
+                self._decoders.move_to_end(contract_version.pk)
+                return decoder
+
+        decoder = EventDecoder(contract_version.abi)
+        with self._lock:
+            self._decoders[contract_version.pk] = decoder
+            while len(self._decoders) > self.max_versions:
+                self._decoders.popitem(last=False)
+        return decoder
+
+    def clear(self):
+        with self._lock:
+            self._decoders.clear()
+
+
+decoder_registry = DecoderRegistry(getattr(settings, 'EVENT_DECODER_CACHE_SIZE', 64))
@@ -0,0 +1,63 @@
+from hexbytes import HexBytes
+from web3 import Web3
+
+from events.decoders import decoder_registry
+from events.models import EventSubscription
+
+
+class DispatchTable:
+    """
+    Tabla de despacho de un nodo: (dirección, topic0) -> (EventSubscription, EventSpec).
+
+    Permite abrir UNA sola suscripción `logs` por conexión, filtrada por la unión de
+    direcciones y topics de todas las suscripciones del nodo, y enrutar cada log
+    entrante a su decodificador con una búsqueda en un diccionario. Las combinaciones
+    cruzadas que deja pasar la unión (dirección de un contrato con el topic de otro)
+    simplemente no están en la tabla y se ignoran.
+    """
+
+    def __init__(self, subscriptions: list[EventSubscription], on_invalid=None):
+        self.routes = {}
+        self.subscriptions = []
+
+        for sub in subscriptions:
+            deployed_contract = sub.deployed_contract
+            # Decodificador precompilado y compartido por todas las suscripciones de la versión
+            decoder = decoder_registry.get(deployed_contract.contract_version)
+            try:
+                event = decoder.get_event(sub.event_name)
+            except KeyError as e:
+                # Callback opcional para informar suscripciones cuyo evento no está en el ABI
+                if on_invalid:
+                    on_invalid(sub, e)
+                continue
+
+            key = (deployed_contract.address.lower(), event.topic)
+            self.routes[key] = (sub, event)
+            self.subscriptions.append(sub)
+
+    def __len__(self):
+        return len(self.routes)
+
+    @property
+    def addresses(self) -> list[str]:
+        return sorted({Web3.to_checksum_address(address) for address, _ in self.routes})
+
+    @property
+    def topics(self) -> list[str]:
+        return sorted({HexBytes(topic).to_0x_hex() for _, topic in self.routes})
+
+    def route_map(self) -> dict:
+        """(dirección, topic0) -> id de la suscripción: lo que decide a dónde va cada log."""
+        return {key: sub.pk for key, (sub, _) in self.routes.items()}
+
+    def logs_filter_topics(self) -> list:
+        """Filtro de topics para eth_subscribe: topic0 debe ser cualquiera de los de la tabla."""
+        return [self.topics]
+
+    def resolve(self, log_receipt):
+        """Devuelve (EventSubscription, EventSpec) para el log, o None si no corresponde a ninguna."""
+        if not log_receipt['topics']:
+            return None
+        key = (log_receipt['address'].lower(), bytes(log_receipt['topics'][0]))
+        return self.routes.get(key)
@@ -0,0 +1,107 @@
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timezone as dt_timezone
+
+from events.models import GlobalEventLog
+from events.rpc import JsonRpcClient, JsonRpcError
+
+
+class LogEnricher:
+    """
+    Etapa opcional de enriquecimiento de los lotes del escritor.
+
+    Para cada lote reúne, por red, los números de bloque y los hashes de transacción
+    distintos que no están en caché y los pide al nodo HTTP de la red
+    (`Network.rpc_url`) en un solo lote JSON-RPC: eth_getBlockByNumber para la marca
+    de tiempo del bloque y eth_getTransactionReceipt para el emisor y el gas usado.
+    Las respuestas se guardan en una caché LRU compartida por todas las redes, ya
+    que muchos logs comparten bloque (y a veces transacción).
+
+    Es de mejor esfuerzo: si el nodo falla, los logs se guardan igual con esos
+    campos vacíos y se informa por `on_error(red, excepción)`.
+    """
+
+    def __init__(self, cache_size: int = 10000, max_batch: int = 100, timeout: float = 10, on_error=None):
+        self.cache_size = cache_size
+        # Llamadas por petición HTTP: los proveedores limitan el tamaño de los lotes
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.on_error = on_error
+        # ('block', red, número) -> datetime | ('tx', red, hash) -> (from, gas usado)
+        self._cache: OrderedDict[tuple, object] = OrderedDict()
+        self._clients: dict[str, JsonRpcClient] = {}
+
+    def _cached(self, key: tuple):
+        value = self._cache.get(key)
+        if value is not None:
+            self._cache.move_to_end(key)
+        return value
+
+    def _store(self, key: tuple, value) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _client(self, rpc_url: str) -> JsonRpcClient:
+        client = self._clients.get(rpc_url)
+        if client is None:
+            client = self._clients[rpc_url] = await JsonRpcClient(rpc_url, timeout=self.timeout).__aenter__()
+        return client
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.__aexit__(None, None, None)
+        self._clients.clear()
+
+    async def enrich(self, event_logs: list[GlobalEventLog]) -> None:
+        """Completa block_timestamp, tx_from y gas_used de los logs (en el lugar)."""
+        by_network: dict[int, list[GlobalEventLog]] = {}
+        for event_log in event_logs:
+            by_network.setdefault(event_log.network_id, []).append(event_log)
+        await asyncio.gather(*(self.enrich_network(logs) for logs in by_network.values()))
+
+    async def enrich_network(self, event_logs: list[GlobalEventLog]) -> None:
+        network = event_logs[0].deployed_contract.network
+        missing_blocks = sorted({
+            event_log.block_number for event_log in event_logs
+            if self._cached(('block', network.pk, event_log.block_number)) is None
+        })
+        missing_txs = sorted({
+            event_log.transaction_hash for event_log in event_logs
+            if self._cached(('tx', network.pk, event_log.transaction_hash)) is None
+        })
+
+        if missing_blocks or missing_txs:
+            calls = [('eth_getBlockByNumber', [hex(number), False]) for number in missing_blocks]
+            # Según la versión de hexbytes, el hash guardado puede venir sin el prefijo 0x
+            calls += [('eth_getTransactionReceipt', ['0x' + tx_hash.removeprefix('0x')]) for tx_hash in missing_txs]
+            keys = [('block', network.pk, number) for number in missing_blocks]
+            keys += [('tx', network.pk, tx_hash) for tx_hash in missing_txs]
+            try:
+                client = await self._client(network.rpc_url)
+                chunks = [calls[i:i + self.max_batch] for i in range(0, len(calls), self.max_batch)]
+                responses = [result for chunk in await asyncio.gather(*(client.batch(c) for c in chunks)) for result in chunk]
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(network, e)
+                responses = [None] * len(calls)
+
+            for key, result in zip(keys, responses):
+                if not result or isinstance(result, JsonRpcError):
+                    continue
+                try:
+                    if key[0] == 'block':
+                        self._store(key, datetime.fromtimestamp(int(result['timestamp'], 16), tz=dt_timezone.utc))
+                    else:
+                        self._store(key, (result['from'], int(result['gasUsed'], 16)))
+                except (KeyError, TypeError, ValueError) as e:
+                    if self.on_error:
+                        self.on_error(network, e)
+
+        for event_log in event_logs:
+            event_log.block_timestamp = self._cached(('block', network.pk, event_log.block_number))
+            receipt = self._cached(('tx', network.pk, event_log.transaction_hash))
+            if receipt is not None:
+                event_log.tx_from, event_log.gas_used = receipt
+
@@ -0,0 +1,110 @@
+import csv
+import json
+import zlib
+
+from django.conf import settings
+
+from events.models import GlobalEventLog
+from events.pagination import keyset_after
+
+# Filas leídas por consulta al exportar
+EXPORT_CHUNK_SIZE = getattr(settings, 'EVENT_EXPORT_CHUNK_SIZE', 2000)
+# Bytes de texto que se acumulan antes de entregar (o comprimir) un bloque
+EXPORT_BLOCK_BYTES = 64 * 1024
+
+EXPORT_FIELDS = [
+    'network_id', 'deployed_contract_id', 'event_name', 'transaction_hash', 'log_index',
+    'block_number', 'block_timestamp', 'timestamp', 'tx_from', 'gas_used', 'event_data',
+]
+KEYSET_FIELDS = ('block_number', 'log_index', 'id')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def export_rows(deployed_contract_id: int = None, event_name: str = None,
+                from_block: int = None, to_block: int = None, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Genera las filas (tuplas de EXPORT_FIELDS) de los logs que cumplen los filtros,
+    en orden de bloque e índice.
+
+    Se lee por tramos de `chunk_size` filas con una consulta por tramo que sigue
+    desde la clave de la última fila (keyset): la memoria no depende del total y
+    no queda una lectura abierta durante toda la exportación (en SQLite impediría
+    los checkpoints del WAL; en PostgreSQL detrás de PgBouncer no hay cursores del
+    lado del servidor).
+    """
+    queryset = GlobalEventLog.objects.all()
+    if deployed_contract_id is not None:
+        queryset = queryset.filter(deployed_contract_id=deployed_contract_id)
+    if event_name:
+        queryset = queryset.filter(event_name=event_name)
+    if from_block is not None:
+        queryset = queryset.filter(block_number__gte=from_block)
+    if to_block is not None:
+        queryset = queryset.filter(block_number__lte=to_block)
+    queryset = queryset.order_by(*KEYSET_FIELDS).values_list(*KEYSET_FIELDS, *EXPORT_FIELDS)
+
+    position = None
+    while True:
+        chunk = queryset.filter(keyset_after(KEYSET_FIELDS, position)) if position else queryset
+        rows = list(chunk[:chunk_size])
+        for row in rows:
+            yield row[len(KEYSET_FIELDS):]
+        if len(rows) < chunk_size:
+            return
+        position = list(rows[-1][:len(KEYSET_FIELDS)])
+
+
+class Echo:
+    """Pseudo-archivo para csv.writer: devuelve la línea en lugar de escribirla."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return json.dumps(value, separators=(',', ':'))
+    return value
+
+
+def export_lines(rows, fmt: str = 'csv'):
+    """Líneas de texto del formato pedido ('csv' con cabecera, o 'ndjson')."""
+    if fmt == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield writer.writerow([format_value(value) for value in row])
+    else:
+        for row in rows:
+            record = dict(zip(EXPORT_FIELDS, row))
+            for name in ('block_timestamp', 'timestamp'):
+                record[name] = record[name].isoformat() if record[name] else None
+            yield json.dumps(record, separators=(',', ':')) + '\n'
+
+
+def export_blocks(lines, compress: bool = False):
+    """Agrupa las líneas en bloques de bytes y, si se pide, los comprime en gzip al vuelo."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_BLOCK_BYTES:
+            data = ''.join(buffer).encode()
+            buffer, size = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+    data = ''.join(buffer).encode()
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
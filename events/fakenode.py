@@ -0,0 +1,357 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import OrderedDict, deque
+
+from aiohttp import WSMsgType, web
+from eth_abi import encode
+from eth_utils import collapse_if_tuple, event_abi_to_log_topic, keccak
+from web3 import Web3
+
+from events.decoders import is_hashed_topic
+
+# ABI sintético con los tipos que emiten los contratos del proyecto
+SYNTHETIC_ABI = [
+    {"type": "event", "name": "PurchasedTicket", "anonymous": False, "inputs": [
+        {"type": "address", "name": "buyer", "indexed": True},
+        {"type": "uint256", "name": "value", "indexed": False},
+        {"type": "uint256", "name": "ticketId", "indexed": False},
+    ]},
+    {"type": "event", "name": "Deposit", "anonymous": False, "inputs": [
+        {"type": "address", "name": "user", "indexed": True},
+        {"type": "address", "name": "pool", "indexed": True},
+        {"type": "uint256", "name": "amount", "indexed": False},
+        {"type": "bytes32", "name": "ref", "indexed": False},
+    ]},
+    {"type": "event", "name": "PoolUpdated", "anonymous": False, "inputs": [
+        {"type": "string", "name": "label", "indexed": True},
+        {"type": "bool", "name": "active", "indexed": False},
+        {"type": "string", "name": "description", "indexed": False},
+        {"type": "address[]", "name": "members", "indexed": False},
+    ]},
+]
+
+
+# --- Generación de logs ---
+
+def synthetic_events(abi: list) -> list[dict]:
+    """Eventos del ABI para los que se pueden generar logs sintéticos (no anónimos y sin structs)."""
+    return [
+        item for item in abi
+        if item.get('type') == 'event' and not item.get('anonymous')
+        and not any('(' in collapse_if_tuple(i) for i in item.get('inputs', []))
+    ]
+
+
+def synthetic_value(type_str: str, rng: random.Random):
+    """Valor aleatorio válido para un tipo ABI (sin structs)."""
+    if type_str.endswith(']'):
+        item_type = type_str[:type_str.rindex('[')]
+        size = type_str[type_str.rindex('[') + 1:-1]
+        return [synthetic_value(item_type, rng) for _ in range(int(size) if size else rng.randint(0, 3))]
+    if type_str == 'address':
+        return Web3.to_checksum_address('0x' + rng.randbytes(20).hex())
+    if type_str == 'bool':
+        return rng.random() < 0.5
+    if type_str == 'string':
+        return f"item-{rng.randint(0, 10**6)}"
+    if type_str == 'bytes':
+        return rng.randbytes(rng.randint(0, 64))
+    if type_str.startswith('bytes'):
+        return rng.randbytes(int(type_str[5:]))
+    if type_str.startswith('uint'):
+        return rng.getrandbits(int(type_str[4:] or 256))
+    if type_str.startswith('int'):
+        bits = int(type_str[3:] or 256)
+        return rng.getrandbits(bits - 1) * rng.choice((1, -1))
+    raise ValueError(f"Tipo ABI no soportado para logs sintéticos: {type_str}")
+
+
+def synthetic_log(address: str, event_abi: dict, rng: random.Random) -> dict:
+    """Log JSON-RPC crudo (sin datos de bloque) con argumentos aleatorios para el evento."""
+    topics = ['0x' + event_abi_to_log_topic(event_abi).hex()]
+    data_types, data_values = [], []
+    for item in event_abi.get('inputs', []):
+        type_str = collapse_if_tuple(item)
+        value = synthetic_value(type_str, rng)
+        if item.get('indexed'):
+            encoded = encode([type_str], [value])
+            topics.append('0x' + (keccak(encoded) if is_hashed_topic(type_str) else encoded).hex())
+        else:
+            data_types.append(type_str)
+            data_values.append(value)
+    return {'address': address, 'topics': topics, 'data': '0x' + encode(data_types, data_values).hex()}
+
+
+class SyntheticLogSource:
+    """Genera logs aleatorios, en rueda, para una lista de (dirección, ABI del evento)."""
+
+    def __init__(self, sources: list[tuple[str, dict]], seed: int = 1):
+        if not sources:
+            raise ValueError("No hay eventos para generar logs sintéticos.")
+        self.sources = itertools.cycle(sources)
+        self.rng = random.Random(seed)
+
+    def next_log(self) -> dict:
+        address, event_abi = next(self.sources)
+        return synthetic_log(address, event_abi, self.rng)
+
+
+class ReplayLogSource:
+    """
+    Reproduce, en rueda, logs grabados en un archivo JSONL (un log de eth_getLogs por
+    línea). Sólo se conservan dirección, topics y data: el nodo vuelve a asignar
+    bloque, transacción e índice al emitirlos.
+    """
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            logs = [json.loads(line) for line in f if line.strip()]
+        if not logs:
+            raise ValueError(f"El archivo {path} no contiene logs.")
+        self.logs = itertools.cycle([
+            {'address': log['address'], 'topics': log['topics'], 'data': log['data']} for log in logs
+        ])
+
+    def next_log(self) -> dict:
+        return dict(next(self.logs))
+
+
+def emit_time_from_tx_hash(transaction_hash: str) -> int:
+    """Instante de emisión (ns desde epoch) que el nodo falso codifica en los 8 primeros bytes del hash."""
+    return int(transaction_hash.removeprefix('0x')[:16], 16)
+
+
+# --- Nodo falso ---
+
+class FakeNode:
+    """
+    Nodo Ethereum mínimo para pruebas de carga del suscriptor.
+
+    Habla JSON-RPC por WebSocket y por HTTP POST en la misma ruta: eth_subscribe
+    (`logs` con filtro de dirección/topics y `newHeads`), eth_unsubscribe,
+    eth_getLogs sobre un historial acotado, eth_blockNumber, eth_chainId,
+    eth_getBlockByNumber y eth_getTransactionReceipt. Emite `rate` logs por segundo tomados de `source` y cierra
+    un bloque cada `block_time` segundos.
+
+    Cada hash de transacción lleva en sus primeros 8 bytes el instante de emisión
+    (ver `emit_time_from_tx_hash`), de modo que quien los recibe puede medir la
+    latencia extremo a extremo sin compartir estado con el nodo.
+    """
+
+    def __init__(self, source, rate: float = 100, block_time: float = 1.0, chain_id: int = 31337,
+                 start_block: int = 1, history_size: int = 100000):
+        self.source = source
+        self.rate = rate
+        self.block_time = block_time
+        self.chain_id = chain_id
+        self.head = start_block
+        self.history = deque(maxlen=history_size)
+        # hash de transacción -> log, con el mismo límite que el historial
+        self.transactions: OrderedDict[str, dict] = OrderedDict()
+        self.history_size = history_size
+        self.start_block = start_block
+        self.genesis_time = int(time.time())
+        self.emitted = 0
+        self._sequence = itertools.count()
+        self._subscription_ids = itertools.count(1)
+        # subscription_id -> (websocket, tipo, filtro)
+        self.subscriptions: dict[str, tuple] = {}
+        self._log_index = 0
+
+    # --- JSON-RPC ---
+
+    async def dispatch(self, request: dict, ws=None):
+        method = request.get('method')
+        params = request.get('params') or []
+        try:
+            if method == 'eth_subscribe' and ws is not None:
+                result = self.subscribe(ws, params)
+            elif method == 'eth_unsubscribe':
+                result = self.subscriptions.pop(params[0], None) is not None
+            elif method == 'eth_blockNumber':
+                result = hex(self.head)
+            elif method == 'eth_chainId':
+                result = hex(self.chain_id)
+            elif method == 'net_version':
+                result = str(self.chain_id)
+            elif method == 'eth_getLogs':
+                result = self.get_logs(params[0])
+            elif method == 'eth_getBlockByNumber':
+                number = self.head if params[0] == 'latest' else int(params[0], 16)
+                result = self.block_header(number)
+            elif method == 'eth_getTransactionReceipt':
+                log = self.transactions.get(params[0].lower())
+                result = self.receipt(log) if log else None
+            else:
+                return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': -32601, 'message': f"Método no soportado: {method}"}}
+        except (IndexError, KeyError, TypeError, ValueError) as e:
+            return {'jsonrpc': '2.0', 'id': request.get('id'), 'error': {'code': -32602, 'message': str(e)}}
+        return {'jsonrpc': '2.0', 'id': request.get('id'), 'result': result}
+
+    def subscribe(self, ws, params: list) -> str:
+        kind = params[0]
+        if kind not in ('logs', 'newHeads'):
+            raise ValueError(f"Suscripción no soportada: {kind}")
+        subscription_id = hex(next(self._subscription_ids))
+        self.subscriptions[subscription_id] = (ws, kind, params[1] if len(params) > 1 else {})
+        return subscription_id
+
+    def get_logs(self, log_filter: dict) -> list:
+        from_block = int(log_filter.get('fromBlock', '0x0'), 16)
+        to_block = self.head if log_filter.get('toBlock', 'latest') == 'latest' else int(log_filter['toBlock'], 16)
+        return [
+            log for log in self.history
+            if from_block <= int(log['blockNumber'], 16) <= to_block and matches_filter(log, log_filter)
+        ]
+
+    def block_header(self, number: int) -> dict:
+        return {
+            'number': hex(number),
+            'hash': '0x' + keccak(number.to_bytes(32, 'big')).hex(),
+            'parentHash': '0x' + keccak(max(number - 1, 0).to_bytes(32, 'big')).hex(),
+            'timestamp': hex(self.genesis_time + int((number - self.start_block) * self.block_time)),
+            'miner': '0x' + '00' * 20,
+            'gasLimit': hex(30_000_000),
+            'gasUsed': '0x0',
+            'difficulty': '0x0',
+            'extraData': '0x',
+            'logsBloom': '0x' + '00' * 256,
+            'stateRoot': '0x' + '00' * 32,
+            'transactionsRoot': '0x' + '00' * 32,
+            'receiptsRoot': '0x' + '00' * 32,
+            'sha3Uncles': '0x' + '00' * 32,
+            'nonce': '0x0000000000000000',
+            'baseFeePerGas': '0x1',
+        }
+
+    def receipt(self, log: dict) -> dict:
+        """Recibo de la transacción (una por log) con emisor y gas deterministas."""
+        tx_hash = bytes.fromhex(log['transactionHash'][2:])
+        return {
+            'transactionHash': log['transactionHash'],
+            'transactionIndex': log['transactionIndex'],
+            'blockHash': log['blockHash'],
+            'blockNumber': log['blockNumber'],
+            'from': '0x' + keccak(tx_hash)[-20:].hex(),
+            'to': log['address'],
+            'gasUsed': hex(21000 + tx_hash[-1] * 100),
+            'cumulativeGasUsed': hex(21000 * (int(log['transactionIndex'], 16) + 1)),
+            'effectiveGasPrice': '0x1',
+            'contractAddress': None,
+            'logs': [log],
+            'logsBloom': '0x' + '00' * 256,
+            'status': '0x1',
+            'type': '0x2',
+        }
+
+    # --- Producción de logs y bloques ---
+
+    def stamp(self, log: dict) -> dict:
+        """Asigna bloque, transacción e índice al log; el hash lleva el instante de emisión."""
+        tx_hash = time.time_ns().to_bytes(8, 'big') + next(self._sequence).to_bytes(24, 'big')
+        log.update({
+            'blockNumber': hex(self.head),
+            'blockHash': '0x' + keccak(self.head.to_bytes(32, 'big')).hex(),
+            'transactionHash': '0x' + tx_hash.hex(),
+            'transactionIndex': hex(self._log_index),
+            'logIndex': hex(self._log_index),
+            'removed': False,
+        })
+        self._log_index += 1
+        return log
+
+    async def emit(self, count: int) -> None:
+        for _ in range(count):
+            log = self.stamp(self.source.next_log())
+            self.history.append(log)
+            self.transactions[log['transactionHash']] = log
+            if len(self.transactions) > self.history_size:
+                self.transactions.popitem(last=False)
+            self.emitted += 1
+            for subscription_id, (ws, kind, log_filter) in list(self.subscriptions.items()):
+                if kind == 'logs' and matches_filter(log, log_filter):
+                    await self.notify(ws, subscription_id, log)
+
+    async def close_block(self) -> None:
+        header = self.block_header(self.head)
+        for subscription_id, (ws, kind, _) in list(self.subscriptions.items()):
+            if kind == 'newHeads':
+                await self.notify(ws, subscription_id, header)
+        self.head += 1
+        self._log_index = 0
+
+    async def notify(self, ws, subscription_id: str, result: dict) -> None:
+        if ws.closed:
+            self.subscriptions.pop(subscription_id, None)
+            return
+        await ws.send_str(json.dumps({
+            'jsonrpc': '2.0', 'method': 'eth_subscription',
+            'params': {'subscription': subscription_id, 'result': result},
+        }))
+
+    async def produce(self, tick: float = 0.01) -> None:
+        """Bucle de emisión: reparte `rate` logs por segundo en ticks y cierra bloques cada `block_time`."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        next_block = started + self.block_time
+        while True:
+            await asyncio.sleep(tick)
+            now = loop.time()
+            due = int((now - started) * self.rate) - self.emitted
+            if due > 0:
+                await self.emit(due)
+            if now >= next_block:
+                await self.close_block()
+                next_block += self.block_time
+
+    # --- Servidor ---
+
+    async def websocket_view(self, request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        async for message in ws:
+            # web3 envía las peticiones como frames binarios
+            if message.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+                continue
+            await ws.send_str(json.dumps(await self.dispatch(json.loads(message.data), ws)))
+        for subscription_id in [sid for sid, (owner, _, _) in self.subscriptions.items() if owner is ws]:
+            del self.subscriptions[subscription_id]
+        return ws
+
+    async def handle(self, request):
+        """Misma ruta para WebSocket (GET con upgrade) y JSON-RPC por HTTP POST (también en lote)."""
+        if request.method == 'GET':
+            return await self.websocket_view(request)
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([await self.dispatch(item) for item in body])
+        return web.json_response(await self.dispatch(body))
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8546) -> web.AppRunner:
+        app = web.Application()
+        app.router.add_route('*', '/', self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+def matches_filter(log: dict, log_filter: dict) -> bool:
+    """Aplica un filtro de eth_subscribe/eth_getLogs (dirección y topics por posición) a un log."""
+    address = log_filter.get('address')
+    if address:
+        addresses = address if isinstance(address, list) else [address]
+        if log['address'].lower() not in {a.lower() for a in addresses}:
+            return False
+    for position, expected in enumerate(log_filter.get('topics') or []):
+        if expected is None:
+            continue
+        if position >= len(log['topics']):
+            return False
+        options = expected if isinstance(expected, list) else [expected]
+        if log['topics'][position].lower() not in {option.lower() for option in options}:
+            return False
+    return True
@@ -0,0 +1,90 @@
+import math
+import os
+import socket
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from events.models import NetworkLease, SubscriberWorker
+
+
+def default_worker_name() -> str:
+    """Identificador único del proceso en la máquina: host:pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseManager:
+    """
+    Reparto de redes entre varios procesos suscriptores sin coordinador externo.
+
+    La base de datos es el único punto de acuerdo: cada worker publica un latido en
+    SubscriberWorker y reclama redes en NetworkLease con UPDATE condicionales (sólo
+    si el lease está libre o vencido), que son atómicos en SQLite y PostgreSQL.
+
+    En cada `rebalance` el worker:
+      1. renueva su latido y sus leases;
+      2. calcula su cuota, ceil(redes / workers vivos);
+      3. libera lo que exceda la cuota (p. ej. al arrancar un worker nuevo);
+      4. reclama redes libres o vencidas hasta completarla.
+
+    Si un worker muere deja de contar como vivo, la cuota de los demás sube y, al
+    vencer sus leases, sus redes pasan a otros workers. Los métodos son síncronos:
+    el suscriptor los invoca con sync_to_async.
+    """
+
+    def __init__(self, name: str | None = None, ttl: float = 30):
+        self.name = name or default_worker_name()
+        self.ttl = timedelta(seconds=ttl)
+
+    def heartbeat(self) -> int:
+        """Renueva el latido del worker y devuelve cuántos workers están vivos."""
+        now = timezone.now()
+        SubscriberWorker.objects.update_or_create(name=self.name, defaults={'heartbeat_at': now})
+        return SubscriberWorker.objects.filter(heartbeat_at__gt=now - self.ttl).count()
+
+    def rebalance(self, network_ids: list[int]) -> set[int]:
+        """Ajusta los leases del worker sobre `network_ids` y devuelve las redes que le pertenecen."""
+        live_workers = self.heartbeat()
+        now = timezone.now()
+        expires_at = now + self.ttl
+
+        # Filas para las redes que aún no tienen lease (vencidas desde el principio)
+        existing = set(NetworkLease.objects.filter(network_id__in=network_ids).values_list('network_id', flat=True))
+        NetworkLease.objects.bulk_create(
+            [NetworkLease(network_id=network_id, expires_at=now) for network_id in network_ids if network_id not in existing],
+            ignore_conflicts=True,
+        )
+
+        # 1. Renovar lo propio y soltar redes que ya no tienen suscripciones
+        mine = NetworkLease.objects.filter(owner=self.name)
+        mine.exclude(network_id__in=network_ids).update(owner='', expires_at=now)
+        mine.update(expires_at=expires_at)
+        owned = sorted(mine.values_list('network_id', flat=True))
+
+        quota = math.ceil(len(network_ids) / max(live_workers, 1))
+
+        # 2. Liberar el exceso para que lo tomen los workers con menos redes
+        if len(owned) > quota:
+            released = owned[quota:]
+            NetworkLease.objects.filter(owner=self.name, network_id__in=released).update(owner='', expires_at=now)
+            owned = owned[:quota]
+
+        # 3. Reclamar redes libres o vencidas hasta completar la cuota
+        for network_id in network_ids:
+            if len(owned) >= quota:
+                break
+            if network_id in owned:
+                continue
+            claimed = NetworkLease.objects.filter(network_id=network_id).filter(
+                Q(owner='') | Q(expires_at__lte=now)
+            ).update(owner=self.name, acquired_at=now, expires_at=expires_at)
+            if claimed:
+                owned.append(network_id)
+
+        return set(owned)
+
+    def release_all(self) -> None:
+        """Libera los leases del worker y borra su latido (cierre ordenado)."""
+        NetworkLease.objects.filter(owner=self.name).update(owner='', expires_at=timezone.now())
+        SubscriberWorker.objects.filter(name=self.name).delete()
@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from contractRegistry.models import DeployedContract
+
+from events.models import GlobalEventLog
+from events.retention import (
+    COLD_ARCHIVE_DIR, archive_event_logs, expired_condition, restore_event_logs, retention_policy,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mueve a un archivo comprimido en frío los logs de GlobalEventLog que exceden la '
+        'retención (EVENT_RETENTION o --days/--blocks), borrándolos por lotes. Con --restore '
+        'devuelve a la BD un rango archivado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contract', type=int, action='append', help='ID de DeployedContract (repetible; por defecto, todos).')
+        parser.add_argument('--days', type=int, help='Archiva los logs con más de N días (reemplaza la política configurada).')
+        parser.add_argument('--blocks', type=int, help='Archiva los logs a más de N bloques del cursor de la red (reemplaza la política configurada).')
+        parser.add_argument('--archive-dir', default=COLD_ARCHIVE_DIR, help='Raíz del archivo en frío.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Logs archivados y borrados por transacción.')
+        parser.add_argument('--pause', type=float, default=0.1, help='Segundos de espera entre lotes para no bloquear al suscriptor.')
+        parser.add_argument('--dry-run', action='store_true', help='Sólo informa cuántos logs se archivarían.')
+        parser.add_argument('--restore', nargs=2, type=int, metavar=('FROM_BLOCK', 'TO_BLOCK'),
+                            help='Restaura a la BD los logs archivados del rango de bloques (requiere --contract).')
+
+    def handle(self, *args, **options):
+        contracts = DeployedContract.objects.select_related('base_contract')
+        if options['contract']:
+            contracts = contracts.filter(pk__in=options['contract'])
+
+        if options['restore']:
+            return self.restore(contracts, options)
+        if not options['archive_dir'] and not options['dry_run']:
+            raise CommandError("Indica --archive-dir o define EVENT_COLD_ARCHIVE_DIR.")
+
+        started = time.perf_counter()
+        archived_total = 0
+        for contract in contracts:
+            policy = retention_policy(contract)
+            days = options['days'] if options['days'] is not None else policy.get('days')
+            blocks = options['blocks'] if options['blocks'] is not None else policy.get('blocks')
+            condition = expired_condition(contract, days=days, blocks=blocks)
+            if condition is None:
+                continue
+
+            label = f"{contract.base_contract.name} (ID {contract.pk})"
+            if options['dry_run']:
+                pending = GlobalEventLog.objects.filter(condition, deployed_contract=contract).count()
+                self.stdout.write(f"🔎 {label}: {pending} logs exceden la retención.")
+                continue
+
+            self.stdout.write(self.style.NOTICE(f"📦 Archivando logs de {label}..."))
+            archived = archive_event_logs(
+                contract, condition, options['archive_dir'], batch_size=options['batch_size'], pause=options['pause'],
+                on_batch=lambda total: self.stdout.write(f"   {total} logs archivados..."),
+            )
+            archived_total += archived
+            self.stdout.write(self.style.SUCCESS(f"✅ {label}: {archived} logs archivados."))
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {archived_total} logs movidos a {options['archive_dir']} en {time.perf_counter() - started:.2f} s."
+            ))
+
+    def restore(self, contracts, options):
+        if not options['contract']:
+            raise CommandError("--restore requiere indicar --contract.")
+        from_block, to_block = options['restore']
+        for contract in contracts:
+            restored = restore_event_logs(contract, from_block, to_block, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {contract.base_contract.name} (ID {contract.pk}): {restored} logs leídos del archivo para los "
+                f"bloques {from_block}-{to_block} (los que ya estaban en la BD se ignoran)."
+            ))
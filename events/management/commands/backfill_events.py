@@ -0,0 +1,112 @@
+import asyncio
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from events.backfill import LogBackfiller
+from events.enrichment import LogEnricher
+from events.pipeline import EventLogWriter
+from events.rpc import JsonRpcClient
+from events.utils import get_active_subscriptions
+
+
+class Command(BaseCommand):
+    help = 'Recupera logs históricos de las suscripciones activas vía eth_getLogs (rango de bloques adaptativo).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--network', help='Nombre de la red a recuperar (por defecto, todas).')
+        parser.add_argument('--from-block', type=int, default=0, help='Primer bloque a consultar.')
+        parser.add_argument('--to-block', type=int, help='Último bloque a consultar (por defecto, la cabeza de la cadena).')
+        parser.add_argument('--range', type=int, default=2000, help='Tamaño inicial del rango de bloques por petición.')
+        parser.add_argument('--max-range', type=int, default=100000, help='Tamaño máximo del rango de bloques por petición.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Peticiones eth_getLogs simultáneas por red.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Máximo de logs por escritura en lote.')
+        parser.add_argument('--enrich', action='store_true', default=getattr(settings, 'EVENT_ENRICHMENT', False),
+                            help='Completa fecha de bloque, emisor y gas de cada log con un lote JSON-RPC por escritura.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.writer = EventLogWriter(
+            batch_size=options['batch_size'],
+            on_flush=self.report_flush,
+            on_error=self.report_flush_error,
+            enricher=LogEnricher(
+                cache_size=getattr(settings, 'EVENT_ENRICHMENT_CACHE_SIZE', 10000),
+                on_error=self.report_enrichment_error,
+            ) if options['enrich'] else None,
+        )
+        asyncio.run(self.run_backfill())
+
+    def report_flush(self, batch_size: int, latency: float):
+        self.stdout.write(self.style.SUCCESS(f"✅ Lote guardado: {batch_size} logs en {latency * 1000:.1f} ms"))
+
+    def report_flush_error(self, error: Exception, batch_size: int):
+        self.stdout.write(self.style.ERROR(f"Error al guardar lote de {batch_size} logs en BD: {error}"))
+
+    def report_enrichment_error(self, network, error: Exception):
+        self.stdout.write(self.style.WARNING(f"No se pudieron enriquecer logs de {network.name}: {error}"))
+
+    def report_range(self, sub, from_block: int, to_block: int, count: int):
+        if self.options['verbosity'] >= 2:
+            self.stdout.write(f"🔎 {sub.event_name}@{sub.deployed_contract.address}: bloques {from_block}-{to_block} -> {count} logs")
+
+    def report_decode_error(self, sub, log_receipt, error: Exception):
+        self.stdout.write(self.style.WARNING(
+            f"Advertencia de decodificación en contrato {sub.deployed_contract.address}: Log no coincide con ABI de {sub.event_name}. Error: {error}"
+        ))
+
+    async def run_backfill(self):
+        queryset = get_active_subscriptions()
+        if self.options['network']:
+            queryset = queryset.filter(deployed_contract__network__name=self.options['network'])
+        subscriptions = await sync_to_async(list)(queryset)
+
+        if not subscriptions:
+            raise CommandError("No se encontraron suscripciones activas para recuperar.")
+
+        # Agrupar suscripciones por red: cada red tiene su propio nodo y su propio límite de concurrencia
+        subscriptions_by_network = {}
+        for sub in subscriptions:
+            subscriptions_by_network.setdefault(sub.deployed_contract.network, []).append(sub)
+
+        writer_task = asyncio.create_task(self.writer.run())
+        try:
+            await asyncio.gather(*(
+                self.backfill_network(network, subs_list)
+                for network, subs_list in subscriptions_by_network.items()
+            ))
+        finally:
+            await self.writer.close(writer_task)
+            if self.writer.enricher is not None:
+                await self.writer.enricher.close()
+
+        # Una red sigue retenida si se perdió algún lote: su cursor no avanzó
+        for network in subscriptions_by_network:
+            if network.pk in self.writer.held_networks:
+                self.stdout.write(self.style.ERROR(
+                    f"❌ {network.name}: se perdieron lotes al guardar; el cursor no avanzó. Vuelve a ejecutar la recuperación."
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✅ {network.name}: recuperación guardada y cursor actualizado."))
+
+    async def backfill_network(self, network, subs_list):
+        async with JsonRpcClient(network.rpc_url) as client:
+            to_block = self.options['to_block']
+            if to_block is None:
+                to_block = await client.block_number()
+            from_block = self.options['from_block']
+
+            self.stdout.write(f"Recuperando bloques {from_block}-{to_block} de {network.name} para {len(subs_list)} suscripciones...")
+            backfiller = LogBackfiller(
+                client,
+                self.writer,
+                initial_range=self.options['range'],
+                max_range=self.options['max_range'],
+                concurrency=self.options['concurrency'],
+                on_range=self.report_range,
+                on_decode_error=self.report_decode_error,
+            )
+            # El cursor de la red avanza una sola vez, cuando todo el rango quedó encolado
+            await backfiller.backfill_to_cursor(network.pk, subs_list, from_block, to_block)
+            self.stdout.write(self.style.SUCCESS(f"🎉 Recuperación de {network.name} encolada por completo."))
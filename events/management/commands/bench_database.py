@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+
+from contractRegistry.models import DeployedContract
+from events.models import ContractEventStats, DailyEventRollup, GlobalEventLog, HourlyEventRollup
+from events.pipeline import EventLogWriter
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide la ingesta concurrente (lotes del escritor del suscriptor) junto con las lecturas '
+        'de los paneles sobre la base configurada (SQLite o PostgreSQL): lotes/s, lecturas/s, '
+        'latencias p50/p95 y errores por bloqueo. Los logs de prueba se retiran al final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contract', type=int, help='ID de DeployedContract donde escribir (por defecto, el primero).')
+        parser.add_argument('--writers', type=int, default=2, help='Hilos que escriben lotes como el suscriptor.')
+        parser.add_argument('--readers', type=int, default=4, help='Hilos que hacen las consultas de un panel.')
+        parser.add_argument('--batch-size', type=int, default=50, help='Logs por lote escrito.')
+        parser.add_argument('--duration', type=float, default=10.0, help='Segundos de medición.')
+
+    def handle(self, *args, **options):
+        contracts = DeployedContract.objects.all()
+        contract = contracts.filter(pk=options['contract']).first() if options['contract'] else contracts.first()
+        if contract is None:
+            raise CommandError("No hay un DeployedContract donde escribir.")
+
+        self.contract = contract
+        self.run_id = uuid.uuid4().hex[:8]
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.write_latencies, self.read_latencies = [], []
+        self.errors = {'write': 0, 'read': 0}
+        self.written = []
+
+        self.stdout.write(self.style.NOTICE(
+            f"⏱️ {connection.vendor} | {options['writers']} escritores × lotes de {options['batch_size']} + "
+            f"{options['readers']} lectores durante {options['duration']:.0f} s..."
+        ))
+        threads = [threading.Thread(target=self.write_loop, args=(n, options['batch_size'])) for n in range(options['writers'])]
+        threads += [threading.Thread(target=self.read_loop) for _ in range(options['readers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.report(elapsed, options['batch_size'])
+        self.cleanup()
+
+    # --- Hilos de carga ---
+
+    def write_loop(self, number: int, batch_size: int) -> None:
+        writer = EventLogWriter()
+        sequence = 0
+        try:
+            while not self.stop.is_set():
+                batch = []
+                for _ in range(batch_size):
+                    sequence += 1
+                    batch.append(GlobalEventLog(
+                        network_id=self.contract.network_id,
+                        deployed_contract=self.contract,
+                        event_name='BenchDatabase',
+                        event_data={'args': {'value': sequence}},
+                        transaction_hash=f"bench-{self.run_id}-{number}-{sequence}",
+                        log_index=0,
+                        block_number=sequence,
+                    ))
+                started = time.perf_counter()
+                try:
+                    writer._write_batch(batch, {})
+                except OperationalError:
+                    with self.lock:
+                        self.errors['write'] += 1
+                    continue
+                with self.lock:
+                    self.write_latencies.append(time.perf_counter() - started)
+                    self.written.extend(batch)
+        finally:
+            connections.close_all()
+
+    def read_loop(self) -> None:
+        try:
+            while not self.stop.is_set():
+                started = time.perf_counter()
+                try:
+                    # Las mismas consultas que un panel: logs recientes, totales y serie de 48 h
+                    list(GlobalEventLog.objects.filter(deployed_contract=self.contract).order_by('-timestamp')[:10])
+                    ContractEventStats.objects.filter(deployed_contract=self.contract, event_name='BenchDatabase').first()
+                    list(HourlyEventRollup.objects.filter(
+                        deployed_contract=self.contract, event_name='BenchDatabase',
+                        bucket__gte=timezone.now() - timedelta(hours=48),
+                    ))
+                except OperationalError:
+                    with self.lock:
+                        self.errors['read'] += 1
+                    continue
+                with self.lock:
+                    self.read_latencies.append(time.perf_counter() - started)
+        finally:
+            connections.close_all()
+
+    # --- Resultados ---
+
+    def report(self, elapsed: float, batch_size: int) -> None:
+        writes = sorted(self.write_latencies)
+        reads = sorted(self.read_latencies)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Escritura: {len(writes) / elapsed:,.1f} lotes/s ({len(writes) * batch_size / elapsed:,.0f} logs/s) | "
+            f"p50 {percentile(writes, 0.5) * 1000:.1f} ms | p95 {percentile(writes, 0.95) * 1000:.1f} ms"
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Lectura de panel: {len(reads) / elapsed:,.1f} consultas/s | "
+            f"p50 {percentile(reads, 0.5) * 1000:.1f} ms | p95 {percentile(reads, 0.95) * 1000:.1f} ms"
+        ))
+        style = self.style.ERROR if any(self.errors.values()) else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Errores por bloqueo: {self.errors['write']} escrituras, {self.errors['read']} lecturas"
+        ))
+
+    def cleanup(self) -> None:
+        """Retira los logs de prueba por el mismo camino que una reorganización (descuenta totales y acumulados)."""
+        writer = EventLogWriter()
+        for start in range(0, len(self.written), 500):
+            writer._write_batch([], {}, self.written[start:start + 500])
+        ContractEventStats.objects.filter(deployed_contract=self.contract, event_name='BenchDatabase', event_count=0).delete()
+        for model in (HourlyEventRollup, DailyEventRollup):
+            model.objects.filter(deployed_contract=self.contract, event_name='BenchDatabase', event_count=0).delete()
+        self.stdout.write(f"🧹 {len(self.written)} logs de prueba retirados.")
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from web3 import Web3
+
+from contractRegistry.models import ContractVersion
+from events.decoders import EventDecoder
+from events.fakenode import SYNTHETIC_ABI, FakeNode, SyntheticLogSource, synthetic_events
+from events.rpc import normalize_log
+
+CONTRACT_ADDRESS = Web3.to_checksum_address('0x' + 'a' * 40)
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark: decodificador precompilado (EventDecoder) frente a process_log de web3.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logs', type=int, default=5000, help='Cantidad de logs sintéticos a decodificar.')
+        parser.add_argument('--contract-version', type=int, help='ID de una ContractVersion cuyo ABI usar (por defecto, un ABI sintético).')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla para generar los logs.')
+
+    def handle(self, *args, **options):
+        if options['contract_version']:
+            abi = ContractVersion.objects.get(pk=options['contract_version']).abi
+        else:
+            abi = SYNTHETIC_ABI
+
+        events = synthetic_events(abi)
+        if not events:
+            raise CommandError("El ABI no tiene eventos decodificables por el benchmark.")
+
+        # El nodo falso sólo se usa para asignar bloque/transacción a cada log, como en la red
+        node = FakeNode(SyntheticLogSource([(CONTRACT_ADDRESS, event_abi) for event_abi in events], seed=options['seed']))
+        samples = []
+        for i in range(options['logs']):
+            event_abi = events[i % len(events)]
+            samples.append((event_abi['name'], normalize_log(node.stamp(node.source.next_log()))))
+        self.stdout.write(f"{len(samples)} logs sintéticos de {len(events)} eventos.")
+
+        contract = Web3().eth.contract(address=CONTRACT_ADDRESS, abi=abi)
+
+        # 1. process_log de web3 (camino anterior)
+        started = time.perf_counter()
+        web3_results = [contract.events[name].process_log(log) for name, log in samples]
+        web3_elapsed = time.perf_counter() - started
+
+        # 2. EventDecoder precompilado (incluye construirlo, como haría el primer log de una versión)
+        started = time.perf_counter()
+        decoder = EventDecoder(abi)
+        decoded_results = [decoder.decode_log(log) for _, log in samples]
+        decoder_elapsed = time.perf_counter() - started
+
+        mismatches = sum(
+            1 for expected, actual in zip(web3_results, decoded_results)
+            if dict(expected['args']) != actual['args']
+        )
+
+        for label, elapsed in (('web3 process_log', web3_elapsed), ('EventDecoder', decoder_elapsed)):
+            self.stdout.write(
+                f"{label:>18}: {elapsed * 1000:8.1f} ms  "
+                f"({elapsed / len(samples) * 1e6:6.1f} µs/log, {len(samples) / elapsed:9.0f} logs/s)"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Aceleración: x{web3_elapsed / decoder_elapsed:.1f}"))
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"{mismatches} logs decodificados con resultado distinto a web3."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Resultados idénticos a web3 en todos los logs."))
@@ -0,0 +1,216 @@
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import resource
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from web3 import Web3
+
+from contractRegistry.models import BaseContract, ContractVersion, DeployedContract, DeploymentStatus, Network
+from events.fakenode import SYNTHETIC_ABI, FakeNode, ReplayLogSource, SyntheticLogSource, emit_time_from_tx_hash, synthetic_events
+from events.management.commands.run_suscriber import Command as SubscriberCommand
+from events.models import EventSubscription
+from system_address_manager.models import AuthorizedAddress
+
+
+# --- Nodo falso (proceso aparte) ---
+
+def run_fake_node(sources, replay, rate, block_time, port, emitted):
+    """Punto de entrada del proceso del nodo falso: emite hasta que lo terminan."""
+    source = ReplayLogSource(replay) if replay else SyntheticLogSource(sources)
+    node = FakeNode(source, rate=rate, block_time=block_time)
+
+    async def main():
+        await node.serve('127.0.0.1', port)
+        producer = asyncio.create_task(node.produce())
+        while not producer.done():
+            emitted.value = node.emitted
+            await asyncio.sleep(0.2)
+        await producer
+
+    asyncio.run(main())
+
+
+def current_rss() -> int:
+    """Memoria residente actual del proceso en bytes (Linux); si no se puede leer, el pico."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class BenchSubscriber(SubscriberCommand):
+    """run_suscriber con un registro de la latencia emisión→commit de cada log guardado."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (instante del commit en ns, latencia en ns)
+        self.commits: list[tuple[int, int]] = []
+
+    def on_commit(self, event_logs, retractions):
+        now = time.time_ns()
+        self.commits.extend((now, now - emit_time_from_tx_hash(event_log.transaction_hash)) for event_log in event_logs)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark extremo a extremo de run_suscriber contra un nodo falso local: '
+        'eventos/s sostenidos, latencia p50/p99 de emisión a commit y crecimiento de memoria. '
+        'Usa una base de datos de prueba temporal.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=float, default=500, help='Logs por segundo que emite el nodo falso.')
+        parser.add_argument('--duration', type=float, default=30, help='Segundos de medición (sin contar el calentamiento).')
+        parser.add_argument('--warmup', type=float, default=5, help='Segundos iniciales que no se miden.')
+        parser.add_argument('--block-time', type=float, default=1.0, help='Segundos entre bloques del nodo falso.')
+        parser.add_argument('--contracts', type=int, default=1, help='Contratos desplegados (con todas sus suscripciones) a simular.')
+        parser.add_argument('--contract-version', type=int, help='ID de una ContractVersion cuyo ABI usar (por defecto, un ABI sintético).')
+        parser.add_argument('--replay', help='Archivo JSONL con logs grabados a reproducir en lugar de logs sintéticos.')
+        parser.add_argument('--port', type=int, default=18545, help='Puerto local del nodo falso.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Máximo de logs por escritura en lote del suscriptor.')
+        parser.add_argument('--flush-interval', type=float, default=0.5, help='Ventana máxima del escritor por lotes, en segundos.')
+        parser.add_argument('--enrich', action='store_true', help='Activa el enriquecimiento (bloques y recibos) del suscriptor.')
+
+    def handle(self, *args, **options):
+        # El ABI se lee de la BD real antes de cambiar a la de prueba
+        abi = ContractVersion.objects.get(pk=options['contract_version']).abi if options['contract_version'] else SYNTHETIC_ABI
+        events = synthetic_events(abi)
+        if not events:
+            raise CommandError("El ABI no tiene eventos para los que generar logs.")
+
+        if options['replay']:
+            with open(options['replay']) as f:
+                addresses = sorted({Web3.to_checksum_address(json.loads(line)['address']) for line in f if line.strip()})
+        else:
+            addresses = [Web3.to_checksum_address(f"0x{index + 1:040x}") for index in range(options['contracts'])]
+
+        connection = connections['default']
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            # En un archivo (no en memoria) para medir un acceso a disco realista
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), 'bench_subscriber.sqlite3')
+        self.stdout.write("Creando base de datos de prueba...")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(abi, events, addresses, options['port'])
+            self.run_benchmark(events, addresses, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, abi: list, events: list, addresses: list[str], port: int):
+        """Red, contrato y suscripciones del escenario, apuntando al nodo falso."""
+        deployer = AuthorizedAddress.objects.create(address='0x' + 'd' * 40)
+        network = Network.objects.create(
+            name='bench', rpc_url=f"http://127.0.0.1:{port}/", wss_url=f"ws://127.0.0.1:{port}/", chain_id=31337,
+        )
+        base_contract = BaseContract.objects.create(name='BenchContract')
+        version = ContractVersion.objects.create(base_contract=base_contract, version='1', bytecode='0x', abi=abi)
+        for index, address in enumerate(addresses):
+            deployed = DeployedContract.objects.create(
+                contract_version=version, network=network, deployerAddress=deployer, base_contract=base_contract,
+                address=address, status=DeploymentStatus.CONFIRMED, is_current=index == 0,
+            )
+            EventSubscription.objects.bulk_create([
+                EventSubscription(deployed_contract=deployed, event_name=event_abi['name']) for event_abi in events
+            ])
+
+    def run_benchmark(self, events: list, addresses: list[str], options: dict):
+        warmup, duration = options['warmup'], options['duration']
+        sources = [(address, event_abi) for address in addresses for event_abi in events]
+
+        # 1. Nodo falso en su propio proceso, para no competir por el bucle del suscriptor
+        connections.close_all()
+        emitted = multiprocessing.Value('q', 0)
+        node_process = multiprocessing.get_context('fork').Process(
+            target=run_fake_node,
+            args=(sources, options['replay'], options['rate'], options['block_time'], options['port'], emitted),
+            daemon=True,
+        )
+        node_process.start()
+        self.wait_for_port(options['port'])
+
+        # 2. Muestreo de memoria y parada del suscriptor al terminar
+        memory_samples: list[tuple[float, int]] = []
+        stop = threading.Event()
+        started = time.time()
+
+        def sample_memory():
+            while not stop.is_set():
+                memory_samples.append((time.time() - started, current_rss()))
+                stop.wait(1)
+
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+        timer = threading.Timer(warmup + duration, os.kill, (os.getpid(), signal.SIGTERM))
+        timer.start()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🏁 {options['rate']:g} logs/s sobre {len(sources)} suscripciones durante {warmup:g}+{duration:g} s..."
+        ))
+        subscriber = BenchSubscriber(stdout=io.StringIO(), stderr=io.StringIO())
+        previous_handler = signal.getsignal(signal.SIGTERM)
+        try:
+            call_command(
+                subscriber, reload_interval=0, metrics_port=0, stream_port=0, verbosity=0,
+                batch_size=options['batch_size'], flush_interval=options['flush_interval'], enrich=options['enrich'],
+            )
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            timer.cancel()
+            stop.set()
+            sampler.join()
+            node_process.terminate()
+            node_process.join()
+        finished = time.time()
+
+        if options['verbosity'] >= 2:
+            self.stdout.write(subscriber.stdout._out.getvalue())
+        self.report(subscriber.commits, memory_samples, emitted.value, started, finished, warmup)
+
+    def wait_for_port(self, port: int, timeout: float = 10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError(f"El nodo falso no abrió el puerto {port}.")
+
+    def report(self, commits, memory_samples, emitted: int, started: float, finished: float, warmup: float):
+        window_start_ns = int((started + warmup) * 1e9)
+        measured = [latency for committed_at, latency in commits if committed_at >= window_start_ns]
+        window = finished - started - warmup
+
+        self.stdout.write(f"Logs emitidos por el nodo: {emitted} | guardados: {len(commits)}")
+        if not measured or window <= 0:
+            self.stdout.write(self.style.ERROR("No se guardó ningún log dentro de la ventana de medición."))
+            return
+
+        measured.sort()
+        p50 = measured[len(measured) // 2] / 1e6
+        p99 = measured[min(len(measured) - 1, int(len(measured) * 0.99))] / 1e6
+        self.stdout.write(self.style.SUCCESS(f"Throughput sostenido: {len(measured) / window:,.0f} eventos/s"))
+        self.stdout.write(self.style.SUCCESS(f"Latencia emisión→commit: p50 {p50:.1f} ms | p99 {p99:.1f} ms | máx {measured[-1] / 1e6:.1f} ms"))
+
+        # Memoria: muestras tras el calentamiento, unas diez filas como mucho
+        samples = [(elapsed, rss) for elapsed, rss in memory_samples if elapsed >= warmup] or memory_samples
+        if len(samples) >= 2:
+            (first_t, first_rss), (last_t, last_rss) = samples[0], samples[-1]
+            growth = (last_rss - first_rss) / 2**20
+            per_minute = growth / max(last_t - first_t, 1e-9) * 60
+            self.stdout.write(f"Memoria (RSS): {first_rss / 2**20:.1f} MB → {last_rss / 2**20:.1f} MB ({growth:+.1f} MB, {per_minute:+.1f} MB/min)")
+            step = max(len(samples) // 10, 1)
+            for elapsed, rss in samples[::step]:
+                self.stdout.write(f"    t={elapsed:6.1f} s  {rss / 2**20:8.1f} MB")
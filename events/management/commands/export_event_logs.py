@@ -0,0 +1,45 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.export import CONTENT_TYPES, export_blocks, export_lines, export_rows
+
+
+class Command(BaseCommand):
+    help = 'Exporta logs de GlobalEventLog a CSV o NDJSON (opcionalmente gzip) leyendo por tramos, con memoria constante.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contract', type=int, help='ID de DeployedContract.')
+        parser.add_argument('--event', help='Nombre del evento (p. ej. PurchasedTicket).')
+        parser.add_argument('--from-block', type=int, help='Primer bloque del rango.')
+        parser.add_argument('--to-block', type=int, help='Último bloque del rango.')
+        parser.add_argument('--format', choices=list(CONTENT_TYPES), default='csv', help='Formato de salida.')
+        parser.add_argument('--gzip', action='store_true', help='Comprime la salida en gzip.')
+        parser.add_argument('--output', default='-', help="Archivo de salida ('-' para la salida estándar).")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        rows = counted(export_rows(
+            deployed_contract_id=options['contract'], event_name=options['event'],
+            from_block=options['from_block'], to_block=options['to_block'],
+        ))
+        output = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        try:
+            for block in export_blocks(export_lines(rows, options['format']), options['gzip']):
+                output.write(block)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+
+        self.stderr.write(self.style.SUCCESS(
+            f"✅ {count} logs exportados en {time.perf_counter() - started:.2f} s."
+        ))
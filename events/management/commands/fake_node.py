@@ -0,0 +1,50 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.decoders import decoder_registry
+from events.fakenode import FakeNode, ReplayLogSource, SyntheticLogSource
+from events.utils import get_active_subscriptions
+
+
+class Command(BaseCommand):
+    help = 'Levanta un nodo Ethereum falso (WebSocket + HTTP JSON-RPC) que emite logs para las suscripciones activas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Interfaz donde escuchar.')
+        parser.add_argument('--port', type=int, default=8546, help='Puerto del nodo (ws:// y http:// en la misma ruta).')
+        parser.add_argument('--rate', type=float, default=100, help='Logs emitidos por segundo.')
+        parser.add_argument('--block-time', type=float, default=1.0, help='Segundos entre bloques (newHeads).')
+        parser.add_argument('--replay', help='Archivo JSONL con logs grabados (uno por línea) a reproducir en lugar de logs sintéticos.')
+        parser.add_argument('--seed', type=int, default=1, help='Semilla de los logs sintéticos.')
+
+    def handle(self, *args, **options):
+        if options['replay']:
+            source = ReplayLogSource(options['replay'])
+        else:
+            # Un log sintético por cada evento suscrito, con la dirección real del contrato
+            sources = []
+            for sub in get_active_subscriptions():
+                try:
+                    event = decoder_registry.get(sub.deployed_contract.contract_version).get_event(sub.event_name)
+                except KeyError:
+                    continue
+                if event.fast:
+                    sources.append((sub.deployed_contract.address, event.abi))
+            if not sources:
+                raise CommandError("No hay suscripciones activas con eventos para generar logs. Usa --replay.")
+            source = SyntheticLogSource(sources, seed=options['seed'])
+
+        node = FakeNode(source, rate=options['rate'], block_time=options['block_time'])
+        try:
+            asyncio.run(self.run(node, options['host'], options['port']))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.NOTICE(f"Nodo detenido tras emitir {node.emitted} logs."))
+
+    async def run(self, node: FakeNode, host: str, port: int):
+        await node.serve(host, port)
+        self.stdout.write(self.style.SUCCESS(
+            f"🧪 Nodo falso escuchando en ws://{host}:{port}/ y http://{host}:{port}/ "
+            f"({node.rate:g} logs/s, un bloque cada {node.block_time:g} s)"
+        ))
+        await node.produce()
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from events.models import EventParticipant, GlobalEventLog
+from events.participants import participant_addresses
+
+
+class Command(BaseCommand):
+    help = 'Completa el índice de direcciones participantes (EventParticipant) de los logs ya guardados, según el ABI de cada contrato.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contract', type=int, action='append', help='ID de DeployedContract a procesar (repetible; por defecto, todos).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Logs leídos por consulta.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        logs = GlobalEventLog.objects.only('id', 'deployed_contract_id', 'event_name', 'event_data').order_by('pk')
+        if options['contract']:
+            logs = logs.filter(deployed_contract_id__in=options['contract'])
+
+        last_pk, scanned, created = 0, 0, 0
+        while True:
+            batch = list(logs.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            participants = [
+                EventParticipant(event_log_id=event_log.pk, arg_name=name, address=address)
+                for event_log in batch
+                for name, address in participant_addresses(event_log)
+            ]
+            # Los ya indexados se ignoran: el comando se puede repetir
+            EventParticipant.objects.bulk_create(participants, ignore_conflicts=True)
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+            created += len(participants)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {created} direcciones indexadas de {scanned} logs en {time.perf_counter() - started:.2f} s."
+        ))
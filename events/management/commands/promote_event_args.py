@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from events.models import GlobalEventLog
+from events.pipeline import PROMOTED_ARGS, promoted_args
+
+
+class Command(BaseCommand):
+    help = (
+        'Completa las columnas tipadas arg_amount y arg_address de los logs ya guardados '
+        'según EVENT_PROMOTED_ARGS (tras agregar o cambiar argumentos promovidos).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contract', type=int, action='append', help='ID de DeployedContract a procesar (repetible; por defecto, todos).')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Logs leídos y actualizados por transacción.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        logs = GlobalEventLog.objects.filter(event_name__in=list(PROMOTED_ARGS)).only(
+            'id', 'event_name', 'event_data', 'arg_amount', 'arg_address',
+        ).order_by('pk')
+        if options['contract']:
+            logs = logs.filter(deployed_contract_id__in=options['contract'])
+
+        # Se recorre por rangos de pk para no mantener un cursor abierto durante las escrituras
+        last_pk, scanned, updated = 0, 0, 0
+        while True:
+            batch = list(logs.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            changed = []
+            for event_log in batch:
+                values = promoted_args(event_log.event_name, (event_log.event_data or {}).get('args', {}))
+                if values['arg_amount'] != event_log.arg_amount or values['arg_address'] != event_log.arg_address:
+                    event_log.arg_amount, event_log.arg_address = values['arg_amount'], values['arg_address']
+                    changed.append(event_log)
+            with transaction.atomic():
+                GlobalEventLog.objects.bulk_update(changed, ['arg_amount', 'arg_address'])
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+            updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {updated} de {scanned} logs actualizados en {time.perf_counter() - started:.2f} s."
+        ))
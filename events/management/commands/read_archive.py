@@ -0,0 +1,28 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from events.archive import ArchiveReader
+
+
+class Command(BaseCommand):
+    help = 'Lee un rango de bloques de una red desde el archivo de segmentos (sin consultar la BD) y lo imprime como NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('network', type=int, help='ID de la red.')
+        parser.add_argument('--from-block', type=int, default=0, help='Primer bloque del rango.')
+        parser.add_argument('--to-block', type=int, default=2**63, help='Último bloque del rango.')
+        parser.add_argument('--archive-dir', default=getattr(settings, 'EVENT_ARCHIVE_DIR', None), help='Raíz del archivo de segmentos.')
+        parser.add_argument('--include-retracted', action='store_true', help='Incluye también los logs retirados por reorganizaciones.')
+
+    def handle(self, *args, **options):
+        if not options['archive_dir']:
+            raise CommandError("Indica --archive-dir o define EVENT_ARCHIVE_DIR.")
+
+        reader = ArchiveReader(options['archive_dir'])
+        count = 0
+        for record in reader.read_range(options['network'], options['from_block'], options['to_block'], options['include_retracted']):
+            self.stdout.write(json.dumps(record))
+            count += 1
+        self.stderr.write(f"{count} logs leídos del archivo.")
@@ -0,0 +1,720 @@
+import asyncio
+import functools
+import json
+import signal
+import subprocess
+import sys
+import time
+from asgiref.sync import sync_to_async
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.utils import timezone
+from web3 import AsyncWeb3, WebSocketProvider
+from web3.utils.subscriptions import LogsSubscription, LogsSubscriptionContext, NewHeadsSubscription, NewHeadsSubscriptionContext
+from web3.exceptions import MismatchedABI
+from web3.types import LogReceipt
+
+# Importar modelos
+from events.archive import SegmentArchive
+from events.backfill import LogBackfiller
+from events.dispatch import DispatchTable
+from events.enrichment import LogEnricher
+from events.leases import LeaseManager, default_worker_name
+from events import metrics
+from events.models import BlockCursor, ConnectionState, EventSubscription, NodeHealth
+from events.pipeline import ConfirmationBuffer, CursorCheckpoint, EventLogWriter, build_event_log
+from events.reconnect import ReconnectPolicy
+from events.stream import STREAM_HOST, STREAM_PORT, EventPublisher
+from events.rpc import Web3LogsClient
+from events.utils import get_active_subscriptions, get_subscriptions_fingerprint
+from contractRegistry.models import Network
+
+class Command(BaseCommand):
+    help = 'Inicia el proceso asíncrono de suscripción a eventos de contratos vía WebSocket.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Máximo de logs por escritura en lote.')
+        parser.add_argument('--flush-interval', type=float, default=0.5, help='Segundos máximos que un log espera en la cola antes de escribirse.')
+        parser.add_argument('--queue-size', type=int, default=10000, help='Capacidad de la cola entre los handlers y el escritor.')
+        parser.add_argument('--reload-interval', type=float, default=5, help='Segundos entre revisiones de cambios en las suscripciones (0 desactiva la recarga en caliente).')
+        parser.add_argument('--workers', type=int, default=0, help='Lanza N procesos suscriptores que se reparten las redes mediante leases en la BD.')
+        parser.add_argument('--shard', action='store_true', help='Escucha sólo las redes cuyo lease obtenga este proceso (lo usan los procesos de --workers).')
+        parser.add_argument('--lease-ttl', type=float, default=30, help='Segundos de validez de un lease; un worker caído pierde sus redes tras este plazo.')
+        parser.add_argument('--metrics-port', type=int, default=getattr(settings, 'EVENT_METRICS_PORT', 9108),
+                            help='Puerto local de las métricas Prometheus (GET /metrics); con --workers, el worker i usa puerto+i. 0 las desactiva.')
+        parser.add_argument('--stream-port', type=int, default=STREAM_PORT,
+                            help='Puerto local donde se publican los logs confirmados para el stream SSE de los paneles; con --workers, el worker i usa puerto+i. 0 lo desactiva.')
+        parser.add_argument('--archive-dir', default=getattr(settings, 'EVENT_ARCHIVE_DIR', None),
+                            help='Directorio donde además se archivan los logs confirmados en segmentos comprimidos por red y día.')
+        parser.add_argument('--enrich', action='store_true', default=getattr(settings, 'EVENT_ENRICHMENT', False),
+                            help='Completa fecha de bloque, emisor y gas de cada log con un lote JSON-RPC por escritura (vía rpc_url de la red).')
+
+    def handle(self, *args, **options):
+        if options['workers']:
+            return self.run_workers(options)
+
+        # SIGTERM (p. ej. del proceso supervisor) cierra igual que Ctrl+C: vacía la cola y libera leases
+        signal.signal(signal.SIGTERM, raise_keyboard_interrupt)
+
+        # 1. Ejecuta el bucle asíncrono principal
+        self.stdout.write(self.style.SUCCESS('Iniciando el Gestor de Suscripciones de Eventos...'))
+        self.reload_interval = options['reload_interval']
+        self.metrics_port = options['metrics_port']
+        self.stream_port = options['stream_port']
+        self.publisher: EventPublisher | None = None
+        self.archive = SegmentArchive(options['archive_dir']) if options['archive_dir'] else None
+        # Con volumen, una línea por evento convierte la terminal en el cuello de botella
+        self.log_each_event = options['verbosity'] >= 2
+        self.leases = LeaseManager(ttl=options['lease_ttl']) if options['shard'] else None
+        self.owned_networks: set[int] = set()
+        self.worker_name = self.leases.name if self.leases is not None else default_worker_name()
+        self.writer = EventLogWriter(
+            batch_size=options['batch_size'],
+            flush_interval=options['flush_interval'],
+            max_queue_size=options['queue_size'],
+            on_flush=self.report_flush,
+            on_error=self.report_flush_error,
+            on_commit=self.on_commit,
+            on_duplicate=self.report_duplicate,
+            on_hold=self.refill_held_network,
+            enricher=LogEnricher(
+                cache_size=getattr(settings, 'EVENT_ENRICHMENT_CACHE_SIZE', 10000),
+                on_error=self.report_enrichment_error,
+            ) if options['enrich'] else None,
+        )
+        loop = asyncio.get_event_loop()
+        main_task = loop.create_task(self.run_subscription_manager())
+        try:
+            loop.run_until_complete(main_task)
+        except KeyboardInterrupt:
+            # Con Ctrl+C el supervisor también envía SIGTERM: no debe cortar este cierre
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            self.stdout.write(self.style.NOTICE('Interrupción detectada. Cerrando el gestor de suscripciones.'))
+            # El `finally` del bucle principal detiene los nodos y cierra el escritor
+            main_task.cancel()
+            try:
+                loop.run_until_complete(main_task)
+            except asyncio.CancelledError:
+                pass
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Un error inesperado ocurrió: {e}'))
+        finally:
+            if self.leases is not None:
+                # Liberar las redes para que otro worker las tome sin esperar a que venzan
+                self.leases.release_all()
+
+    # --- Modo multiproceso (--workers) ---
+
+    def run_workers(self, options):
+        """
+        Supervisor: lanza `--workers` procesos `run_suscriber --shard` y los relanza si
+        terminan. Cada proceso tiene su propio bucle de eventos y reclama redes con
+        leases en la BD, así que no hace falta ningún coordinador externo.
+        """
+        base_command = [
+            sys.executable, '-m', 'django', 'run_suscriber', '--shard',
+            f"--settings={settings.SETTINGS_MODULE}",
+            f"--verbosity={options['verbosity']}",
+            f"--batch-size={options['batch_size']}",
+            f"--flush-interval={options['flush_interval']}",
+            f"--queue-size={options['queue_size']}",
+            f"--reload-interval={options['reload_interval']}",
+            f"--lease-ttl={options['lease_ttl']}",
+        ]
+        if options['enrich']:
+            base_command.append('--enrich')
+        if options['archive_dir']:
+            # Cada worker escribe sólo los directorios de sus redes
+            base_command.append(f"--archive-dir={options['archive_dir']}")
+        self.stdout.write(self.style.SUCCESS(f"Iniciando {options['workers']} workers del suscriptor..."))
+
+        processes: dict[int, subprocess.Popen] = {}
+        try:
+            while True:
+                for index in range(options['workers']):
+                    process = processes.get(index)
+                    if process is not None and process.poll() is None:
+                        continue
+                    if process is not None:
+                        self.stdout.write(self.style.WARNING(
+                            f"El worker {index} (pid {process.pid}) terminó con código {process.returncode}. Relanzando..."
+                        ))
+                    metrics_port = options['metrics_port'] + index if options['metrics_port'] else 0
+                    stream_port = options['stream_port'] + index if options['stream_port'] else 0
+                    command = base_command + [f"--metrics-port={metrics_port}", f"--stream-port={stream_port}"]
+                    processes[index] = subprocess.Popen(command, cwd=settings.BASE_DIR)
+                time.sleep(5)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.NOTICE('Interrupción detectada. Deteniendo los workers.'))
+        finally:
+            for process in processes.values():
+                if process.poll() is None:
+                    process.terminate()
+            for process in processes.values():
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    # --- Reporte del escritor por lotes ---
+
+    def report_flush(self, batch_size: int, latency: float):
+        """Callback del EventLogWriter: informa tamaño y latencia de cada lote persistido."""
+        metrics.DB_WRITE_SECONDS.observe(latency)
+        metrics.DB_WRITTEN_EVENTS.inc(batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Lote guardado: {batch_size} logs en {latency * 1000:.1f} ms"
+        ))
+
+    def on_commit(self, event_logs: list, retractions: list):
+        """Se invoca con cada lote ya confirmado en la BD: lo reenvía a los paneles (SSE) y al archivo."""
+        if self.publisher is not None:
+            self.publisher.publish(event_logs, retractions)
+        if self.archive is not None:
+            try:
+                self.archive.write(event_logs, retractions)
+            except OSError as e:
+                self.stdout.write(self.style.ERROR(f"Error al archivar lote de {len(event_logs)} logs: {e}"))
+
+    def report_duplicate(self, event_log):
+        """Callback del EventLogWriter: un log retransmitido que ya se había recibido."""
+        node = self.nodes.get(event_log.network_id)
+        metrics.EVENTS_DEDUPLICATED.inc(network=node.network.name if node else event_log.network_id)
+
+    def report_enrichment_error(self, network: Network, error: Exception):
+        metrics.ENRICHMENT_ERRORS.inc(network=network.name)
+        self.stdout.write(self.style.WARNING(f"No se pudieron enriquecer logs de {network.name}: {error}"))
+
+    async def close_writer(self, writer_task: asyncio.Task):
+        """Persiste lo que quede en la cola, cierra las conexiones del enriquecimiento y vuelca el archivo."""
+        await self.writer.close(writer_task)
+        if self.writer.enricher is not None:
+            await self.writer.enricher.close()
+        if self.archive is not None:
+            self.archive.close()
+
+    def report_flush_error(self, error: Exception, batch_size: int):
+        metrics.DB_WRITE_ERRORS.inc()
+        self.stdout.write(self.style.ERROR(f"Error al guardar lote de {batch_size} logs en BD: {error}"))
+
+    def report_decode_error(self, sub: EventSubscription, log_receipt: LogReceipt, error: Exception):
+        self.stdout.write(self.style.WARNING(
+            f"Advertencia de decodificación en contrato {sub.deployed_contract.address}: Log no coincide con ABI de {sub.event_name}. Error: {error}"
+        ))
+
+    # --- Handler Asíncrono para Eventos de Logs ---
+
+    async def log_event_handler(self, handler_context: LogsSubscriptionContext) -> None:
+        """
+        Función que maneja un evento de log entrante del WebSocket.
+        El log llega por la suscripción multiplexada del nodo y se enruta con su DispatchTable.
+        """
+        log_receipt: LogReceipt = handler_context.result
+        
+        # Recuperar el nodo pasado en el contexto (web3 lo expone como atributo del contexto)
+        node: NodeState = getattr(handler_context, 'node', None)
+        if node is None:
+            self.stdout.write(self.style.ERROR("Error: Nodo no encontrado en el contexto del handler."))
+            return
+
+        # La tabla vigente del nodo (puede haberse reemplazado en caliente)
+        route = node.dispatch_table.resolve(log_receipt)
+        if route is None:
+            # Combinación dirección/topic que deja pasar el filtro unión pero que nadie pidió
+            return
+        db_subscription, event = route
+        metrics.EVENTS_RECEIVED.inc(network=node.network.name, subscription=db_subscription.pk, event=db_subscription.event_name)
+
+        try:
+            # 1. Decodificar el Log (decodificador precompilado de la versión del contrato)
+            started = time.perf_counter()
+            decoded_event = event.decode_log(log_receipt)
+            metrics.DECODE_SECONDS.observe(time.perf_counter() - started)
+            event_log = build_event_log(db_subscription, decoded_event, log_receipt)
+
+            # 2. Log retirado por una reorganización: sale del buffer o se borra de la BD
+            if log_receipt.get('removed'):
+                metrics.EVENTS_RETRACTED.inc(network=node.network.name, event=db_subscription.event_name)
+                self.stdout.write(self.style.WARNING(
+                    f"↩️ Evento retirado por reorganización: {db_subscription.event_name} en TX {log_receipt['transactionHash'].hex()[:10]}..."
+                ))
+                await node.sink.retract(event_log)
+                return
+
+            if self.log_each_event:
+                self.stdout.write(f"🔔 Evento Decodificado: {db_subscription.event_name} en TX {log_receipt['transactionHash'].hex()[:10]}...")
+
+            # 3. Encolar: en el buffer de confirmaciones de la red o directo a la escritura por lotes
+            await node.sink.put(event_log)
+
+        except (MismatchedABI, ValueError) as e:
+            self.report_decode_error(db_subscription, log_receipt, e)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error en el handler de evento: {e}"))
+
+    async def new_head_handler(self, handler_context: NewHeadsSubscriptionContext) -> None:
+        """
+        Cada bloque nuevo actualiza la cabeza conocida del nodo (para medir el retraso) y
+        libera del buffer los logs que ya tienen las confirmaciones de la red.
+        """
+        node: NodeState = getattr(handler_context, 'node', None)
+        if node is None:
+            return
+        node.head = handler_context.result['number']
+        if node.buffer is None:
+            return
+        try:
+            await node.buffer.advance(handler_context.result['number'])
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error al procesar un bloque nuevo en {node.network.name}: {e}"))
+
+    def report_invalid_subscription(self, sub: EventSubscription, error: Exception):
+        self.stdout.write(self.style.ERROR(
+            f"El evento '{sub.event_name}' no se encuentra en el ABI de {sub.deployed_contract.contract_version}. Omitiendo."
+        ))
+
+    # --- Bucle principal del Gestor de Suscripciones ---
+    
+    async def run_subscription_manager(self):
+        """
+        Bucle principal que inicializa la conexión WS, configura las suscripciones 
+        y mantiene el proceso escuchando. Con recarga en caliente activa, revisa
+        periódicamente si cambiaron las suscripciones y aplica sólo la diferencia.
+        """
+        self.stdout.write("Cargando suscripciones activas y datos de contrato...")
+        self.nodes: dict[int, NodeState] = {}
+
+        # El escritor corre como una tarea independiente que consume la cola de logs
+        writer_task = asyncio.create_task(self.writer.run())
+        metrics_runner = await self.start_metrics_server()
+        await self.start_publisher()
+        try:
+            fingerprint = await sync_to_async(get_subscriptions_fingerprint)()
+            subscriptions_by_network = await self.load_subscriptions()
+            await self.claim_networks(subscriptions_by_network)
+            await self.apply_subscriptions(self.owned_subscriptions(subscriptions_by_network))
+
+            if not self.reload_interval and self.leases is None:
+                if not self.nodes:
+                    self.stdout.write(self.style.WARNING("No se encontraron suscripciones activas y válidas. Terminando el proceso."))
+                    return
+                self.stdout.write(self.style.SUCCESS("Iniciando escucha concurrente en nodos..."))
+                # Ejecutar todos los bucles de escucha concurrentemente
+                await asyncio.gather(*(node.task for node in self.nodes.values()))
+                return
+
+            interval = self.reload_interval
+            if self.leases is not None:
+                # Los leases se renuevan varias veces antes de vencer
+                lease_interval = self.leases.ttl.total_seconds() / 3
+                interval = min(interval, lease_interval) if interval else lease_interval
+            self.stdout.write(self.style.SUCCESS(
+                f"Iniciando escucha concurrente en nodos (revisión de suscripciones cada {interval:g} s)..."
+            ))
+            while True:
+                await asyncio.sleep(interval)
+                changed = False
+                if self.reload_interval:
+                    # Una consulta agregada barata decide si hace falta recargar
+                    new_fingerprint = await sync_to_async(get_subscriptions_fingerprint)()
+                    if new_fingerprint != fingerprint:
+                        fingerprint = new_fingerprint
+                        changed = True
+                        self.stdout.write(self.style.NOTICE("🔄 Cambios en las suscripciones detectados. Aplicando..."))
+                        subscriptions_by_network = await self.load_subscriptions()
+
+                if await self.claim_networks(subscriptions_by_network) or changed:
+                    await self.apply_subscriptions(self.owned_subscriptions(subscriptions_by_network))
+        finally:
+            for node in self.nodes.values():
+                node.cancel()
+            # Nada más debe encolarse detrás de la marca de cierre del escritor
+            await asyncio.gather(*(task for node in self.nodes.values() for task in node.tasks()), return_exceptions=True)
+            await self.close_writer(writer_task)
+            if metrics_runner is not None:
+                await metrics_runner.cleanup()
+            if self.publisher is not None:
+                await self.publisher.close()
+
+    # --- Publicación de logs confirmados (stream SSE) ---
+
+    async def start_publisher(self):
+        """Abre el socket local al que se conectan los hubs SSE de los procesos web."""
+        if not self.stream_port:
+            return
+        publisher = EventPublisher(STREAM_HOST, self.stream_port)
+        try:
+            await publisher.start()
+        except OSError as e:
+            self.stdout.write(self.style.ERROR(f"No se pudo abrir el puerto del stream {STREAM_HOST}:{self.stream_port}: {e}"))
+            return
+        self.publisher = publisher
+        self.stdout.write(f"📡 Publicando logs confirmados en {STREAM_HOST}:{self.stream_port}")
+
+    # --- Métricas (Prometheus) ---
+
+    async def start_metrics_server(self):
+        """Expone las métricas del proceso en http://<EVENT_METRICS_HOST>:<puerto>/metrics."""
+        if not self.metrics_port:
+            return None
+        metrics.QUEUE_DEPTH.collect = lambda: [({}, self.writer.queue.qsize())]
+        metrics.BLOCK_LAG.collect = self.collect_block_lag
+        metrics.NODE_STATE.collect = self.collect_node_states
+
+        host = getattr(settings, 'EVENT_METRICS_HOST', '127.0.0.1')
+        try:
+            runner = await metrics.registry.serve(host, self.metrics_port)
+        except OSError as e:
+            self.stdout.write(self.style.ERROR(f"No se pudo abrir el puerto de métricas {host}:{self.metrics_port}: {e}"))
+            return None
+        self.stdout.write(f"📈 Métricas disponibles en http://{host}:{self.metrics_port}/metrics")
+        return runner
+
+    def collect_block_lag(self):
+        for node in list(self.nodes.values()):
+            last_block = self.writer.last_written_block.get(node.network.pk)
+            if node.head is not None and last_block is not None:
+                yield {'network': node.network.name}, max(node.head - last_block, 0)
+
+    def collect_node_states(self):
+        for node in list(self.nodes.values()):
+            for state in ConnectionState.values:
+                yield {'network': node.network.name, 'state': state}, int(node.state == state)
+
+    async def load_subscriptions(self) -> dict[Network, list[EventSubscription]]:
+        """Carga las suscripciones activas agrupadas por red (cada red es un nodo con su Network.wss_url)."""
+        active_subscriptions = await sync_to_async(list)(get_active_subscriptions())
+
+        subscriptions_by_network = {}
+        for sub in active_subscriptions:
+            network = sub.deployed_contract.network
+            if not network.wss_url:
+                self.stdout.write(self.style.WARNING(f"La red '{network.name}' no tiene URL WebSocket (wss_url). Omitiendo suscripción para {sub}."))
+                continue
+            subscriptions_by_network.setdefault(network, []).append(sub)
+        return subscriptions_by_network
+
+    async def claim_networks(self, subscriptions_by_network: dict[Network, list[EventSubscription]]) -> bool:
+        """
+        En modo --shard renueva los leases del proceso y reclama o libera redes según
+        su cuota. Devuelve True si cambió el conjunto de redes propias.
+        """
+        if self.leases is None:
+            return False
+        try:
+            owned = await sync_to_async(self.leases.rebalance)([network.pk for network in subscriptions_by_network])
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error al renovar los leases de {self.leases.name}: {e}"))
+            return False
+
+        if owned == self.owned_networks:
+            return False
+        names = {network.pk: network.name for network in subscriptions_by_network}
+        acquired = [names[network_id] for network_id in owned - self.owned_networks]
+        released = [names.get(network_id, network_id) for network_id in self.owned_networks - owned]
+        self.stdout.write(self.style.NOTICE(
+            f"🔑 Worker {self.leases.name}: +{acquired or '[]'} / -{released or '[]'} redes."
+        ))
+        self.owned_networks = owned
+        return True
+
+    def owned_subscriptions(self, subscriptions_by_network: dict[Network, list[EventSubscription]]) -> dict[Network, list[EventSubscription]]:
+        """Las suscripciones que escucha este proceso: todas, o sólo las de sus redes en modo --shard."""
+        if self.leases is None:
+            return subscriptions_by_network
+        return {network: subs for network, subs in subscriptions_by_network.items() if network.pk in self.owned_networks}
+
+    async def apply_subscriptions(self, subscriptions_by_network: dict[Network, list[EventSubscription]]):
+        """
+        Lleva los nodos al estado deseado: arranca los nuevos, detiene los que se quedaron
+        sin suscripciones y, en los demás, actualiza el filtro sobre la conexión existente.
+        """
+        wanted = {}
+        for network, subs_list in subscriptions_by_network.items():
+            dispatch_table = DispatchTable(subs_list, on_invalid=self.report_invalid_subscription)
+            if dispatch_table:
+                wanted[network.pk] = (network, dispatch_table)
+            else:
+                self.stdout.write(self.style.WARNING(f"No hay suscripciones válidas para el nodo {network.wss_url}."))
+
+        for network_id in list(self.nodes):
+            node = self.nodes[network_id]
+            network = wanted[network_id][0] if network_id in wanted else None
+            if (network is None or network.wss_url != node.network.wss_url
+                    or network.confirmation_depth != node.network.confirmation_depth):
+                self.stdout.write(self.style.NOTICE(f"Deteniendo nodo {node.network.name}."))
+                node.cancel()
+                del self.nodes[network_id]
+
+        for network_id, (network, dispatch_table) in wanted.items():
+            node = self.nodes.get(network_id)
+            if node is None:
+                self.stdout.write(f"Conectando a nodo WS: {network.wss_url} para {len(dispatch_table)} suscripciones.")
+                node = NodeState(network, dispatch_table, self.writer)
+                node.task = asyncio.create_task(self.setup_node_subscriptions(node))
+                self.nodes[network_id] = node
+            else:
+                await self.update_node(node, dispatch_table)
+
+    async def update_node(self, node: 'NodeState', dispatch_table: DispatchTable):
+        """
+        Aplica una nueva tabla de despacho a un nodo sin reconectar. Si la unión de
+        direcciones/topics no cambió basta con reemplazar la tabla; si cambió, se abre la
+        nueva suscripción `logs` antes de cerrar la anterior sobre el mismo WebSocket.
+        Una suscripción editada (p. ej. otro `event_name`) cuenta como cambio aunque
+        conserve su id.
+        """
+        previous_versions = {sub.pk: sub.updated_at for sub in node.dispatch_table.subscriptions}
+        added = [sub for sub in dispatch_table.subscriptions if sub.pk not in previous_versions]
+        edited = [
+            sub for sub in dispatch_table.subscriptions
+            if sub.pk in previous_versions and sub.updated_at != previous_versions[sub.pk]
+        ]
+        removed = len(previous_versions.keys() - {sub.pk for sub in dispatch_table.subscriptions})
+        routes_changed = dispatch_table.route_map() != node.dispatch_table.route_map()
+        if not added and not edited and not removed and not routes_changed:
+            return
+
+        filter_changed = (
+            dispatch_table.addresses != node.dispatch_table.addresses
+            or dispatch_table.topics != node.dispatch_table.topics
+        )
+        node.dispatch_table = dispatch_table
+        self.stdout.write(self.style.SUCCESS(
+            f"🔄 Nodo {node.network.name}: +{len(added)} / ~{len(edited)} / -{removed} suscripciones"
+            f"{' (filtro actualizado)' if filter_changed else ''}."
+        ))
+
+        if node.w3 is None:
+            # Sin conexión activa: la próxima conexión ya usará la nueva tabla
+            return
+
+        if filter_changed:
+            previous_subscription = node.logs_subscription
+            await self.subscribe_node(node)
+            if previous_subscription is not None:
+                await node.w3.subscription_manager.unsubscribe(previous_subscription)
+
+        if added or edited:
+            # Recuperar lo que emitieron las suscripciones nuevas (o editadas) desde el cursor de la red
+            task = asyncio.create_task(self.backfill_added_subscriptions(node, added + edited))
+            node.backfill_tasks.add(task)
+            task.add_done_callback(functools.partial(self.backfill_done, node))
+
+    async def subscribe_node(self, node: 'NodeState'):
+        """Abre UNA sola suscripción eth_subscribe("logs") filtrada por la unión de direcciones y topics."""
+        node.generation += 1
+        logs_subscription = LogsSubscription(
+            label=f"logs@{node.network.name}#{node.generation}",
+            address=node.dispatch_table.addresses,
+            topics=node.dispatch_table.logs_filter_topics(),
+            handler=self.log_event_handler,
+            handler_context={"node": node},
+            parallelize=True # Permite que las operaciones de DB no bloqueen la recepción de otros eventos
+        )
+        await node.w3.subscription_manager.subscribe(logs_subscription)
+        node.logs_subscription = logs_subscription
+
+    async def setup_node_subscriptions(self, node: 'NodeState'):
+        """
+        Configura la conexión WebSocket y la suscripción multiplexada para un nodo específico.
+        Si la conexión falla o se cierra, reintenta según la ReconnectPolicy del nodo
+        (backoff exponencial con jitter y circuit breaker) y publica cada transición en NodeHealth.
+        """
+        network = node.network
+        ws_url = network.wss_url
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True: # Bucle infinito para reintentar la conexión si falla
+                connected_at = None
+                try:
+                    await self.record_node_state(node, ConnectionState.CONNECTING)
+                    # Inicializar AsyncWeb3 para este nodo. Un solo intento por conexión: los
+                    # reintentos (con jitter) los gobierna la ReconnectPolicy del nodo, no web3.
+                    async with AsyncWeb3(WebSocketProvider(ws_url, max_connection_retries=1)) as w3:
+                        node.w3 = w3
+                        # Lo que quedó en el buffer de una conexión anterior lo vuelve a traer el relleno
+                        node.buffer = ConfirmationBuffer(network.pk, network.confirmation_depth, self.writer) if network.confirmation_depth else None
+                        try:
+                            # Los logs en vivo no avanzan el cursor hasta que se rellene el hueco
+                            node.hold_generation = self.writer.hold(network.pk)
+
+                            await self.subscribe_node(node)
+                            # Una sola suscripción newHeads por nodo: mueve el buffer de confirmaciones
+                            # y da la cabeza de la cadena para la métrica de retraso
+                            await w3.subscription_manager.subscribe(NewHeadsSubscription(
+                                label=f"newHeads@{network.name}",
+                                handler=self.new_head_handler,
+                                handler_context={"node": node},
+                            ))
+                            connected_at = loop.time()
+                            await self.record_node_state(node, ConnectionState.CONNECTED, connected_at=timezone.now(), next_attempt_at=None)
+                            self.stdout.write(self.style.SUCCESS(
+                                f"🎉 Suscrito exitosamente a {len(node.dispatch_table)} eventos en el nodo {network.name}."
+                            ))
+
+                            # Iniciar el manejo de las suscripciones (bloquea el bucle) mientras se
+                            # recupera, en paralelo, lo ocurrido desde el último bloque procesado.
+                            # run_forever: la suscripción puede reemplazarse en caliente sin cortar el bucle.
+                            await asyncio.gather(
+                                w3.subscription_manager.handle_subscriptions(run_forever=True),
+                                self.fill_gap(node),
+                            )
+                        finally:
+                            node.w3 = None
+                            node.logs_subscription = None
+                            node.buffer = None
+
+                    # Si handle_subscriptions termina (raro, pero posible si se cierran los sockets)
+                    raise ConnectionError("el nodo cerró la conexión")
+
+                except Exception as e:
+                    uptime = loop.time() - connected_at if connected_at is not None else 0
+                    state, delay = node.reconnect_policy.record_failure(uptime)
+                    metrics.RECONNECTS.inc(network=network.name)
+                    self.stdout.write(self.style.ERROR(f"Error en el bucle del nodo {ws_url}: {e}"))
+                    if state == ConnectionState.OPEN_CIRCUIT:
+                        self.stdout.write(self.style.WARNING(
+                            f"⛔ Circuito abierto para {network.name} tras {node.reconnect_policy.failures} fallos seguidos. "
+                            f"Intento de prueba en {delay:.0f} segundos..."
+                        ))
+                    else:
+                        self.stdout.write(self.style.NOTICE(f"Reintentando la conexión a {ws_url} en {delay:.1f} segundos..."))
+                    await self.record_node_state(
+                        node, state,
+                        consecutive_failures=node.reconnect_policy.failures,
+                        last_error=str(e)[:1000],
+                        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+                    )
+                    await asyncio.sleep(delay)
+                    # El bucle while True asegura el reintento
+        except asyncio.CancelledError:
+            # Nodo detenido (recarga en caliente, lease liberado o cierre del proceso)
+            await self.record_node_state(node, ConnectionState.STOPPED, next_attempt_at=None)
+            raise
+
+    async def record_node_state(self, node: 'NodeState', state: str, **fields):
+        """Publica el estado de conexión del nodo en NodeHealth (sin interrumpir el nodo si la BD falla)."""
+        node.state = state
+        try:
+            await sync_to_async(NodeHealth.objects.update_or_create)(
+                network_id=node.network.pk,
+                defaults={'state': state, 'worker': self.worker_name, **fields},
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"No se pudo registrar el estado del nodo {node.network.name}: {e}"))
+
+    async def fill_gap(self, node: 'NodeState'):
+        """
+        Recupera los logs entre el BlockCursor de la red y la cabeza de la cadena usando
+        la misma conexión WebSocket. La suscripción en vivo ya está activa, así que los
+        bloques que se solapen los descarta la restricción única al escribir.
+        """
+        network = node.network
+        # Generación de la retención que este relleno cierra (puede abrirse otra mientras corre)
+        generation = node.hold_generation
+        client = Web3LogsClient(node.w3)
+        head = await client.block_number()
+        node.head = max(node.head or 0, head)
+
+        cursor = await sync_to_async(BlockCursor.objects.filter(network=network).first)()
+        if cursor is None:
+            self.stdout.write(self.style.NOTICE(
+                f"{network.name} no tiene cursor de bloques: se escucha desde el bloque {head}. "
+                f"Usa 'backfill_events' para recuperar el historial anterior."
+            ))
+        else:
+            self.stdout.write(f"⏪ Rellenando bloques {cursor.last_block}-{head} de {network.name}...")
+            backfiller = LogBackfiller(client, node.sink, on_decode_error=self.report_decode_error)
+            await backfiller.backfill(node.dispatch_table.subscriptions, cursor.last_block, head)
+
+        if node.buffer is not None:
+            # Lo recuperado con menos confirmaciones de las exigidas queda retenido en el buffer
+            await node.buffer.advance(head)
+            head = node.buffer.confirmed_block(head)
+
+        # Se encola detrás de los logs recuperados: el cursor avanza cuando ya están guardados
+        # Sólo esta marca (de la retención de esta conexión) libera la red retenida
+        await self.writer.put(CursorCheckpoint(network.pk, head, generation, release=True))
+
+    def refill_held_network(self, network_id: int, generation: int):
+        """
+        Callback del EventLogWriter: un lote perdido retuvo la red. Con la conexión
+        activa se vuelve a rellenar desde el cursor en ese momento, y su marca libera la
+        retención (sin ella el cursor quedaría congelado hasta una reconexión).
+        """
+        node = self.nodes.get(network_id)
+        if node is None or node.w3 is None:
+            # Sin conexión: la próxima abre su propia retención y la rellena
+            return
+        node.hold_generation = generation
+        self.stdout.write(self.style.WARNING(f"⏪ Lote perdido en {node.network.name}: se rellena de nuevo desde el cursor."))
+        task = asyncio.create_task(self.fill_gap(node))
+        node.backfill_tasks.add(task)
+        task.add_done_callback(functools.partial(self.backfill_done, node))
+
+    async def backfill_added_subscriptions(self, node: 'NodeState', added: list[EventSubscription]):
+        """Recupera, para suscripciones añadidas (o editadas) en caliente, los logs desde el cursor de la red hasta la cabeza."""
+        cursor = await sync_to_async(BlockCursor.objects.filter(network=node.network).first)()
+        if cursor is None or node.w3 is None:
+            return
+        client = Web3LogsClient(node.w3)
+        head = await client.block_number()
+        backfiller = LogBackfiller(client, node.sink, on_decode_error=self.report_decode_error)
+        await backfiller.backfill(added, cursor.last_block, head)
+
+    def backfill_done(self, node: 'NodeState', task: asyncio.Task):
+        """Callback de las recuperaciones en segundo plano del nodo: suelta la referencia e informa si fallaron."""
+        node.backfill_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.stdout.write(self.style.ERROR(f"Error al recuperar logs en {node.network.name}: {task.exception()}"))
+
+
+def raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class NodeState:
+    """
+    Estado mutable de un nodo (una red): tabla de despacho vigente y, mientras hay
+    conexión, la instancia AsyncWeb3, la suscripción `logs` activas y, si la red exige
+    confirmaciones, su buffer. El handler lee la tabla desde aquí, por lo que
+    reemplazarla surte efecto de inmediato.
+    """
+
+    def __init__(self, network: Network, dispatch_table: DispatchTable, writer: EventLogWriter):
+        self.network = network
+        self.dispatch_table = dispatch_table
+        self.writer = writer
+        self.w3 = None
+        self.logs_subscription = None
+        self.generation = 0
+        # Generación de la retención del cursor abierta al conectar (ver EventLogWriter.hold)
+        self.hold_generation = 0
+        self.task = None
+        # Recuperaciones en segundo plano (suscripciones añadidas en caliente o relleno tras
+        # un lote perdido): se guarda la referencia para que no las recolecte el GC y para
+        # cancelarlas al detener el nodo
+        self.backfill_tasks: set[asyncio.Task] = set()
+        self.buffer: ConfirmationBuffer | None = None
+        self.reconnect_policy = ReconnectPolicy()
+        self.state = ConnectionState.CONNECTING
+        # Última cabeza de la cadena vista por newHeads (o al rellenar el hueco)
+        self.head: int | None = None
+
+    def tasks(self) -> list[asyncio.Task]:
+        """Tarea del bucle de conexión y recuperaciones en curso del nodo."""
+        return [self.task, *self.backfill_tasks]
+
+    def cancel(self):
+        """Detiene el nodo: su bucle de conexión y las recuperaciones en curso."""
+        for task in self.tasks():
+            task.cancel()
+
+    @property
+    def sink(self):
+        """Destino de los logs del nodo: el buffer de confirmaciones o directamente el escritor."""
+        return self.buffer if self.buffer is not None else self.writer
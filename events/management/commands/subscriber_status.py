@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from contractRegistry.models import Network
+from events.models import ConnectionState
+
+STATE_STYLES = {
+    ConnectionState.CONNECTED: 'SUCCESS',
+    ConnectionState.CONNECTING: 'NOTICE',
+    ConnectionState.BACKING_OFF: 'WARNING',
+    ConnectionState.OPEN_CIRCUIT: 'ERROR',
+    ConnectionState.STOPPED: 'NOTICE',
+}
+
+
+class Command(BaseCommand):
+    help = 'Muestra el estado de conexión de cada nodo del suscriptor de eventos (NodeHealth), su lease y su cursor.'
+
+    def handle(self, *args, **options):
+        networks = Network.objects.exclude(wss_url__isnull=True).exclude(wss_url='').select_related(
+            'node_health', 'lease', 'block_cursor'
+        ).order_by('name')
+
+        if not networks:
+            self.stdout.write(self.style.WARNING("No hay redes con URL WebSocket configurada."))
+            return
+
+        now = timezone.now()
+        for network in networks:
+            health = getattr(network, 'node_health', None)
+            lease = getattr(network, 'lease', None)
+            cursor = getattr(network, 'block_cursor', None)
+
+            if health is None:
+                self.stdout.write(f"{network.name}: sin datos (el suscriptor aún no la ha escuchado)")
+                continue
+
+            style = getattr(self.style, STATE_STYLES.get(health.state, 'NOTICE'))
+            self.stdout.write(style(f"{network.name}: {health.get_state_display()}") + f"  [worker {health.worker or '-'}]")
+            if health.state == ConnectionState.CONNECTED and health.connected_at:
+                self.stdout.write(f"    conectado desde {health.connected_at:%Y-%m-%d %H:%M:%S}")
+            if health.next_attempt_at and health.next_attempt_at > now:
+                self.stdout.write(f"    próximo intento en {(health.next_attempt_at - now).total_seconds():.0f} s")
+            if health.consecutive_failures:
+                self.stdout.write(f"    fallos consecutivos: {health.consecutive_failures}")
+            if health.last_error:
+                self.stdout.write(f"    último error: {health.last_error}")
+            if lease is not None and lease.owner:
+                vigente = 'vigente' if lease.expires_at > now else 'vencido'
+                self.stdout.write(f"    lease: {lease.owner} ({vigente})")
+            if cursor is not None:
+                self.stdout.write(f"    último bloque procesado: {cursor.last_block}")
@@ -0,0 +1,199 @@
+import bisect
+import math
+from threading import Lock
+
+from aiohttp import web
+
+
+class Metric:
+    """Base de las métricas en memoria: nombre, ayuda, tipo Prometheus y etiquetas."""
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """Devuelve (sufijo, etiquetas, valor) para cada serie de la métrica."""
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [('', dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Gauge(Metric):
+    """
+    Valor instantáneo. Puede fijarse con `set` o calcularse al momento de cada
+    lectura con `collect`, una función que devuelve pares (etiquetas, valor).
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), collect=None):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self.collect = collect
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self):
+        if self.collect is not None:
+            return [('', labels, value) for labels, value in self.collect()]
+        with self._lock:
+            items = list(self._values.items())
+        return [('', dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Por serie: [conteos por bucket (no acumulados)..., +Inf], suma y total
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._series.items()]
+        samples = []
+        for key, counts, total, count in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', {**labels, 'le': bound}, cumulative))
+            samples.append(('_sum', labels, total))
+            samples.append(('_count', labels, count))
+        return samples
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{escape_label(format_value(value) if isinstance(value, float) else value)}"' for name, value in labels.items())
+    return '{' + pairs + '}'
+
+
+def escape_label(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def format_value(value) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+class MetricsRegistry:
+    """Conjunto de métricas del proceso, exportable en el formato de texto de Prometheus."""
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    async def serve(self, host: str, port: int) -> web.AppRunner:
+        """Levanta un servidor HTTP mínimo con GET /metrics. Devuelve el runner para cerrarlo."""
+        async def metrics_view(request):
+            return web.Response(text=self.render(), content_type='text/plain', charset='utf-8',
+                                headers={'X-Content-Type-Options': 'nosniff'})
+
+        app = web.Application()
+        app.router.add_get('/metrics', metrics_view)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+registry = MetricsRegistry()
+
+# --- Métricas del suscriptor de eventos ---
+
+EVENTS_RECEIVED = registry.register(Counter(
+    'subscriber_events_received_total', 'Logs recibidos por suscripción.', ('network', 'subscription', 'event'),
+))
+EVENTS_RETRACTED = registry.register(Counter(
+    'subscriber_events_retracted_total', 'Logs retirados por reorganizaciones.', ('network', 'event'),
+))
+EVENTS_DEDUPLICATED = registry.register(Counter(
+    'subscriber_events_deduplicated_total', 'Logs retransmitidos descartados por la caché de claves recientes.', ('network',),
+))
+DECODE_SECONDS = registry.register(Histogram(
+    'subscriber_decode_seconds', 'Tiempo de decodificación de un log.',
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01),
+))
+DB_WRITE_SECONDS = registry.register(Histogram(
+    'subscriber_db_write_seconds', 'Tiempo de escritura de un lote en la base de datos.',
+))
+DB_WRITTEN_EVENTS = registry.register(Counter(
+    'subscriber_db_written_events_total', 'Logs escritos en la base de datos.',
+))
+DB_WRITE_ERRORS = registry.register(Counter(
+    'subscriber_db_write_errors_total', 'Intentos de escritura de lotes fallidos.',
+))
+ENRICHMENT_ERRORS = registry.register(Counter(
+    'subscriber_enrichment_errors_total', 'Lotes o respuestas del enriquecimiento (bloques y recibos) fallidos.', ('network',),
+))
+RECONNECTS = registry.register(Counter(
+    'subscriber_reconnects_total', 'Reconexiones de nodos WebSocket tras un fallo.', ('network',),
+))
+
+# Calculadas en cada lectura por el proceso suscriptor (ver `collect`)
+QUEUE_DEPTH = registry.register(Gauge(
+    'subscriber_queue_depth', 'Elementos en la cola del escritor por lotes.',
+))
+BLOCK_LAG = registry.register(Gauge(
+    'subscriber_block_lag', 'Bloques entre la cabeza de la cadena y el último bloque guardado.', ('network',),
+))
+NODE_STATE = registry.register(Gauge(
+    'subscriber_node_state', 'Estado de la conexión de cada nodo (1 en el estado actual).', ('network', 'state'),
+))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0006_network_wss_url'),
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_block', models.PositiveBigIntegerField(verbose_name='Último Bloque Procesado')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+                ('network', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='block_cursor', to='contractRegistry.network', verbose_name='Red')),
+            ],
+            options={
+                'verbose_name': 'Cursor de Bloques',
+                'verbose_name_plural': 'Cursores de Bloques',
+            },
+        ),
+    ]
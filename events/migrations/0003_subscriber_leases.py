@@ -0,0 +1,42 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0007_alter_network_wss_url'),
+        ('events', '0002_blockcursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubscriberWorker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Identificador del Worker')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Inicio')),
+                ('heartbeat_at', models.DateTimeField(verbose_name='Último Latido')),
+            ],
+            options={
+                'verbose_name': 'Worker del Suscriptor',
+                'verbose_name_plural': 'Workers del Suscriptor',
+            },
+        ),
+        migrations.CreateModel(
+            name='NetworkLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(blank=True, default='', max_length=100, verbose_name='Worker Dueño')),
+                ('acquired_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Adquisición')),
+                ('expires_at', models.DateTimeField(verbose_name='Vencimiento')),
+                ('network', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='lease', to='contractRegistry.network', verbose_name='Red')),
+            ],
+            options={
+                'verbose_name': 'Arrendamiento de Red',
+                'verbose_name_plural': 'Arrendamientos de Redes',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0008_network_confirmation_depth'),
+        ('events', '0003_subscriber_leases'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeHealth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('state', models.CharField(choices=[('CONNECTING', 'Conectando'), ('CONNECTED', 'Conectado'), ('BACKING_OFF', 'Esperando para Reintentar'), ('OPEN_CIRCUIT', 'Circuito Abierto'), ('STOPPED', 'Detenido')], default='CONNECTING', max_length=20, verbose_name='Estado')),
+                ('worker', models.CharField(blank=True, default='', max_length=100, verbose_name='Worker')),
+                ('consecutive_failures', models.PositiveIntegerField(default=0, verbose_name='Fallos Consecutivos')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Último Error')),
+                ('connected_at', models.DateTimeField(blank=True, null=True, verbose_name='Conectado Desde')),
+                ('next_attempt_at', models.DateTimeField(blank=True, null=True, verbose_name='Próximo Intento')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+                ('network', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='node_health', to='contractRegistry.network', verbose_name='Red')),
+            ],
+            options={
+                'verbose_name': 'Salud del Nodo',
+                'verbose_name_plural': 'Salud de los Nodos',
+            },
+        ),
+    ]
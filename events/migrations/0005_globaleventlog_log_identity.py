@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0008_network_confirmation_depth'),
+        ('events', '0004_nodehealth'),
+    ]
+
+    operations = [
+        # Nula hasta completarla en 0006; la restricción NOT NULL y la única llegan en
+        # 0007, en otra transacción (PostgreSQL no permite alterar una tabla con
+        # triggers de FK pendientes de la actualización de datos)
+        migrations.AddField(
+            model_name='globaleventlog',
+            name='network',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='event_logs', to='contractRegistry.network', verbose_name='Red'),
+        ),
+        migrations.AddField(
+            model_name='globaleventlog',
+            name='log_index',
+            field=models.PositiveIntegerField(default=0, verbose_name='Índice del Log'),
+        ),
+        migrations.AlterField(
+            model_name='globaleventlog',
+            name='transaction_hash',
+            field=models.CharField(max_length=66, verbose_name='Hash de Transacción'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def fill_network(apps, schema_editor):
+    """Los logs existentes heredan la red de su contrato desplegado."""
+    GlobalEventLog = apps.get_model('events', 'GlobalEventLog')
+    DeployedContract = apps.get_model('contractRegistry', 'DeployedContract')
+    for deployed_contract_id, network_id in DeployedContract.objects.values_list('id', 'network_id'):
+        GlobalEventLog.objects.filter(deployed_contract_id=deployed_contract_id).update(network_id=network_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_globaleventlog_log_identity'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_network, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_globaleventlog_fill_network'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='globaleventlog',
+            name='network',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_logs', to='contractRegistry.network', verbose_name='Red'),
+        ),
+        migrations.AddConstraint(
+            model_name='globaleventlog',
+            constraint=models.UniqueConstraint(fields=('network', 'transaction_hash', 'log_index'), name='unique_event_log_per_network'),
+        ),
+    ]
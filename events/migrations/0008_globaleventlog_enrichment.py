@@ -0,0 +1,28 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_globaleventlog_network_not_null'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='globaleventlog',
+            name='block_timestamp',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fecha del Bloque'),
+        ),
+        migrations.AddField(
+            model_name='globaleventlog',
+            name='gas_used',
+            field=models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Gas Usado'),
+        ),
+        migrations.AddField(
+            model_name='globaleventlog',
+            name='tx_from',
+            field=models.CharField(blank=True, default='', max_length=42, verbose_name='Emisor de la Transacción'),
+        ),
+    ]
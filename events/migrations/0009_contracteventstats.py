@@ -0,0 +1,52 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def compute_stats(apps, schema_editor):
+    """Estadísticas iniciales a partir de los logs ya guardados."""
+    GlobalEventLog = apps.get_model('events', 'GlobalEventLog')
+    ContractEventStats = apps.get_model('events', 'ContractEventStats')
+    totals = {}
+    for contract_id, event_name, event_data in GlobalEventLog.objects.values_list('deployed_contract_id', 'event_name', 'event_data').iterator():
+        entry = totals.setdefault((contract_id, event_name), [0, {}])
+        entry[0] += 1
+        for name, value in (event_data or {}).get('args', {}).items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                entry[1][name] = entry[1].get(name, 0) + value
+    ContractEventStats.objects.bulk_create([
+        ContractEventStats(
+            deployed_contract_id=contract_id, event_name=event_name, event_count=count,
+            sums={name: str(value) for name, value in sums.items()},
+        )
+        for (contract_id, event_name), (count, sums) in totals.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0008_network_confirmation_depth'),
+        ('events', '0008_globaleventlog_enrichment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContractEventStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_name', models.CharField(max_length=100, verbose_name='Nombre del Evento')),
+                ('event_count', models.PositiveBigIntegerField(default=0, verbose_name='Cantidad de Eventos')),
+                ('sums', models.JSONField(default=dict, verbose_name='Sumas por Argumento')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Fecha de Actualización')),
+                ('deployed_contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_stats', to='contractRegistry.deployedcontract', verbose_name='Instancia de Contrato Desplegado')),
+            ],
+            options={
+                'verbose_name': 'Estadística de Eventos',
+                'verbose_name_plural': 'Estadísticas de Eventos',
+                'unique_together': {('deployed_contract', 'event_name')},
+            },
+        ),
+        migrations.RunPython(compute_stats, migrations.RunPython.noop),
+    ]
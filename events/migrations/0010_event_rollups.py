@@ -0,0 +1,81 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+from datetime import timezone as dt_timezone
+
+
+def compute_rollups(apps, schema_editor):
+    """Acumulados iniciales por hora y por día a partir de los logs ya guardados."""
+    GlobalEventLog = apps.get_model('events', 'GlobalEventLog')
+    periods = {
+        'HourlyEventRollup': lambda moment: moment.replace(minute=0, second=0, microsecond=0),
+        'DailyEventRollup': lambda moment: moment.replace(hour=0, minute=0, second=0, microsecond=0),
+    }
+    totals = {model_name: {} for model_name in periods}
+    rows = GlobalEventLog.objects.values_list('deployed_contract_id', 'event_name', 'event_data', 'block_timestamp', 'timestamp')
+    for contract_id, event_name, event_data, block_timestamp, timestamp in rows.iterator():
+        moment = (block_timestamp or timestamp).astimezone(dt_timezone.utc)
+        for model_name, truncate in periods.items():
+            entry = totals[model_name].setdefault((contract_id, event_name, truncate(moment)), [0, {}])
+            entry[0] += 1
+            for name, value in (event_data or {}).get('args', {}).items():
+                if isinstance(value, int) and not isinstance(value, bool):
+                    entry[1][name] = entry[1].get(name, 0) + value
+    for model_name, buckets in totals.items():
+        model = apps.get_model('events', model_name)
+        model.objects.bulk_create([
+            model(
+                deployed_contract_id=contract_id, event_name=event_name, bucket=bucket, event_count=count,
+                sums={name: str(value) for name, value in sums.items()},
+            )
+            for (contract_id, event_name, bucket), (count, sums) in buckets.items()
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0008_network_confirmation_depth'),
+        ('events', '0009_contracteventstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HourlyEventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_name', models.CharField(max_length=100, verbose_name='Nombre del Evento')),
+                ('bucket', models.DateTimeField(verbose_name='Inicio del Intervalo')),
+                ('event_count', models.PositiveBigIntegerField(default=0, verbose_name='Cantidad de Eventos')),
+                ('sums', models.JSONField(default=dict, verbose_name='Sumas por Argumento')),
+                ('deployed_contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contractRegistry.deployedcontract', verbose_name='Instancia de Contrato Desplegado')),
+            ],
+            options={
+                'verbose_name': 'Acumulado Horario de Eventos',
+                'verbose_name_plural': 'Acumulados Horarios de Eventos',
+                'ordering': ['bucket'],
+                'abstract': False,
+                'unique_together': {('deployed_contract', 'event_name', 'bucket')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyEventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_name', models.CharField(max_length=100, verbose_name='Nombre del Evento')),
+                ('bucket', models.DateTimeField(verbose_name='Inicio del Intervalo')),
+                ('event_count', models.PositiveBigIntegerField(default=0, verbose_name='Cantidad de Eventos')),
+                ('sums', models.JSONField(default=dict, verbose_name='Sumas por Argumento')),
+                ('deployed_contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contractRegistry.deployedcontract', verbose_name='Instancia de Contrato Desplegado')),
+            ],
+            options={
+                'verbose_name': 'Acumulado Diario de Eventos',
+                'verbose_name_plural': 'Acumulados Diarios de Eventos',
+                'ordering': ['bucket'],
+                'abstract': False,
+                'unique_together': {('deployed_contract', 'event_name', 'bucket')},
+            },
+        ),
+        migrations.RunPython(compute_rollups, migrations.RunPython.noop),
+    ]
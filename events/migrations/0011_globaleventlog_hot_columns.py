@@ -0,0 +1,43 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_event_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='globaleventlog',
+            name='arg_address',
+            field=models.CharField(blank=True, default='', max_length=42, verbose_name='Dirección (argumento promovido)'),
+        ),
+        migrations.AddField(
+            model_name='globaleventlog',
+            name='arg_amount',
+            field=models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True, verbose_name='Monto (argumento promovido)'),
+        ),
+        migrations.AddIndex(
+            model_name='globaleventlog',
+            index=models.Index(fields=['deployed_contract', '-timestamp'], name='eventlog_contract_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='globaleventlog',
+            index=models.Index(fields=['deployed_contract', 'event_name', '-timestamp'], name='eventlog_contract_evts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='globaleventlog',
+            index=models.Index(fields=['deployed_contract', 'event_name', '-block_number', '-log_index'], name='eventlog_contract_blk_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='globaleventlog',
+            index=models.Index(fields=['deployed_contract', 'event_name', 'arg_amount'], name='eventlog_event_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='globaleventlog',
+            index=models.Index(condition=models.Q(('arg_address', ''), _negated=True), fields=['arg_address', 'deployed_contract'], name='eventlog_address_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contractRegistry', '0008_network_confirmation_depth'),
+        ('events', '0011_globaleventlog_hot_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEventRange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_block', models.PositiveBigIntegerField(verbose_name='Primer Bloque')),
+                ('to_block', models.PositiveBigIntegerField(verbose_name='Último Bloque')),
+                ('log_count', models.PositiveIntegerField(verbose_name='Logs Archivados')),
+                ('archive_dir', models.CharField(max_length=255, verbose_name='Directorio del Archivo')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Archivado')),
+                ('deployed_contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_ranges', to='contractRegistry.deployedcontract', verbose_name='Instancia de Contrato Desplegado')),
+            ],
+            options={
+                'verbose_name': 'Rango de Eventos Archivado',
+                'verbose_name_plural': 'Rangos de Eventos Archivados',
+                'ordering': ['deployed_contract', 'from_block'],
+            },
+        ),
+    ]
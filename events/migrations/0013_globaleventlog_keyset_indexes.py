@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_archivedeventrange'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='globaleventlog',
+            index=models.Index(fields=['deployed_contract', 'block_number', 'log_index', 'id'], name='eventlog_contract_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='globaleventlog',
+            index=models.Index(fields=['block_number', 'log_index', 'id'], name='eventlog_keyset_idx'),
+        ),
+    ]
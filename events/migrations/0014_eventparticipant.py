@@ -0,0 +1,29 @@
+# Generated by Django 4.2.25 on 2026-10-17 11:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_globaleventlog_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=42, verbose_name='Dirección')),
+                ('arg_name', models.CharField(max_length=100, verbose_name='Argumento')),
+                ('event_log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='events.globaleventlog', verbose_name='Log de Evento')),
+            ],
+            options={
+                'verbose_name': 'Participante de Evento',
+                'verbose_name_plural': 'Participantes de Eventos',
+                'indexes': [models.Index(fields=['address', 'event_log'], name='participant_address_idx')],
+                'unique_together': {('event_log', 'arg_name', 'address')},
+            },
+        ),
+    ]
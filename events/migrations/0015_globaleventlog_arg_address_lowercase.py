@@ -0,0 +1,19 @@
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def lowercase_arg_address(apps, schema_editor):
+    """Pasa a minúsculas las direcciones promovidas ya guardadas (se comparaban con checksum)."""
+    GlobalEventLog = apps.get_model('events', 'GlobalEventLog')
+    GlobalEventLog.objects.exclude(arg_address='').update(arg_address=Lower('arg_address'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0014_eventparticipant'),
+    ]
+
+    operations = [
+        migrations.RunPython(lowercase_arg_address, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
-from contractRegistry.models import DeployedContract 
+from django.db.models import Q
+from contractRegistry.models import DeployedContract, Network
 # Create your models here.
 
 class GlobalEventLog(models.Model):
@@ -9,7 +10,16 @@ class GlobalEventLog(models.Model):
     Este modelo permite a las tareas de fondo guardar logs de TicketManager, 
     HashPoolAdmin, o cualquier otro contrato, simplificando la lógica de 
     selección de modelos.
+
+    Un log se identifica por (red, hash de transacción, índice del log): una misma
+    transacción puede emitir varios eventos (p. ej. una compra de varios tickets).
     """
+    network = models.ForeignKey(
+        Network,
+        on_delete=models.CASCADE,
+        related_name='event_logs',
+        verbose_name="Red"
+    )
     deployed_contract = models.ForeignKey(
         DeployedContract, 
         on_delete=models.CASCADE,
@@ -18,19 +28,182 @@ class GlobalEventLog(models.Model):
     )
     event_name = models.CharField(max_length=100, verbose_name="Nombre del Evento")
     event_data = models.JSONField(verbose_name="Datos del Evento (JSON)")
-    transaction_hash = models.CharField(max_length=66, unique=True, verbose_name="Hash de Transacción")
+    transaction_hash = models.CharField(max_length=66, verbose_name="Hash de Transacción")
+    log_index = models.PositiveIntegerField(default=0, verbose_name="Índice del Log")
     block_number = models.IntegerField(verbose_name="Número de Bloque")
     timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Registro")
+    # Completados por el enriquecimiento opcional del suscriptor (ver events/enrichment.py)
+    block_timestamp = models.DateTimeField(null=True, blank=True, verbose_name="Fecha del Bloque")
+    tx_from = models.CharField(max_length=42, blank=True, default='', verbose_name="Emisor de la Transacción")
+    gas_used = models.PositiveBigIntegerField(null=True, blank=True, verbose_name="Gas Usado")
+    # Argumentos promovidos desde event_data al ingerir (ver EVENT_PROMOTED_ARGS en
+    # events/pipeline.py): columnas tipadas e indexables para filtrar, ordenar y sumar
+    # sin extraer JSON. 78 dígitos alcanzan para cualquier uint256 (exacto en
+    # PostgreSQL; SQLite guarda los valores de más de 15 dígitos aproximados, así
+    # que allí los totales exactos siguen saliendo de ContractEventStats). La
+    # dirección se guarda en minúsculas.
+    arg_amount = models.DecimalField(max_digits=78, decimal_places=0, null=True, blank=True, verbose_name="Monto (argumento promovido)")
+    arg_address = models.CharField(max_length=42, blank=True, default='', verbose_name="Dirección (argumento promovido)")
 
     class Meta:
         verbose_name = "Log de Evento Global"
         verbose_name_plural = "Logs de Eventos Globales"
         ordering = ['-block_number', '-timestamp']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['network', 'transaction_hash', 'log_index'],
+                name='unique_event_log_per_network',
+            ),
+        ]
+        # Los paneles filtran por contrato (y evento) y ordenan por fecha o por bloque
+        indexes = [
+            models.Index(fields=['deployed_contract', '-timestamp'], name='eventlog_contract_ts_idx'),
+            models.Index(fields=['deployed_contract', 'event_name', '-timestamp'], name='eventlog_contract_evts_idx'),
+            models.Index(fields=['deployed_contract', 'event_name', '-block_number', '-log_index'], name='eventlog_contract_blk_idx'),
+            models.Index(fields=['deployed_contract', 'event_name', 'arg_amount'], name='eventlog_event_amount_idx'),
+            models.Index(fields=['arg_address', 'deployed_contract'], name='eventlog_address_idx', condition=~Q(arg_address='')),
+            # Paginación por cursor de la API: (bloque, índice del log, id)
+            models.Index(fields=['deployed_contract', 'block_number', 'log_index', 'id'], name='eventlog_contract_keyset_idx'),
+            models.Index(fields=['block_number', 'log_index', 'id'], name='eventlog_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.event_name}] Contrato: {self.deployed_contract.base_contract.name} | Bloque: {self.block_number}"
     
     
+class ContractEventStats(models.Model):
+    """
+    Totales acumulados por contrato desplegado y evento: cantidad de logs y suma de
+    cada argumento entero. Se actualizan en la misma transacción que inserta (o
+    retracta) los logs, así que los paneles los leen en O(1) en lugar de agregar
+    GlobalEventLog en cada visita.
+
+    Las sumas se guardan como cadenas decimales en `sums` ({"value": "123..."}):
+    un uint256 no cabe en los enteros de 64 bits de la base de datos.
+    """
+    deployed_contract = models.ForeignKey(
+        DeployedContract,
+        on_delete=models.CASCADE,
+        related_name='event_stats',
+        verbose_name="Instancia de Contrato Desplegado"
+    )
+    event_name = models.CharField(max_length=100, verbose_name="Nombre del Evento")
+    event_count = models.PositiveBigIntegerField(default=0, verbose_name="Cantidad de Eventos")
+    sums = models.JSONField(default=dict, verbose_name="Sumas por Argumento")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
+
+    class Meta:
+        verbose_name = "Estadística de Eventos"
+        verbose_name_plural = "Estadísticas de Eventos"
+        unique_together = ('deployed_contract', 'event_name')
+
+    def __str__(self):
+        return f"{self.event_name} en {self.deployed_contract_id}: {self.event_count}"
+
+    def sum_of(self, field: str) -> int:
+        return int(self.sums.get(field, 0))
+
+
+class EventRollup(models.Model):
+    """
+    Base de los acumulados por intervalo de tiempo de un contrato y evento: cantidad
+    de logs y suma de cada argumento entero (cadenas decimales, como en
+    ContractEventStats). El suscriptor los mantiene en la transacción de cada lote,
+    así que una serie para un gráfico lee pocas filas sin importar el volumen de logs.
+
+    El intervalo se toma de la fecha del bloque si el log está enriquecido y, si no,
+    de la fecha de registro.
+    """
+    deployed_contract = models.ForeignKey(
+        DeployedContract,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="Instancia de Contrato Desplegado"
+    )
+    event_name = models.CharField(max_length=100, verbose_name="Nombre del Evento")
+    bucket = models.DateTimeField(verbose_name="Inicio del Intervalo")
+    event_count = models.PositiveBigIntegerField(default=0, verbose_name="Cantidad de Eventos")
+    sums = models.JSONField(default=dict, verbose_name="Sumas por Argumento")
+
+    class Meta:
+        abstract = True
+        unique_together = ('deployed_contract', 'event_name', 'bucket')
+        ordering = ['bucket']
+
+    def sum_of(self, field: str) -> int:
+        return int(self.sums.get(field, 0))
+
+
+class HourlyEventRollup(EventRollup):
+    class Meta(EventRollup.Meta):
+        verbose_name = "Acumulado Horario de Eventos"
+        verbose_name_plural = "Acumulados Horarios de Eventos"
+
+
+class DailyEventRollup(EventRollup):
+    class Meta(EventRollup.Meta):
+        verbose_name = "Acumulado Diario de Eventos"
+        verbose_name_plural = "Acumulados Diarios de Eventos"
+
+
+class EventParticipant(models.Model):
+    """
+    Índice de direcciones que participan en un log: una fila por cada argumento de
+    tipo `address` (o `address[]`) según el ABI del contrato. Lo llena el suscriptor
+    al guardar cada lote, así que los eventos de una wallet se buscan por índice en
+    lugar de recorrer el JSON de todos los logs.
+
+    La dirección se guarda en minúsculas.
+    """
+    event_log = models.ForeignKey(
+        GlobalEventLog,
+        on_delete=models.CASCADE,
+        related_name='participants',
+        verbose_name="Log de Evento"
+    )
+    address = models.CharField(max_length=42, verbose_name="Dirección")
+    arg_name = models.CharField(max_length=100, verbose_name="Argumento")
+
+    class Meta:
+        verbose_name = "Participante de Evento"
+        verbose_name_plural = "Participantes de Eventos"
+        unique_together = ('event_log', 'arg_name', 'address')
+        indexes = [
+            models.Index(fields=['address', 'event_log'], name='participant_address_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.address} ({self.arg_name}) en log {self.event_log_id}"
+
+
+class ArchivedEventRange(models.Model):
+    """
+    Rango de bloques de un contrato cuyos logs se movieron de GlobalEventLog a un
+    archivo de segmentos en frío (comando archive_event_logs). Permite restaurarlos
+    y que rebuild_event_stats los siga contando: las estadísticas y acumulados no
+    se descuentan al archivar.
+    """
+    deployed_contract = models.ForeignKey(
+        DeployedContract,
+        on_delete=models.CASCADE,
+        related_name='archived_ranges',
+        verbose_name="Instancia de Contrato Desplegado"
+    )
+    from_block = models.PositiveBigIntegerField(verbose_name="Primer Bloque")
+    to_block = models.PositiveBigIntegerField(verbose_name="Último Bloque")
+    log_count = models.PositiveIntegerField(verbose_name="Logs Archivados")
+    archive_dir = models.CharField(max_length=255, verbose_name="Directorio del Archivo")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Archivado")
+
+    class Meta:
+        verbose_name = "Rango de Eventos Archivado"
+        verbose_name_plural = "Rangos de Eventos Archivados"
+        ordering = ['deployed_contract', 'from_block']
+
+    def __str__(self):
+        return f"Contrato {self.deployed_contract_id}: bloques {self.from_block}-{self.to_block} ({self.log_count} logs)"
+
+
 class EventSubscription(models.Model):
     """
     Modelo para gestionar suscripciones a eventos específicos de contratos.
@@ -53,4 +226,111 @@ class EventSubscription(models.Model):
         unique_together = ('deployed_contract', 'event_name')
 
     def __str__(self):
-        return f"Suscripción a {self.event_name} para {self.contract_version}" 
+        return f"Suscripción a {self.event_name} para {self.deployed_contract.contract_version}"
+
+
+class BlockCursor(models.Model):
+    """
+    Último bloque procesado por el suscriptor en cada red.
+
+    Se avanza en la misma transacción que inserta los logs, de modo que tras un
+    reinicio o una reconexión el suscriptor sólo recupera el hueco entre este
+    bloque y la cabeza de la cadena.
+    """
+    network = models.OneToOneField(
+        Network,
+        on_delete=models.CASCADE,
+        related_name='block_cursor',
+        verbose_name="Red"
+    )
+    last_block = models.PositiveBigIntegerField(verbose_name="Último Bloque Procesado")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
+
+    class Meta:
+        verbose_name = "Cursor de Bloques"
+        verbose_name_plural = "Cursores de Bloques"
+
+    def __str__(self):
+        return f"{self.network.name}: bloque {self.last_block}"
+
+
+class SubscriberWorker(models.Model):
+    """
+    Proceso suscriptor que participa en el reparto de redes por arrendamientos.
+
+    Cada worker renueva `heartbeat_at` periódicamente; los que dejan de hacerlo
+    dejan de contar para el reparto y sus redes se reasignan al vencer sus leases.
+    """
+    name = models.CharField(max_length=100, unique=True, verbose_name="Identificador del Worker")
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Inicio")
+    heartbeat_at = models.DateTimeField(verbose_name="Último Latido")
+
+    class Meta:
+        verbose_name = "Worker del Suscriptor"
+        verbose_name_plural = "Workers del Suscriptor"
+
+    def __str__(self):
+        return self.name
+
+
+class NetworkLease(models.Model):
+    """
+    Arrendamiento de una red por un worker del suscriptor.
+
+    Sólo el dueño de un lease vigente escucha la red. El dueño lo renueva antes de
+    `expires_at`; si el proceso muere, otro worker lo toma cuando vence.
+    """
+    network = models.OneToOneField(
+        Network,
+        on_delete=models.CASCADE,
+        related_name='lease',
+        verbose_name="Red"
+    )
+    owner = models.CharField(max_length=100, blank=True, default='', verbose_name="Worker Dueño")
+    acquired_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Adquisición")
+    expires_at = models.DateTimeField(verbose_name="Vencimiento")
+
+    class Meta:
+        verbose_name = "Arrendamiento de Red"
+        verbose_name_plural = "Arrendamientos de Redes"
+
+    def __str__(self):
+        return f"{self.network.name}: {self.owner or 'libre'} hasta {self.expires_at:%H:%M:%S}"
+
+
+class ConnectionState(models.TextChoices):
+    CONNECTING = 'CONNECTING', 'Conectando'
+    CONNECTED = 'CONNECTED', 'Conectado'
+    BACKING_OFF = 'BACKING_OFF', 'Esperando para Reintentar'
+    OPEN_CIRCUIT = 'OPEN_CIRCUIT', 'Circuito Abierto'
+    STOPPED = 'STOPPED', 'Detenido'
+
+
+class NodeHealth(models.Model):
+    """
+    Estado de la conexión del suscriptor con el nodo WebSocket de cada red.
+
+    Lo actualiza el proceso que escucha la red en cada transición (conexión,
+    espera con backoff, apertura del circuito), para que los operadores vean la
+    salud de los nodos con `subscriber_status` sin leer la salida del proceso.
+    """
+    network = models.OneToOneField(
+        Network,
+        on_delete=models.CASCADE,
+        related_name='node_health',
+        verbose_name="Red"
+    )
+    state = models.CharField(max_length=20, choices=ConnectionState.choices, default=ConnectionState.CONNECTING, verbose_name="Estado")
+    worker = models.CharField(max_length=100, blank=True, default='', verbose_name="Worker")
+    consecutive_failures = models.PositiveIntegerField(default=0, verbose_name="Fallos Consecutivos")
+    last_error = models.TextField(blank=True, default='', verbose_name="Último Error")
+    connected_at = models.DateTimeField(null=True, blank=True, verbose_name="Conectado Desde")
+    next_attempt_at = models.DateTimeField(null=True, blank=True, verbose_name="Próximo Intento")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Fecha de Actualización")
+
+    class Meta:
+        verbose_name = "Salud del Nodo"
+        verbose_name_plural = "Salud de los Nodos"
+
+    def __str__(self):
+        return f"{self.network.name}: {self.get_state_display()}"
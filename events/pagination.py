@@ -0,0 +1,103 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+# Tamaño de página por defecto y máximo de la API de logs
+EVENT_API_PAGE_SIZE = getattr(settings, 'EVENT_API_PAGE_SIZE', 100)
+EVENT_API_MAX_PAGE_SIZE = getattr(settings, 'EVENT_API_MAX_PAGE_SIZE', 1000)
+
+
+def keyset_after(fields: tuple, position: list, descending: bool = False) -> Q:
+    """Condición "clave posterior a `position`" en el sentido del recorrido, campo a campo."""
+    op = 'lt' if descending else 'gt'
+    condition = Q()
+    for i, field in enumerate(fields):
+        equal = {name: value for name, value in zip(fields[:i], position[:i])}
+        condition |= Q(**equal, **{f'{field}__{op}': position[i]})
+    # Redundante, pero le da al planificador un rango sobre el primer campo del
+    # índice: sin él, la disyunción obliga a recorrer el índice desde el principio
+    return Q(**{f'{fields[0]}__{op}e': position[0]}) & condition
+
+
+class EventLogKeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre (block_number, log_index, id).
+
+    El cursor es la clave del último log de la página: la siguiente se pide con
+    `WHERE (bloque, índice, id) > cursor ORDER BY ... LIMIT n`, que el índice
+    resuelve sin recorrer las filas anteriores, así que la página 10.000 cuesta lo
+    mismo que la primera (a diferencia de OFFSET). `order=desc` recorre desde el
+    bloque más reciente. El id desempata logs de redes distintas con el mismo
+    bloque e índice.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    order_query_param = 'order'
+    fields = ('block_number', 'log_index', 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.descending = request.query_params.get(self.order_query_param, 'asc') == 'desc'
+        self.page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        prefix = '-' if self.descending else ''
+        # Se pide una fila de más para saber si hay página siguiente
+        page = list(queryset.order_by(*(prefix + field for field in self.fields))[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, EVENT_API_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Debe ser un entero."})
+        return max(1, min(size, EVENT_API_MAX_PAGE_SIZE))
+
+    def after(self, position: list) -> Q:
+        return keyset_after(self.fields, position, self.descending)
+
+    def encode_cursor(self, event_log) -> str:
+        position = [getattr(event_log, field) for field in self.fields]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str | None):
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except ValueError:
+            position = None
+        if not isinstance(position, list) or len(position) != len(self.fields) or not all(isinstance(v, int) for v in position):
+            raise ValidationError({self.cursor_query_param: "Cursor inválido."})
+        return position
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,60 @@
+from contractRegistry.models import DeployedContract
+
+from events.models import EventParticipant, GlobalEventLog
+
+ADDRESS_TYPES = ('address', 'address[]')
+
+# DeployedContract -> {evento: [argumentos de tipo address]}; el ABI de un
+# contrato desplegado no cambia, así que se lee una sola vez por proceso
+_address_args: dict[int, dict[str, list[str]]] = {}
+
+
+def address_args(deployed_contract_id: int) -> dict[str, list[str]]:
+    """Argumentos de tipo address de cada evento del contrato, según su ABI."""
+    event_args = _address_args.get(deployed_contract_id)
+    if event_args is None:
+        contract = DeployedContract.objects.select_related('contract_version').get(pk=deployed_contract_id)
+        event_args = _address_args[deployed_contract_id] = {
+            item['name']: [arg['name'] for arg in item.get('inputs', []) if arg.get('type') in ADDRESS_TYPES]
+            for item in contract.contract_version.abi or []
+            if item.get('type') == 'event'
+        }
+    return event_args
+
+
+def participant_addresses(event_log: GlobalEventLog):
+    """(argumento, dirección en minúsculas) de cada argumento address del log."""
+    args = (event_log.event_data or {}).get('args', {})
+    for name in address_args(event_log.deployed_contract_id).get(event_log.event_name, []):
+        values = args.get(name)
+        for value in values if isinstance(values, list) else [values]:
+            if isinstance(value, str) and len(value) == 42:
+                yield name, value.lower()
+
+
+def index_participants(event_logs: list[GlobalEventLog]) -> int:
+    """
+    Crea las filas de EventParticipant de logs recién insertados. Los logs que se
+    insertan con `ignore_conflicts` no traen su id, así que se buscan por su clave
+    en una consulta (por red y hash, sin ordenar, para usar el índice único).
+    Devuelve la cantidad de filas creadas.
+    """
+    pending = {}
+    for event_log in event_logs:
+        addresses = list(participant_addresses(event_log))
+        if addresses:
+            pending[(event_log.network_id, event_log.transaction_hash, event_log.log_index)] = addresses
+    if not pending:
+        return 0
+
+    stored = GlobalEventLog.objects.filter(
+        network_id__in={key[0] for key in pending},
+        transaction_hash__in={key[1] for key in pending},
+    ).order_by().values_list('id', 'network_id', 'transaction_hash', 'log_index')
+    participants = [
+        EventParticipant(event_log_id=log_id, arg_name=name, address=address)
+        for log_id, *key in stored
+        for name, address in pending.get(tuple(key), [])
+    ]
+    EventParticipant.objects.bulk_create(participants, ignore_conflicts=True)
+    return len(participants)
@@ -0,0 +1,501 @@
+import asyncio
+import time
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from web3.types import LogReceipt
+
+from events.models import BlockCursor, EventSubscription, GlobalEventLog
+from events.participants import index_participants
+from events.stats import accumulate_rollups, accumulate_stats, apply_rollup_deltas, apply_stats_deltas
+
+
+# Argumentos que se copian de event_data a las columnas tipadas de GlobalEventLog:
+# evento -> {'amount': argumento uint, 'address': argumento address}
+PROMOTED_ARGS = getattr(settings, 'EVENT_PROMOTED_ARGS', {
+    'PurchasedTicket': {'amount': 'value', 'address': 'owner'},
+    'PrizeAwarded': {'amount': 'netPrize', 'address': 'winner'},
+    'FeeAdded': {'amount': 'amount'},
+    'TicketConsumed': {'address': 'user'},
+    'TicketStatusReverted': {'address': 'user'},
+    'Deposit': {'amount': 'amount'},
+})
+
+
+# --- Construcción del registro a partir de un log decodificado ---
+
+def promoted_args(event_name: str, args: dict) -> dict:
+    """
+    Valores de las columnas arg_amount y arg_address para un evento según
+    PROMOTED_ARGS. Un argumento ausente o de otro tipo deja la columna vacía; la
+    dirección se guarda en minúsculas, como en EventParticipant.
+    """
+    declared = PROMOTED_ARGS.get(event_name, {})
+    amount = args.get(declared.get('amount'))
+    address = args.get(declared.get('address'))
+    return {
+        'arg_amount': Decimal(amount) if isinstance(amount, int) and not isinstance(amount, bool) else None,
+        'arg_address': address.lower() if isinstance(address, str) and len(address) == 42 else '',
+    }
+
+
+def build_event_log(db_subscription: EventSubscription, decoded_event: dict, log_receipt: LogReceipt) -> GlobalEventLog:
+    """
+    Construye (sin guardar) la instancia de GlobalEventLog para un log decodificado.
+    Es el único punto donde se define cómo se serializa un evento antes de persistirlo.
+    """
+    event_args = decoded_event.get('args', {})
+    event_data_json = {
+        'address': decoded_event.get('address'),
+        # Convertir cualquier tipo 'bytes' (como address o hash) a string (hex)
+        'args': {k: v.hex() if isinstance(v, bytes) else v for k, v in event_args.items()},
+    }
+
+    return GlobalEventLog(
+        network_id=db_subscription.deployed_contract.network_id,
+        deployed_contract=db_subscription.deployed_contract,
+        event_name=db_subscription.event_name,
+        event_data=event_data_json,
+        transaction_hash=log_receipt['transactionHash'].hex(),
+        log_index=log_receipt['logIndex'],
+        block_number=log_receipt['blockNumber'],
+        **promoted_args(db_subscription.event_name, event_data_json['args']),
+    )
+
+
+def event_log_key(event_log: GlobalEventLog) -> tuple:
+    """
+    Identidad de un log: (red, hash de transacción, índice del log), la misma que la
+    restricción única de GlobalEventLog. La usan el buffer de confirmaciones, las
+    retractaciones y la caché de claves recientes.
+    """
+    return (event_log.network_id, event_log.transaction_hash, event_log.log_index)
+
+
+class RecentKeys:
+    """
+    Conjunto LRU acotado de las claves de log vistas recientemente.
+
+    El nodo vuelve a entregar logs ya recibidos (retransmisiones del WebSocket,
+    relleno del hueco tras una reconexión que se solapa con lo recibido en vivo);
+    esta caché los descarta antes de que lleguen a la cola y a la base de datos.
+    Si una clave ya fue desalojada, la restricción única sigue siendo la red de
+    seguridad.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._keys: OrderedDict[tuple, None] = OrderedDict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key: tuple) -> bool:
+        """Registra la clave. Devuelve False si ya estaba (duplicado)."""
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return False
+        self._keys[key] = None
+        if len(self._keys) > self.max_size:
+            self._keys.popitem(last=False)
+        return True
+
+    def discard(self, key: tuple) -> None:
+        self._keys.pop(key, None)
+
+
+class LogRetraction:
+    """
+    Marca que se encola cuando el nodo retira un log ya guardado (`removed: true` tras
+    una reorganización). El escritor borra el registro en la transacción del lote.
+    """
+    __slots__ = ('event_log',)
+
+    def __init__(self, event_log: GlobalEventLog):
+        self.event_log = event_log
+
+
+# --- Cursor de bloques por red ---
+
+class CursorCheckpoint:
+    """
+    Marca que se encola detrás de los logs de un rango ya recorrido por completo
+    (p. ej. el relleno de un hueco). Al procesarla, el escritor avanza el cursor de
+    la red hasta `block_number` en la misma transacción que esos logs.
+
+    `generation` es la generación de retención de la red (ver EventLogWriter.hold)
+    vigente al crearla: si la red se retuvo de nuevo después, la marca es vieja y se
+    ignora. Sólo la marca que cierra el relleno (`release=True`) libera la retención.
+    """
+    __slots__ = ('network_id', 'block_number', 'generation', 'release')
+
+    def __init__(self, network_id: int, block_number: int, generation: int = 0, release: bool = False):
+        self.network_id = network_id
+        self.block_number = block_number
+        self.generation = generation
+        self.release = release
+
+
+def advance_block_cursor(network_id: int, block_number: int) -> None:
+    """Avanza (nunca retrocede) el cursor de la red. Debe llamarse dentro de la transacción del lote."""
+    updated = BlockCursor.objects.filter(
+        network_id=network_id, last_block__lt=block_number
+    ).update(last_block=block_number, updated_at=timezone.now())
+    if not updated:
+        BlockCursor.objects.get_or_create(network_id=network_id, defaults={'last_block': block_number})
+
+
+# --- Escritor por lotes (write-behind) ---
+
+# Marca que `EventLogWriter.stop` encola detrás de todo lo pendiente: al recibirla,
+# `run` guarda el lote en curso y termina
+STOP = object()
+
+
+class EventLogWriter:
+    """
+    Cola acotada entre los handlers del WebSocket y la base de datos.
+
+    Los handlers solo encolan instancias de GlobalEventLog (`put`); una única tarea
+    (`run`) las agrupa y las persiste con `bulk_create(ignore_conflicts=True)` cuando
+    el lote alcanza `batch_size` o cuando vence `flush_interval` segundos desde el
+    primer log del lote. Así cada lote cuesta un solo salto a `sync_to_async` y una
+    sola transacción, en lugar de una consulta `exists()` más un `create()` por log.
+
+    Si la cola se llena, `put` espera: la presión se traslada a los handlers en lugar
+    de acumular memoria sin límite.
+
+    Antes de encolar, `put` descarta los logs cuya clave ya está en `recent_keys`
+    (retransmisiones). Un log retractado sale de la caché para que pueda volver a
+    guardarse si la cadena canónica lo incluye de nuevo.
+
+    En la misma transacción avanza el BlockCursor de cada red hasta el mayor bloque
+    del lote. Mientras una red está retenida (`hold`, p. ej. durante el relleno del
+    hueco tras una reconexión) sus logs en vivo no mueven el cursor; sólo lo hace el
+    CursorCheckpoint que cierra el relleno, que además libera la retención. Cada
+    retención abre una generación nueva: las marcas creadas antes no la liberan.
+
+    Para cerrar se usa `close` (no `cancel()` sobre la tarea de `run`): cancelarla
+    perdería el lote que se está agrupando y podría dejar un guardado a medias.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 0.5, max_queue_size: int = 10000, max_attempts: int = 3,
+                 recent_keys: RecentKeys | None = None, enricher=None, on_flush=None, on_error=None, on_commit=None, on_duplicate=None,
+                 on_hold=None):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        # Etapa opcional (LogEnricher) que completa fecha de bloque, emisor y gas antes de guardar
+        self.enricher = enricher
+        self.recent_keys = recent_keys if recent_keys is not None else RecentKeys(getattr(settings, 'EVENT_DEDUP_CACHE_SIZE', 100000))
+        # Callbacks opcionales: on_flush(tamaño, latencia_en_segundos), on_error(excepción, tamaño)
+        # on_commit(logs, retractados), que recibe el lote ya confirmado en la BD,
+        # on_duplicate(log), para cada retransmisión descartada, y on_hold(red, generación),
+        # cuando un lote perdido retiene la red: quien lo reciba debe encolar un relleno
+        # desde el cursor cuya marca (`release=True`, de esa generación) la libere
+        self.on_flush = on_flush
+        self.on_error = on_error
+        self.on_commit = on_commit
+        self.on_duplicate = on_duplicate
+        self.on_hold = on_hold
+        # Red retenida -> generación de su retención vigente; generación actual por red
+        self.held_networks: dict[int, int] = {}
+        self.hold_generations: dict[int, int] = {}
+        # Mayor bloque ya guardado (log o marca de cursor) por red, para medir el retraso
+        self.last_written_block: dict[int, int] = {}
+
+    async def put(self, event_log: GlobalEventLog | CursorCheckpoint | LogRetraction) -> None:
+        """Encola un log (o una marca de cursor o de retractación) para su escritura diferida."""
+        if isinstance(event_log, GlobalEventLog) and not self.recent_keys.add(event_log_key(event_log)):
+            if self.on_duplicate:
+                self.on_duplicate(event_log)
+            return
+        await self.queue.put(event_log)
+
+    async def retract(self, event_log: GlobalEventLog) -> None:
+        """Encola el borrado de un log que el nodo marcó como `removed`."""
+        self.recent_keys.discard(event_log_key(event_log))
+        await self.queue.put(LogRetraction(event_log))
+
+    def hold(self, network_id: int) -> int:
+        """
+        Impide que los logs en vivo de la red avancen su cursor hasta que un
+        CursorCheckpoint de esta retención (`release=True`) la libere. Devuelve la
+        generación de la retención, que debe llevar esa marca.
+        """
+        generation = self.hold_generations.get(network_id, 0) + 1
+        self.hold_generations[network_id] = generation
+        self.held_networks[network_id] = generation
+        return generation
+
+    def checkpoint(self, network_id: int, block_number: int) -> CursorCheckpoint:
+        """Marca de cursor para logs en vivo, de la generación de retención actual de la red."""
+        return CursorCheckpoint(network_id, block_number, self.hold_generations.get(network_id, 0))
+
+    def checkpoint_applies(self, checkpoint: CursorCheckpoint) -> bool:
+        """
+        Si la marca puede avanzar el cursor: no es de una generación anterior a la
+        actual y, con la red retenida, es la que cierra el relleno.
+        """
+        network_id = checkpoint.network_id
+        if checkpoint.generation != self.hold_generations.get(network_id, 0):
+            return False
+        return network_id not in self.held_networks or checkpoint.release
+
+    async def run(self) -> None:
+        """
+        Bucle del escritor: agrupa por tamaño o por ventana de tiempo y persiste.
+        Termina, después de guardar el lote en curso, al recibir la marca STOP.
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            batch = []
+            item = await self.queue.get()
+            deadline = loop.time() + self.flush_interval
+
+            while item is not STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                # 1. Vaciar sin esperar lo que ya esté en la cola
+                try:
+                    item = self.queue.get_nowait()
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+
+                # 2. Esperar el siguiente log sólo hasta que venza la ventana
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            stopping = item is STOP
+
+            await self.flush(batch)
+
+    async def stop(self) -> None:
+        """Pide a `run` que termine cuando haya guardado todo lo encolado hasta ahora."""
+        await self.queue.put(STOP)
+
+    async def close(self, writer_task: asyncio.Task) -> None:
+        """
+        Cierra el escritor que corre en `writer_task`: espera a que guarde todo lo
+        encolado y termine. Si la tarea ya había terminado (por un error), guarda lo
+        pendiente directamente.
+        """
+        if not writer_task.done():
+            await self.stop()
+            await writer_task
+        else:
+            await self.drain()
+
+    async def flush(self, batch: list) -> None:
+        """Persiste un lote y reporta su tamaño y latencia."""
+        if not batch:
+            return
+
+        # Por clave sólo cuenta la última operación del lote: si un log se guarda y luego
+        # se retira (o al revés), se aplica primero el borrado y después la inserción.
+        pending = {}
+        retracted = {}
+        checkpoints = []
+        cursor_advances = {}
+        for item in batch:
+            if isinstance(item, CursorCheckpoint):
+                if not self.checkpoint_applies(item):
+                    continue
+                checkpoints.append(item)
+                cursor_advances[item.network_id] = max(cursor_advances.get(item.network_id, 0), item.block_number)
+                continue
+            if isinstance(item, LogRetraction):
+                key = event_log_key(item.event_log)
+                pending.pop(key, None)
+                retracted[key] = item.event_log
+                continue
+            pending[event_log_key(item)] = item
+
+        event_logs = list(pending.values())
+        retractions = list(retracted.values())
+        for item in event_logs:
+            network_id = item.network_id
+            if network_id not in self.held_networks:
+                cursor_advances[network_id] = max(cursor_advances.get(network_id, 0), item.block_number)
+
+        if self.enricher and event_logs:
+            await self.enricher.enrich(event_logs)
+
+        started = time.perf_counter()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                event_logs = await sync_to_async(self._write_batch)(event_logs, cursor_advances, retractions)
+                break
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e, len(event_logs))
+                if attempt == self.max_attempts:
+                    # El lote se pierde: se retienen los cursores de sus redes para que un
+                    # relleno (on_hold o, sin él, la próxima reconexión) vuelva a recorrer esos
+                    # bloques, y se olvidan sus claves para que no los tome por duplicados.
+                    for log in event_logs:
+                        self.recent_keys.discard(event_log_key(log))
+                    for network_id in {log.network_id for log in event_logs}:
+                        generation = self.hold(network_id)
+                        if self.on_hold:
+                            self.on_hold(network_id, generation)
+                    return
+                await asyncio.sleep(attempt)
+
+        for checkpoint in checkpoints:
+            # Una retención posterior (lote perdido durante la escritura) no se libera aquí
+            if checkpoint.release and self.held_networks.get(checkpoint.network_id) == checkpoint.generation:
+                del self.held_networks[checkpoint.network_id]
+        for network_id, block_number in cursor_advances.items():
+            self.last_written_block[network_id] = max(self.last_written_block.get(network_id, 0), block_number)
+
+        if self.on_flush and event_logs:
+            self.on_flush(len(event_logs), time.perf_counter() - started)
+        if self.on_commit and (event_logs or retractions):
+            self.on_commit(event_logs, retractions)
+
+    async def drain(self) -> None:
+        """Persiste todo lo que quede en la cola sin la tarea de `run` (ver `close`)."""
+        batch = []
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is STOP:
+                continue
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self.flush(batch)
+                batch = []
+        await self.flush(batch)
+
+    def _write_batch(self, event_logs: list[GlobalEventLog], cursor_advances: dict[int, int],
+                     retractions: list[GlobalEventLog] = ()) -> list[GlobalEventLog]:
+        """Escribe el lote en una transacción y devuelve los logs realmente insertados."""
+        with transaction.atomic():
+            # Las estadísticas por contrato y los acumulados por hora/día sólo cuentan
+            # filas realmente borradas o insertadas
+            stats_deltas, rollup_deltas = {}, {}
+            if retractions:
+                removed = retract_event_logs(retractions)
+                accumulate_stats(stats_deltas, removed, -1)
+                accumulate_rollups(rollup_deltas, removed, -1)
+            # Los duplicados que escaparon a la caché se descartan aquí (y, por si acaso,
+            # también los descarta la restricción única)
+            event_logs = exclude_stored_event_logs(event_logs)
+            GlobalEventLog.objects.bulk_create(event_logs, ignore_conflicts=True)
+            index_participants(event_logs)
+            accumulate_stats(stats_deltas, event_logs)
+            accumulate_rollups(rollup_deltas, event_logs)
+            apply_stats_deltas(stats_deltas)
+            apply_rollup_deltas(rollup_deltas)
+            for network_id, block_number in cursor_advances.items():
+                advance_block_cursor(network_id, block_number)
+        return event_logs
+
+
+def log_keys_condition(event_logs: list[GlobalEventLog]) -> Q:
+    condition = Q()
+    for event_log in event_logs:
+        condition |= Q(
+            network_id=event_log.network_id,
+            transaction_hash=event_log.transaction_hash,
+            log_index=event_log.log_index,
+        )
+    return condition
+
+
+def exclude_stored_event_logs(event_logs: list[GlobalEventLog]) -> list[GlobalEventLog]:
+    """
+    Quita del lote los logs que ya están en la BD (una sola consulta por lote). Se
+    filtra por red y hash, el prefijo de la restricción única, y sin ordenar, para
+    que la consulta busque en ese índice en lugar de recorrer la tabla.
+    """
+    if not event_logs:
+        return event_logs
+    stored = set(GlobalEventLog.objects.filter(
+        network_id__in={event_log.network_id for event_log in event_logs},
+        transaction_hash__in={event_log.transaction_hash for event_log in event_logs},
+    ).order_by().values_list('network_id', 'transaction_hash', 'log_index'))
+    if not stored:
+        return event_logs
+    return [event_log for event_log in event_logs if event_log_key(event_log) not in stored]
+
+
+def retract_event_logs(event_logs: list[GlobalEventLog]) -> list[GlobalEventLog]:
+    """
+    Borra los registros de logs retirados por una reorganización y devuelve los que
+    existían, para descontarlos de las estadísticas y acumulados en la misma
+    transacción. Debe llamarse dentro de la transacción del lote.
+    """
+    stored = list(GlobalEventLog.objects.filter(log_keys_condition(event_logs)).only(
+        'id', 'deployed_contract_id', 'event_name', 'event_data', 'block_timestamp', 'timestamp',
+    ))
+    if stored:
+        GlobalEventLog.objects.filter(pk__in=[event_log.pk for event_log in stored]).delete()
+    return stored
+
+
+# --- Buffer de confirmaciones (reorganizaciones) ---
+
+class ConfirmationBuffer:
+    """
+    Retiene en memoria los logs de una red hasta que alcanzan `depth` confirmaciones.
+
+    Expone la misma interfaz que EventLogWriter (`put`, `retract`), así que el
+    handler y el relleno de huecos escriben en él sin cambios. La suscripción
+    `newHeads` del nodo llama a `advance` con cada bloque nuevo: los logs que ya
+    tienen `depth` bloques encima pasan al escritor en orden de bloque, sin ninguna
+    llamada RPC adicional.
+
+    Un log marcado `removed` que sigue en el buffer simplemente se descarta; si ya
+    se había guardado (reorganización más profunda que `depth`) se retracta en BD.
+    """
+
+    def __init__(self, network_id: int, depth: int, writer: EventLogWriter):
+        self.network_id = network_id
+        self.depth = depth
+        self.writer = writer
+        self.pending: dict[tuple, GlobalEventLog] = {}
+        self.head = None
+
+    def __len__(self):
+        return len(self.pending)
+
+    async def put(self, event_log: GlobalEventLog) -> None:
+        self.pending[event_log_key(event_log)] = event_log
+
+    async def retract(self, event_log: GlobalEventLog) -> None:
+        if self.pending.pop(event_log_key(event_log), None) is None:
+            await self.writer.retract(event_log)
+
+    def confirmed_block(self, head: int) -> int:
+        """Último bloque con `depth` confirmaciones dada la cabeza `head`."""
+        return max(head - self.depth, 0)
+
+    async def advance(self, head: int) -> None:
+        """Entrega al escritor los logs confirmados por la nueva cabeza de la cadena."""
+        self.head = head
+        confirmed = self.confirmed_block(head)
+        ready = sorted(
+            (event_log for event_log in self.pending.values() if event_log.block_number <= confirmed),
+            key=lambda event_log: event_log.block_number,
+        )
+        for event_log in ready:
+            del self.pending[event_log_key(event_log)]
+            await self.writer.put(event_log)
+
+        # Sin hueco pendiente de rellenar, el cursor avanza aunque no haya logs
+        if self.network_id not in self.writer.held_networks:
+            await self.writer.put(self.writer.checkpoint(self.network_id, confirmed))
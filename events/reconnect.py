@@ -0,0 +1,54 @@
+import random
+
+from django.conf import settings
+
+from events.models import ConnectionState
+
+# Primer reintento: casi inmediato, para que un corte breve no cueste datos
+RECONNECT_BASE_DELAY = getattr(settings, 'EVENT_RECONNECT_BASE_DELAY', 1.0)
+# Techo de la espera exponencial entre reintentos
+RECONNECT_MAX_DELAY = getattr(settings, 'EVENT_RECONNECT_MAX_DELAY', 60.0)
+# Fallos consecutivos que abren el circuito del nodo
+CIRCUIT_FAILURE_THRESHOLD = getattr(settings, 'EVENT_CIRCUIT_FAILURE_THRESHOLD', 8)
+# Segundos que el circuito permanece abierto antes de un intento de prueba
+CIRCUIT_OPEN_SECONDS = getattr(settings, 'EVENT_CIRCUIT_OPEN_SECONDS', 300.0)
+# Una conexión que duró al menos esto se considera estable y reinicia el conteo de fallos
+CONNECTION_STABLE_SECONDS = getattr(settings, 'EVENT_CONNECTION_STABLE_SECONDS', 30.0)
+
+
+class ReconnectPolicy:
+    """
+    Política de reconexión de un nodo: backoff exponencial con jitter completo y
+    un circuit breaker.
+
+    - 1.er fallo: espera aleatoria en [0, base_delay] (vía rápida).
+    - n-ésimo fallo: espera aleatoria en [0, min(max_delay, base_delay * 2^(n-1))];
+      el jitter evita que muchos nodos del mismo proveedor reconecten a la vez.
+    - Con `failure_threshold` fallos seguidos el circuito se abre: se espera
+      `open_seconds` (±10 %) y se hace un único intento de prueba. Si falla, vuelve
+      a abrirse; si conecta, el circuito se cierra.
+    """
+
+    def __init__(self, base_delay: float = RECONNECT_BASE_DELAY, max_delay: float = RECONNECT_MAX_DELAY,
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, open_seconds: float = CIRCUIT_OPEN_SECONDS,
+                 stable_seconds: float = CONNECTION_STABLE_SECONDS):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.stable_seconds = stable_seconds
+        self.failures = 0
+
+    def record_failure(self, uptime: float = 0) -> tuple[str, float]:
+        """
+        Registra un fallo de conexión y devuelve (estado, segundos a esperar).
+        `uptime` es lo que duró la conexión que se cayó (0 si ni siquiera conectó).
+        """
+        if uptime >= self.stable_seconds:
+            self.failures = 0
+        self.failures += 1
+
+        if self.failures >= self.failure_threshold:
+            return ConnectionState.OPEN_CIRCUIT, self.open_seconds * random.uniform(0.9, 1.1)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        return ConnectionState.BACKING_OFF, random.uniform(0, ceiling)
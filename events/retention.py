@@ -0,0 +1,189 @@
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from contractRegistry.models import DeployedContract
+
+from events.archive import ArchiveReader, SegmentArchive, archive_record
+from events.models import ArchivedEventRange, BlockCursor, GlobalEventLog
+from events.participants import index_participants
+from events.pipeline import event_log_key, promoted_args
+
+# Política de retención por contrato base ('*' aplica a los demás):
+# {'TicketManager': {'days': 180}, '*': {'blocks': 2_000_000}}. Un log se archiva
+# si supera cualquiera de los límites definidos; sin política, no se archiva.
+RETENTION_POLICIES = getattr(settings, 'EVENT_RETENTION', {})
+# Raíz del archivo en frío (distinta del archivo en vivo del suscriptor)
+COLD_ARCHIVE_DIR = getattr(settings, 'EVENT_COLD_ARCHIVE_DIR', None)
+
+
+def retention_policy(deployed_contract: DeployedContract) -> dict:
+    return RETENTION_POLICIES.get(deployed_contract.base_contract.name, RETENTION_POLICIES.get('*', {}))
+
+
+def expired_condition(deployed_contract: DeployedContract, days: int = None, blocks: int = None) -> Q | None:
+    """
+    Filtro de los logs del contrato que exceden la retención (por antigüedad en días
+    según la fecha del bloque o, si falta, la de registro; o por distancia en bloques
+    al cursor de la red). None si no hay límite aplicable.
+    """
+    conditions = []
+    if days is not None:
+        cutoff = timezone.now() - timedelta(days=days)
+        conditions.append(Q(block_timestamp__lt=cutoff) | Q(block_timestamp__isnull=True, timestamp__lt=cutoff))
+    if blocks is not None:
+        cursor = BlockCursor.objects.filter(network_id=deployed_contract.network_id).first()
+        if cursor is not None:
+            conditions.append(Q(block_number__lt=cursor.last_block - blocks))
+    if not conditions:
+        return None
+    condition = conditions[0]
+    for other in conditions[1:]:
+        condition |= other
+    return condition
+
+
+def archive_event_logs(deployed_contract: DeployedContract, condition: Q, archive_dir: str,
+                       batch_size: int = 1000, pause: float = 0.0, on_batch=None) -> int:
+    """
+    Mueve al archivo en frío los logs del contrato que cumplen `condition`, por lotes.
+
+    Cada lote se escribe (y cierra) en el archivo antes de borrarse en una
+    transacción corta, que también crea o extiende el ArchivedEventRange que lo
+    registra: un corte a mitad de camino como mucho deja logs duplicados en el
+    archivo, nunca perdidos ni fuera de un rango. Las estadísticas y acumulados no se
+    tocan: siguen representando toda la historia del contrato. Devuelve la cantidad
+    de logs archivados.
+    """
+    logs = GlobalEventLog.objects.filter(condition, deployed_contract=deployed_contract).order_by('block_number', 'log_index', 'pk')
+    archive = SegmentArchive(archive_dir)
+    total = 0
+    archived_range = None
+    while True:
+        batch = list(logs[:batch_size])
+        if not batch:
+            break
+        archive.write(batch)
+        archive.close()
+        with transaction.atomic():
+            GlobalEventLog.objects.filter(pk__in=[event_log.pk for event_log in batch]).delete()
+            if archived_range is None:
+                archived_range = ArchivedEventRange.objects.create(
+                    deployed_contract=deployed_contract, from_block=batch[0].block_number,
+                    to_block=batch[-1].block_number, log_count=len(batch), archive_dir=archive_dir,
+                )
+            else:
+                archived_range.from_block = min(archived_range.from_block, batch[0].block_number)
+                archived_range.to_block = max(archived_range.to_block, batch[-1].block_number)
+                archived_range.log_count += len(batch)
+                archived_range.save(update_fields=['from_block', 'to_block', 'log_count'])
+
+        total += len(batch)
+        if on_batch:
+            on_batch(total)
+        # Deja pasar las escrituras del suscriptor entre lotes (SQLite tiene un único escritor)
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def event_log_from_record(record: dict) -> GlobalEventLog:
+    """Reconstruye (sin guardar) un GlobalEventLog a partir de su registro de archivo."""
+    parse = lambda value: datetime.fromisoformat(value) if value else None
+    return GlobalEventLog(
+        network_id=record['network'],
+        deployed_contract_id=record['deployed_contract'],
+        event_name=record['event_name'],
+        event_data=record['event_data'],
+        transaction_hash=record['transaction_hash'],
+        log_index=record['log_index'],
+        block_number=record['block_number'],
+        timestamp=parse(record.get('timestamp')),
+        block_timestamp=parse(record.get('block_timestamp')),
+        tx_from=record.get('tx_from') or '',
+        gas_used=record.get('gas_used'),
+        **promoted_args(record['event_name'], (record['event_data'] or {}).get('args', {})),
+    )
+
+
+def read_archived_event_logs(archived_range: ArchivedEventRange, from_block: int = 0, to_block: int = 2**63):
+    """Logs del contrato del rango archivado (acotado a [from_block, to_block])."""
+    reader = ArchiveReader(archived_range.archive_dir)
+    network_id = archived_range.deployed_contract.network_id
+    low, high = max(archived_range.from_block, from_block), min(archived_range.to_block, to_block)
+    for record in reader.read_range(network_id, low, high):
+        if record['deployed_contract'] == archived_range.deployed_contract_id:
+            yield event_log_from_record(record)
+
+
+def insert_restored_event_logs(event_logs: list[GlobalEventLog]) -> None:
+    """
+    Inserta logs leídos del archivo conservando su fecha de registro: `timestamp` es
+    auto_now_add y `bulk_create` lo pisaría con la hora actual (el log cambiaría de
+    intervalo en los acumulados y volvería a parecer reciente para la retención).
+    """
+    timestamps = {event_log_key(event_log): event_log.timestamp for event_log in event_logs if event_log.timestamp}
+    with transaction.atomic():
+        GlobalEventLog.objects.bulk_create(event_logs, ignore_conflicts=True)
+        stored = GlobalEventLog.objects.filter(
+            network_id__in={key[0] for key in timestamps},
+            transaction_hash__in={key[1] for key in timestamps},
+        ).order_by().only('id', 'network_id', 'transaction_hash', 'log_index', 'timestamp')
+        changed = []
+        for event_log in stored:
+            timestamp = timestamps.get(event_log_key(event_log))
+            if timestamp is not None and event_log.timestamp != timestamp:
+                event_log.timestamp = timestamp
+                changed.append(event_log)
+        GlobalEventLog.objects.bulk_update(changed, ['timestamp'])
+        index_participants(event_logs)
+
+
+def restore_event_logs(deployed_contract: DeployedContract, from_block: int, to_block: int, batch_size: int = 1000) -> int:
+    """
+    Devuelve a GlobalEventLog los logs archivados del contrato en [from_block, to_block],
+    con su fecha de registro original. Las estadísticas no cambian (nunca se
+    descontaron). Los logs que ya están en la BD se ignoran. Devuelve la cantidad de
+    logs leídos del archivo.
+    """
+    ranges = deployed_contract.archived_ranges.filter(from_block__lte=to_block, to_block__gte=from_block)
+    total = 0
+    batch = []
+    for archived_range in ranges:
+        for event_log in read_archived_event_logs(archived_range, from_block, to_block):
+            batch.append(event_log)
+            if len(batch) >= batch_size:
+                insert_restored_event_logs(batch)
+                total += len(batch)
+                batch = []
+    if batch:
+        insert_restored_event_logs(batch)
+        total += len(batch)
+    return total
+
+
+def archived_event_logs(deployed_contract_ids=None):
+    """
+    Logs archivados en frío que ya no están en la BD, sin repetir: lo que
+    `rebuild_stats` debe sumar a GlobalEventLog para recalcular toda la historia.
+    """
+    ranges = ArchivedEventRange.objects.select_related('deployed_contract')
+    if deployed_contract_ids is not None:
+        ranges = ranges.filter(deployed_contract_id__in=deployed_contract_ids)
+    seen = set()
+    for archived_range in ranges:
+        # Los restaurados (o re-archivados) cuentan una sola vez
+        stored = set(GlobalEventLog.objects.filter(
+            deployed_contract_id=archived_range.deployed_contract_id,
+            block_number__gte=archived_range.from_block, block_number__lte=archived_range.to_block,
+        ).values_list('network_id', 'transaction_hash', 'log_index'))
+        for event_log in read_archived_event_logs(archived_range):
+            key = event_log_key(event_log)
+            if key in stored or key in seen:
+                continue
+            seen.add(key)
+            yield event_log
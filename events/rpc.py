@@ -0,0 +1,143 @@
+import itertools
+
+import aiohttp
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3.datastructures import AttributeDict
+from web3.exceptions import Web3RPCError
+
+
+class JsonRpcError(Exception):
+    """Error devuelto por el nodo en el campo `error` de una respuesta JSON-RPC."""
+
+    def __init__(self, code, message, data=None):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class JsonRpcClient:
+    """
+    Cliente JSON-RPC mínimo sobre HTTP (aiohttp).
+
+    Se usa para las consultas históricas (eth_getLogs, eth_blockNumber) en lugar de
+    la conexión WebSocket de las suscripciones. Al hablar JSON-RPC plano funciona
+    igual contra un nodo real que contra un nodo local de prueba.
+    """
+
+    def __init__(self, url: str, timeout: float = 30):
+        self.url = url
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._ids = itertools.count(1)
+        self._session = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+        self._session = None
+
+    def _payload(self, method: str, params: list) -> dict:
+        return {'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': params}
+
+    async def _post(self, body):
+        async with self._session.post(self.url, json=body) as response:
+            # Algunos nodos responden errores de tamaño con HTTP 4xx/5xx y cuerpo JSON-RPC
+            try:
+                return await response.json(content_type=None)
+            except ValueError:
+                response.raise_for_status()
+                raise
+
+    async def request(self, method: str, params: list | None = None):
+        """Ejecuta una llamada y devuelve su `result`, o lanza JsonRpcError."""
+        response = await self._post(self._payload(method, params or []))
+        if 'error' in response:
+            error = response['error']
+            raise JsonRpcError(error.get('code'), error.get('message'), error.get('data'))
+        return response['result']
+
+    async def batch(self, calls: list[tuple[str, list]]) -> list:
+        """
+        Envía varias llamadas en una sola petición HTTP (lote JSON-RPC). Devuelve, en el
+        orden de `calls`, el `result` de cada una o el JsonRpcError que respondió el nodo.
+        """
+        if not calls:
+            return []
+        payloads = [self._payload(method, params) for method, params in calls]
+        response = await self._post(payloads)
+        if isinstance(response, dict):
+            # El nodo rechazó el lote entero (p. ej. no admite lotes o es demasiado grande)
+            error = response.get('error') or {}
+            raise JsonRpcError(error.get('code'), error.get('message', 'Respuesta de lote inválida'), error.get('data'))
+
+        by_id = {item.get('id'): item for item in response}
+        results = []
+        for payload in payloads:
+            item = by_id.get(payload['id'])
+            if item is None:
+                results.append(JsonRpcError(None, f"Sin respuesta para {payload['method']} en el lote"))
+            elif 'error' in item:
+                error = item['error']
+                results.append(JsonRpcError(error.get('code'), error.get('message'), error.get('data')))
+            else:
+                results.append(item['result'])
+        return results
+
+    async def block_number(self) -> int:
+        return int(await self.request('eth_blockNumber'), 16)
+
+    async def get_logs(self, address, topics: list, from_block: int, to_block: int) -> list:
+        logs = await self.request('eth_getLogs', [{
+            'address': address,
+            'topics': topics,
+            'fromBlock': hex(from_block),
+            'toBlock': hex(to_block),
+        }])
+        return [normalize_log(raw_log) for raw_log in logs]
+
+
+class Web3LogsClient:
+    """
+    Adaptador que expone `get_logs` sobre una conexión AsyncWeb3 ya abierta, para que
+    el suscriptor rellene huecos con LogBackfiller usando su propio WebSocket.
+    """
+
+    def __init__(self, w3: AsyncWeb3):
+        self.w3 = w3
+
+    async def block_number(self) -> int:
+        return await self.w3.eth.block_number
+
+    async def get_logs(self, address, topics: list, from_block: int, to_block: int) -> list:
+        try:
+            return await self.w3.eth.get_logs({
+                'address': address,
+                'topics': topics,
+                'fromBlock': from_block,
+                'toBlock': to_block,
+            })
+        except Web3RPCError as e:
+            error = (e.rpc_response or {}).get('error') or {}
+            raise JsonRpcError(error.get('code'), error.get('message', str(e)), error.get('data'))
+
+
+def normalize_log(raw_log: dict) -> AttributeDict:
+    """
+    Convierte un log JSON-RPC crudo (cadenas hex) al formato que entrega web3 en las
+    suscripciones, para que ambos caminos compartan decodificación y almacenamiento.
+    """
+    return AttributeDict({
+        'address': raw_log['address'],
+        'topics': [HexBytes(topic) for topic in raw_log['topics']],
+        'data': HexBytes(raw_log['data']),
+        'blockNumber': int(raw_log['blockNumber'], 16),
+        'blockHash': HexBytes(raw_log['blockHash']),
+        'transactionHash': HexBytes(raw_log['transactionHash']),
+        'transactionIndex': int(raw_log['transactionIndex'], 16),
+        'logIndex': int(raw_log['logIndex'], 16),
+        'removed': raw_log.get('removed', False),
+    })
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+
+from events.models import GlobalEventLog
+
+
+class GlobalEventLogSerializer(serializers.ModelSerializer):
+    """Log de evento tal como lo devuelve la API (los montos uint256 viajan como texto)."""
+
+    class Meta:
+        model = GlobalEventLog
+        fields = [
+            'id', 'network', 'deployed_contract', 'event_name', 'event_data',
+            'transaction_hash', 'log_index', 'block_number', 'block_timestamp', 'timestamp',
+            'tx_from', 'gas_used', 'arg_amount', 'arg_address',
+        ]
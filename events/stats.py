@@ -0,0 +1,161 @@
+from datetime import timezone as dt_timezone
+from itertools import chain
+
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import ContractEventStats, DailyEventRollup, GlobalEventLog, HourlyEventRollup
+
+# Acumulados por intervalo: período -> modelo
+ROLLUP_MODELS = {
+    'hour': HourlyEventRollup,
+    'day': DailyEventRollup,
+}
+
+
+def summable_args(event_data: dict) -> dict[str, int]:
+    """Argumentos enteros de un evento (los bool no cuentan, aunque en Python sean int)."""
+    return {
+        name: value for name, value in (event_data or {}).get('args', {}).items()
+        if isinstance(value, int) and not isinstance(value, bool)
+    }
+
+
+def add_to_delta(deltas: dict, key: tuple, event_log: GlobalEventLog, sign: int) -> None:
+    delta = deltas.setdefault(key, [0, {}])
+    delta[0] += sign
+    for name, value in summable_args(event_log.event_data).items():
+        delta[1][name] = delta[1].get(name, 0) + sign * value
+
+
+def apply_deltas(model, queryset, key_fields: tuple, deltas: dict) -> tuple[list, list]:
+    """
+    Suma `deltas` ({clave: [cantidad, {argumento: suma}]}) a las filas de `model`
+    identificadas por `key_fields`. `queryset` acota la lectura de las filas
+    existentes. Devuelve (filas a crear, filas a actualizar), sin guardarlas.
+    """
+    existing = {}
+    for row in queryset.select_for_update():
+        key = tuple(getattr(row, field) for field in key_fields)
+        if key in deltas:
+            existing[key] = row
+
+    to_create, to_update = [], []
+    for key, (count, sums) in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            row = model(**dict(zip(key_fields, key)), sums={})
+            to_create.append(row)
+        else:
+            to_update.append(row)
+        row.event_count = max(row.event_count + count, 0)
+        for name, value in sums.items():
+            row.sums[name] = str(row.sum_of(name) + value)
+    return to_create, to_update
+
+
+# --- Totales por contrato y evento ---
+
+def accumulate_stats(deltas: dict, event_logs, sign: int = 1) -> dict:
+    """
+    Suma (sign=1) o resta (sign=-1) los logs a `deltas`, un dict
+    (contrato, evento) -> [cantidad, {argumento: suma}]. Devuelve el mismo dict.
+    """
+    for event_log in event_logs:
+        add_to_delta(deltas, (event_log.deployed_contract_id, event_log.event_name), event_log, sign)
+    return deltas
+
+
+def apply_stats_deltas(deltas: dict) -> None:
+    """Aplica los deltas a ContractEventStats. Debe llamarse dentro de la transacción del lote."""
+    if not deltas:
+        return
+    contract_ids = {contract_id for contract_id, _ in deltas}
+    to_create, to_update = apply_deltas(
+        ContractEventStats,
+        ContractEventStats.objects.filter(deployed_contract_id__in=contract_ids),
+        ('deployed_contract_id', 'event_name'),
+        deltas,
+    )
+    now = timezone.now()
+    for row in to_update:
+        row.updated_at = now
+    ContractEventStats.objects.bulk_create(to_create)
+    ContractEventStats.objects.bulk_update(to_update, ['event_count', 'sums', 'updated_at'])
+
+
+# --- Acumulados por hora y por día ---
+
+def bucket_start(moment, period: str):
+    """Inicio (UTC) del intervalo `period` ('hour' o 'day') que contiene `moment`."""
+    moment = moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0) if period == 'day' else moment
+
+
+def event_time(event_log: GlobalEventLog):
+    """Fecha del bloque si el log está enriquecido; si no, la de registro."""
+    return event_log.block_timestamp or event_log.timestamp or timezone.now()
+
+
+def accumulate_rollups(deltas: dict, event_logs, sign: int = 1) -> dict:
+    """
+    Como `accumulate_stats`, pero por intervalo: `deltas` es
+    período -> {(contrato, evento, inicio del intervalo): [cantidad, {argumento: suma}]}.
+    """
+    for event_log in event_logs:
+        moment = event_time(event_log)
+        for period in ROLLUP_MODELS:
+            key = (event_log.deployed_contract_id, event_log.event_name, bucket_start(moment, period))
+            add_to_delta(deltas.setdefault(period, {}), key, event_log, sign)
+    return deltas
+
+
+def apply_rollup_deltas(deltas: dict) -> None:
+    """Aplica los deltas a los acumulados horarios y diarios. Debe llamarse dentro de la transacción del lote."""
+    for period, period_deltas in deltas.items():
+        if not period_deltas:
+            continue
+        model = ROLLUP_MODELS[period]
+        to_create, to_update = apply_deltas(
+            model,
+            model.objects.filter(
+                deployed_contract_id__in={key[0] for key in period_deltas},
+                bucket__in={key[2] for key in period_deltas},
+            ),
+            ('deployed_contract_id', 'event_name', 'bucket'),
+            period_deltas,
+        )
+        model.objects.bulk_create(to_create)
+        model.objects.bulk_update(to_update, ['event_count', 'sums'])
+
+
+# --- Recálculo completo ---
+
+def rebuild_stats(deployed_contract_ids=None, archived=()) -> int:
+    """
+    Recalcula desde GlobalEventLog las estadísticas y los acumulados por intervalo de
+    los contratos indicados (o de todos). `archived` agrega los logs que ya no están
+    en la BD (ver events.retention.archived_event_logs). Devuelve la cantidad de
+    logs recorridos.
+    """
+    logs = GlobalEventLog.objects.only(
+        'deployed_contract_id', 'event_name', 'event_data', 'block_timestamp', 'timestamp',
+    ).order_by()
+    tables = [ContractEventStats.objects.all()] + [model.objects.all() for model in ROLLUP_MODELS.values()]
+    if deployed_contract_ids is not None:
+        logs = logs.filter(deployed_contract_id__in=deployed_contract_ids)
+        tables = [queryset.filter(deployed_contract_id__in=deployed_contract_ids) for queryset in tables]
+
+    stats_deltas, rollup_deltas = {}, {}
+    total = 0
+    for event_log in chain(logs.iterator(chunk_size=2000), archived):
+        accumulate_stats(stats_deltas, [event_log])
+        accumulate_rollups(rollup_deltas, [event_log])
+        total += 1
+
+    with transaction.atomic():
+        for queryset in tables:
+            queryset.delete()
+        apply_stats_deltas(stats_deltas)
+        apply_rollup_deltas(rollup_deltas)
+    return total
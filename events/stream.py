@@ -0,0 +1,238 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+from contractRegistry.models import DeployedContract
+
+from events.models import GlobalEventLog
+
+# Dirección local donde cada proceso suscriptor publica los logs confirmados
+STREAM_HOST = getattr(settings, 'EVENT_STREAM_HOST', '127.0.0.1')
+STREAM_PORT = getattr(settings, 'EVENT_STREAM_PORT', 9110)
+# Cada cuánto se envía un comentario SSE para mantener viva la conexión (proxies, balanceadores)
+KEEPALIVE_SECONDS = getattr(settings, 'EVENT_STREAM_KEEPALIVE', 15)
+# Publicadores a los que se conecta el hub de cada proceso web ("host:puerto");
+# con `run_suscriber --workers N` son los puertos STREAM_PORT .. STREAM_PORT + N - 1
+STREAM_PUBLISHERS = getattr(settings, 'EVENT_STREAM_PUBLISHERS', [f"{STREAM_HOST}:{STREAM_PORT}"])
+
+
+def serialize_event_log(event_log: GlobalEventLog, kind: str = 'event') -> dict:
+    """Mensaje que viaja del suscriptor a los navegadores para un log guardado o retirado."""
+    return {
+        'type': kind,
+        'network': event_log.network_id,
+        'deployed_contract': event_log.deployed_contract_id,
+        'event_name': event_log.event_name,
+        'event_data': event_log.event_data,
+        'transaction_hash': event_log.transaction_hash,
+        'log_index': event_log.log_index,
+        'block_number': event_log.block_number,
+        'block_timestamp': event_log.block_timestamp.isoformat() if event_log.block_timestamp else None,
+    }
+
+
+# --- Lado del suscriptor ---
+
+class EventPublisher:
+    """
+    Servidor TCP local del proceso suscriptor que reenvía cada lote confirmado (una
+    línea JSON por log) a los hubs conectados, uno por proceso web.
+
+    Nunca frena al suscriptor: escribir en un socket no espera, y un hub que no
+    consume (más de `max_buffer` bytes pendientes) se desconecta; al reconectar
+    sólo pierde lo emitido mientras tanto, que sigue disponible en la BD.
+    """
+
+    def __init__(self, host: str = STREAM_HOST, port: int = STREAM_PORT, max_buffer: int = 4 * 2**20):
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.clients: set[asyncio.StreamWriter] = set()
+        self.handlers: set[asyncio.Task] = set()
+        self.server = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._accept, self.host, self.port)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients.add(writer)
+        self.handlers.add(asyncio.current_task())
+        try:
+            # Los hubs no envían nada: leer sólo sirve para detectar el cierre
+            await reader.read()
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+    def publish(self, event_logs: list[GlobalEventLog], retractions: list[GlobalEventLog] = ()) -> None:
+        if not self.clients:
+            return
+        lines = [serialize_event_log(event_log) for event_log in event_logs]
+        lines += [serialize_event_log(event_log, 'retraction') for event_log in retractions]
+        payload = ''.join(json.dumps(line, separators=(',', ':')) + '\n' for line in lines).encode()
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(payload)
+
+    async def close(self) -> None:
+        if self.server is None:
+            return
+        self.server.close()
+        for writer in list(self.clients):
+            writer.close()
+        # Al cerrar cada socket su lectura termina: se espera a que los handlers salgan
+        if self.handlers:
+            await asyncio.wait(self.handlers, timeout=5)
+        await self.server.wait_closed()
+
+
+# --- Lado web (ASGI) ---
+
+class EventStreamHub:
+    """
+    Reparto en proceso de los logs publicados por los suscriptores hacia las
+    conexiones SSE abiertas.
+
+    Cada proceso web mantiene una única conexión con cada publicador, abierta con
+    el primer navegador que se conecta. Cada mensaje se entrega a las colas de los
+    navegadores que miran ese DeployedContract: el costo por evento es un reparto
+    en memoria, no una consulta a la BD por navegador. Un navegador lento pierde
+    mensajes (cola llena) en lugar de retrasar a los demás.
+    """
+
+    def __init__(self, publishers: list[str] = STREAM_PUBLISHERS, queue_size: int = 100, retry_delay: float = 2.0):
+        self.publishers = publishers
+        self.queue_size = queue_size
+        self.retry_delay = retry_delay
+        self.listeners: dict[int, set[asyncio.Queue]] = {}
+        # publicador -> tarea que lo lee
+        self.tasks: dict[str, asyncio.Task] = {}
+
+    def subscribe(self, deployed_contract_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.listeners.setdefault(deployed_contract_id, set()).add(queue)
+        for address in self.publishers:
+            task = self.tasks.get(address)
+            if task is None or task.done():
+                # Las conexiones viven en el bucle de eventos del servidor ASGI
+                self.tasks[address] = asyncio.create_task(self._follow(address))
+        return queue
+
+    def unsubscribe(self, deployed_contract_id: int, queue: asyncio.Queue) -> None:
+        queues = self.listeners.get(deployed_contract_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.listeners[deployed_contract_id]
+
+    def dispatch(self, message: dict) -> None:
+        for queue in self.listeners.get(message.get('deployed_contract'), ()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                pass
+
+    async def _follow(self, address: str) -> None:
+        """Lee un publicador mientras haya navegadores conectados, reconectando si se cae."""
+        host, port = address.rsplit(':', 1)
+        while self.listeners:
+            try:
+                reader, writer = await asyncio.open_connection(host, int(port), limit=2**22)
+            except OSError:
+                await asyncio.sleep(self.retry_delay)
+                continue
+            try:
+                while self.listeners:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    try:
+                        self.dispatch(json.loads(line))
+                    except ValueError:
+                        continue
+            except OSError:
+                pass
+            finally:
+                writer.close()
+            await asyncio.sleep(self.retry_delay)
+
+
+hub = EventStreamHub()
+
+
+async def wait_for_disconnect(receive) -> None:
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def format_sse(message: dict) -> bytes:
+    return (
+        f"id: {message['block_number']}-{message['log_index']}\n"
+        f"event: {message['type']}\n"
+        f"data: {json.dumps(message)}\n\n"
+    ).encode()
+
+
+class EventStreamApplication:
+    """
+    Envoltorio ASGI que atiende la ruta `events:stream` (Server-Sent Events) antes de
+    Django y delega todo lo demás en la aplicación de Django.
+
+    Se atiende a este nivel porque aquí se recibe `http.disconnect`: al cerrarse la
+    pestaña, la cola del navegador sale del hub de inmediato en lugar de quedar
+    suscrita hasta el siguiente envío fallido.
+    """
+
+    def __init__(self, application, hub: EventStreamHub = hub):
+        self.application = application
+        self.hub = hub
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            try:
+                match = resolve(scope['path'][len(scope.get('root_path', '')):] or '/')
+            except Resolver404:
+                match = None
+            if match is not None and match.view_name == 'events:stream':
+                return await self.stream(match.kwargs['deployed_contract_id'], receive, send)
+        return await self.application(scope, receive, send)
+
+    async def stream(self, deployed_contract_id: int, receive, send) -> None:
+        exists = await sync_to_async(DeployedContract.objects.filter(pk=deployed_contract_id).exists)()
+        if not exists:
+            await send({'type': 'http.response.start', 'status': 404, 'headers': [(b'content-type', b'text/plain; charset=utf-8')]})
+            await send({'type': 'http.response.body', 'body': 'Contrato desplegado no encontrado.'.encode()})
+            return
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Nginx y similares no deben acumular la respuesta
+            (b'x-accel-buffering', b'no'),
+        ]})
+        queue = self.hub.subscribe(deployed_contract_id)
+        disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+        try:
+            await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, disconnected}, timeout=KEEPALIVE_SECONDS, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                if disconnected in done:
+                    break
+                body = format_sse(getter.result()) if getter in done else b': ping\n\n'
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+        finally:
+            self.hub.unsubscribe(deployed_contract_id, queue)
+            disconnected.cancel()
@@ -1,3 +1,587 @@
+import asyncio
+import copy
+import gzip
+import json
+import random
+import tempfile
+from io import StringIO
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError
+from django.db.models import Q
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from web3 import Web3
+
+from contractRegistry.models import BaseContract, ContractVersion, DeployedContract, Network
+from system_address_manager.models import AuthorizedAddress
+
+from events.backfill import LogBackfiller
+from events.decoders import EventDecoder, decoder_registry, offline_w3
+from events.dispatch import DispatchTable
+from events.export import export_rows
+from events.fakenode import SYNTHETIC_ABI, synthetic_log
+from events.leases import LeaseManager
+from events.management.commands.run_suscriber import Command as SubscriberCommand, NodeState
+from events.models import (
+    BlockCursor, ConnectionState, ContractEventStats, DailyEventRollup, EventSubscription, GlobalEventLog,
+    HourlyEventRollup, NetworkLease, SubscriberWorker,
+)
+from events.pipeline import CursorCheckpoint, EventLogWriter, LogRetraction, RecentKeys
+from events.reconnect import ReconnectPolicy
+from events.rpc import JsonRpcError, normalize_log
+from events.retention import archive_event_logs, archived_event_logs, restore_event_logs
+from events.stats import rebuild_stats
+
+
+CONTRACT_ADDRESS = '0x' + 'a' * 40
+DEPOSIT_ABI = {
+    'type': 'event', 'name': 'Deposit', 'anonymous': False,
+    'inputs': [
+        {'name': 'user', 'type': 'address', 'indexed': True},
+        {'name': 'amount', 'type': 'uint256', 'indexed': False},
+    ],
+}
+
+
+class FakeLogsClient:
+    """
+    `get_logs` sobre logs crudos en memoria. Las consultas que empiezan antes de
+    `fail_below` fallan tras `delay` segundos (un nodo caído a mitad de recuperación).
+    """
+
+    def __init__(self, raw_logs: list[dict], fail_below: int = None, delay: float = 0.05):
+        self.raw_logs = raw_logs
+        self.fail_below = fail_below
+        self.delay = delay
+
+    async def get_logs(self, address, topics: list, from_block: int, to_block: int) -> list:
+        if self.fail_below is not None and from_block < self.fail_below:
+            await asyncio.sleep(self.delay)
+            raise JsonRpcError(-32000, 'nodo no disponible')
+        return [
+            normalize_log(raw_log) for raw_log in self.raw_logs
+            if from_block <= int(raw_log['blockNumber'], 16) <= to_block
+        ]
+
+
+class EventLogWriterTestCase(TestCase):
+    """Contrato desplegado mínimo (con un evento Deposit) sobre el que el escritor guarda logs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        base_contract = BaseContract.objects.create(name='TicketManager')
+        cls.version = ContractVersion.objects.create(base_contract=base_contract, version='1', bytecode='0x', abi=[DEPOSIT_ABI])
+        cls.network = Network.objects.create(name='local', rpc_url='http://127.0.0.1:8545', chain_id=31337)
+        cls.deployed_contract = DeployedContract.objects.create(
+            contract_version=cls.version, network=cls.network, base_contract=base_contract, address=CONTRACT_ADDRESS,
+            deployerAddress=AuthorizedAddress.objects.create(address='0x' + '1' * 40),
+        )
+        cls.subscription = EventSubscription.objects.create(deployed_contract=cls.deployed_contract, event_name='Deposit')
+
+    def setUp(self):
+        # Los ids se reutilizan entre pruebas: no debe quedar un decodificador de otra versión
+        decoder_registry.clear()
+
+    def raw_logs(self, blocks) -> list[dict]:
+        """Logs JSON-RPC crudos de Deposit, uno por bloque."""
+        rng = random.Random(1)
+        return [
+            {
+                **synthetic_log(CONTRACT_ADDRESS, DEPOSIT_ABI, rng),
+                'blockNumber': hex(block), 'blockHash': '0x' + f'{block:064x}',
+                'transactionHash': '0x' + f'{block:064x}', 'transactionIndex': '0x0', 'logIndex': '0x0',
+            }
+            for block in blocks
+        ]
+
+    async def cursor_block(self):
+        cursor = await BlockCursor.objects.filter(network=self.network).afirst()
+        return cursor.last_block if cursor else None
+
+    def build_logs(self, count: int, network: Network = None, args: dict = None) -> list[GlobalEventLog]:
+        return [
+            GlobalEventLog(
+                network=network or self.network, deployed_contract=self.deployed_contract, event_name='Deposit',
+                event_data={'args': args or {}}, transaction_hash=f'{index:064x}', log_index=0, block_number=index,
+            )
+            for index in range(count)
+        ]
+
+
+class EventLogWriterCloseTests(EventLogWriterTestCase):
+    """El cierre del escritor guarda todo lo encolado, incluido el lote a medio agrupar."""
+
+    async def test_close_writes_queued_and_partial_batch(self):
+        # Ventana larga: sin el cierre, el lote quedaría a medio agrupar en `run`
+        writer = EventLogWriter(batch_size=4, flush_interval=60)
+        writer_task = asyncio.create_task(writer.run())
+        for event_log in self.build_logs(10):
+            await writer.put(event_log)
+        await asyncio.sleep(0)
+
+        await writer.close(writer_task)
+
+        self.assertTrue(writer_task.done())
+        self.assertEqual(await GlobalEventLog.objects.acount(), 10)
+
+    async def test_close_after_writer_failure_drains_queue(self):
+        writer = EventLogWriter(flush_interval=60)
+        writer_task = asyncio.create_task(writer.run())
+        writer_task.cancel()
+        await asyncio.gather(writer_task, return_exceptions=True)
+        for event_log in self.build_logs(3):
+            await writer.put(event_log)
+
+        await writer.close(writer_task)
+
+        self.assertEqual(await GlobalEventLog.objects.acount(), 3)
+
+
+class CursorCheckpointTests(EventLogWriterTestCase):
+    """Sólo la marca que cierra el relleno de la retención vigente libera la red y avanza el cursor."""
+
+    async def test_stale_checkpoint_does_not_release_a_later_hold(self):
+        writer = EventLogWriter()
+        stale = writer.checkpoint(self.network.pk, 100)
+        # Un lote perdido retiene la red después de encolada la marca
+        generation = writer.hold(self.network.pk)
+
+        await writer.flush([stale])
+        self.assertIn(self.network.pk, writer.held_networks)
+        self.assertIsNone(await self.cursor_block())
+
+        await writer.flush([CursorCheckpoint(self.network.pk, 90, generation, release=True)])
+        self.assertNotIn(self.network.pk, writer.held_networks)
+        self.assertEqual(await self.cursor_block(), 90)
+
+    async def test_gap_fill_checkpoint_of_previous_hold_is_ignored(self):
+        writer = EventLogWriter()
+        first = writer.hold(self.network.pk)
+        writer.hold(self.network.pk)
+
+        await writer.flush([CursorCheckpoint(self.network.pk, 100, first, release=True)])
+        self.assertIn(self.network.pk, writer.held_networks)
+        self.assertIsNone(await self.cursor_block())
+
+
+class LostBatchRefillTests(EventLogWriterTestCase):
+    """Un lote perdido retiene la red sólo hasta que un relleno sobre la conexión activa la libera."""
+
+    async def test_lost_batch_is_refilled_without_reconnecting(self):
+        await BlockCursor.objects.acreate(network=self.network, last_block=0)
+        raw_logs = self.raw_logs(range(3))
+
+        class FakeEth:
+            @property
+            async def block_number(self):
+                return 20
+
+            async def get_logs(self, log_filter):
+                return [normalize_log(raw_log) for raw_log in raw_logs
+                        if log_filter['fromBlock'] <= int(raw_log['blockNumber'], 16) <= log_filter['toBlock']]
+
+        command = SubscriberCommand(stdout=StringIO())
+        command.writer = EventLogWriter(max_attempts=1, on_hold=command.refill_held_network)
+        node = NodeState(self.network, DispatchTable([self.subscription]), command.writer)
+        node.w3 = SimpleNamespace(eth=FakeEth())
+        command.nodes = {self.network.pk: node}
+
+        with mock.patch.object(command.writer, '_write_batch', side_effect=OperationalError('database is locked')):
+            await command.writer.flush([command.writer.checkpoint(self.network.pk, 2), *self.build_logs(3)])
+        self.assertIn(self.network.pk, command.writer.held_networks)
+        [refill] = node.backfill_tasks
+
+        await refill
+        await command.writer.drain()
+
+        self.assertNotIn(self.network.pk, command.writer.held_networks)
+        self.assertEqual(await GlobalEventLog.objects.acount(), 3)
+        self.assertEqual(await self.cursor_block(), 20)
+
+
+class RetentionRoundTripTests(EventLogWriterTestCase):
+    """Archivar y restaurar devuelve los mismos logs, con sus fechas y sus acumulados."""
+
+    def setUp(self):
+        super().setUp()
+        self.archive_dir = tempfile.mkdtemp()
+        GlobalEventLog.objects.bulk_create(self.build_logs(6))
+        # timestamp es auto_now_add: las fechas de registro antiguas se fijan después
+        self.registered_at = datetime(2025, 9, 12, 10, tzinfo=dt_timezone.utc)
+        for event_log in GlobalEventLog.objects.all():
+            GlobalEventLog.objects.filter(pk=event_log.pk).update(
+                timestamp=self.registered_at + timedelta(hours=event_log.block_number),
+            )
+
+    def snapshot(self):
+        logs = {
+            (event_log.transaction_hash, event_log.log_index): (event_log.block_number, event_log.timestamp)
+            for event_log in GlobalEventLog.objects.all()
+        }
+        rollups = list(HourlyEventRollup.objects.order_by('bucket').values_list('event_name', 'bucket', 'event_count'))
+        return logs, rollups
+
+    def test_restore_keeps_timestamps_and_rollup_buckets(self):
+        rebuild_stats()
+        before = self.snapshot()
+
+        archived = archive_event_logs(self.deployed_contract, Q(block_number__lte=10), self.archive_dir, batch_size=4)
+        self.assertEqual(archived, 6)
+        self.assertFalse(GlobalEventLog.objects.exists())
+        rebuild_stats(archived=archived_event_logs())
+        self.assertEqual(self.snapshot()[1], before[1])
+
+        restore_event_logs(self.deployed_contract, 0, 10)
+        rebuild_stats(archived=archived_event_logs())
+        self.assertEqual(self.snapshot(), before)
+
+    def test_every_archived_batch_is_recorded_in_a_range(self):
+        archive_event_logs(self.deployed_contract, Q(block_number__lte=10), self.archive_dir, batch_size=4)
+
+        archived_range = self.deployed_contract.archived_ranges.get()
+        self.assertEqual((archived_range.from_block, archived_range.to_block, archived_range.log_count), (0, 5, 6))
+
+    def test_interrupted_archive_keeps_deleted_logs_in_a_range(self):
+        def interrupt(total):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            archive_event_logs(self.deployed_contract, Q(block_number__lte=10), self.archive_dir, batch_size=4, on_batch=interrupt)
+
+        archived_range = self.deployed_contract.archived_ranges.get()
+        self.assertEqual((archived_range.from_block, archived_range.to_block, archived_range.log_count), (0, 3, 4))
+        self.assertEqual(restore_event_logs(self.deployed_contract, 0, 10), 4)
+        self.assertEqual(GlobalEventLog.objects.count(), 6)
+
+
+class BackfillCursorTests(EventLogWriterTestCase):
+    """La recuperación en paralelo mueve el cursor una sola vez, con todo el rango recorrido."""
+
+    async def backfill(self, client) -> None:
+        writer = EventLogWriter(flush_interval=0.01)
+        writer_task = asyncio.create_task(writer.run())
+        backfiller = LogBackfiller(client, writer, initial_range=10, concurrency=2)
+        try:
+            await backfiller.backfill_to_cursor(self.network.pk, [self.subscription], 0, 99)
+        finally:
+            await writer.close(writer_task)
+
+    async def test_cursor_advances_after_the_whole_range(self):
+        await self.backfill(FakeLogsClient(self.raw_logs(range(0, 100, 5))))
+
+        self.assertEqual(await GlobalEventLog.objects.acount(), 20)
+        self.assertEqual(await self.cursor_block(), 99)
+
+    async def test_failed_lower_segment_keeps_the_cursor(self):
+        with self.assertRaises(JsonRpcError):
+            await self.backfill(FakeLogsClient(self.raw_logs(range(0, 100, 5)), fail_below=50))
+
+        # El tramo superior sí se guardó, pero el cursor no puede saltar el inferior
+        self.assertTrue(await GlobalEventLog.objects.filter(block_number__gte=50).aexists())
+        self.assertIsNone(await self.cursor_block())
+
+
+class EventLogListViewTests(EventLogWriterTestCase):
+    """Filtros de la API de logs: los parámetros inválidos son un 400, nunca un 500."""
+
+    def test_amount_filters_reject_non_integer_amounts(self):
+        for value in ('NaN', 'Infinity', '-inf', '1.5', '1e80', 'diez'):
+            with self.subTest(value=value):
+                response = self.client.get(reverse('events:logs'), {'amount_min': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('amount_min', response.json())
+
+    def test_amount_filters_accept_integral_amounts(self):
+        logs = self.build_logs(3)
+        for amount, event_log in zip((10, 1000, 5000), logs):
+            event_log.arg_amount = amount
+        GlobalEventLog.objects.bulk_create(logs)
+
+        response = self.client.get(reverse('events:logs'), {'amount_min': '1E+3', 'amount_max': '5000.0'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(row['block_number'] for row in response.json()['results']), [1, 2])
+
+
+class HotReloadBackfillTests(EventLogWriterTestCase):
+    """Las recuperaciones de suscripciones editadas en caliente quedan ligadas al nodo."""
+
+    async def edit_subscription(self, eth) -> tuple[SubscriberCommand, NodeState]:
+        await BlockCursor.objects.acreate(network=self.network, last_block=10)
+        command = SubscriberCommand(stdout=StringIO())
+        node = NodeState(self.network, DispatchTable([self.subscription]), EventLogWriter())
+        node.w3 = SimpleNamespace(eth=eth)
+        edited = copy.copy(self.subscription)
+        edited.updated_at += timedelta(seconds=1)
+
+        await command.update_node(node, DispatchTable([edited]))
+        return command, node
+
+    async def test_failed_backfill_is_reported_and_released(self):
+        command, node = await self.edit_subscription(eth=SimpleNamespace())
+        [task] = node.backfill_tasks
+
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        self.assertEqual(node.backfill_tasks, set())
+        self.assertIn('Error al recuperar logs en local', command.stdout.getvalue())
+
+    async def test_stopping_the_node_cancels_its_backfills(self):
+        class StalledEth:
+            @property
+            def block_number(self):
+                return asyncio.Event().wait()
+
+        command, node = await self.edit_subscription(eth=StalledEth())
+        node.task = asyncio.create_task(asyncio.Event().wait())
+        [backfill_task] = node.backfill_tasks
+
+        node.cancel()
+        await asyncio.gather(*node.tasks(), return_exceptions=True)
+        await asyncio.sleep(0)
+
+        self.assertTrue(backfill_task.cancelled())
+        self.assertEqual(node.backfill_tasks, set())
+        self.assertNotIn('Error', command.stdout.getvalue())
+
+
+class DeduplicationTests(EventLogWriterTestCase):
+    """Un log retransmitido se guarda una sola vez, lo detecte la caché o la BD."""
+
+    async def test_retransmitted_log_is_queued_once(self):
+        writer = EventLogWriter()
+        [event_log] = self.build_logs(1)
+
+        await writer.put(event_log)
+        await writer.put(self.build_logs(1)[0])
+
+        self.assertEqual(writer.queue.qsize(), 1)
+
+    async def test_log_already_stored_is_written_once(self):
+        # Escritores con cachés independientes (p. ej. tras un reinicio): decide la BD
+        for _ in range(2):
+            await EventLogWriter(recent_keys=RecentKeys()).flush(self.build_logs(3, args={'amount': 7}))
+
+        self.assertEqual(await GlobalEventLog.objects.acount(), 3)
+        stats = await ContractEventStats.objects.aget(deployed_contract=self.deployed_contract, event_name='Deposit')
+        self.assertEqual((stats.event_count, stats.sum_of('amount')), (3, 21))
+
+    def test_unique_constraint_rejects_duplicate_rows(self):
+        GlobalEventLog.objects.bulk_create(self.build_logs(1))
+        with self.assertRaises(IntegrityError):
+            GlobalEventLog.objects.bulk_create(self.build_logs(1))
+
+
+class RetractionStatsTests(EventLogWriterTestCase):
+    """Retractar un log descuenta su cantidad y sus sumas de estadísticas y acumulados."""
+
+    async def test_retraction_decrements_stats_and_rollups(self):
+        writer = EventLogWriter()
+        logs = self.build_logs(2, args={'amount': 5})
+        await writer.flush(logs)
+
+        await writer.flush([LogRetraction(logs[0])])
+
+        stats = await ContractEventStats.objects.aget(deployed_contract=self.deployed_contract, event_name='Deposit')
+        self.assertEqual((stats.event_count, stats.sum_of('amount')), (1, 5))
+        for model in (HourlyEventRollup, DailyEventRollup):
+            rollups = [(rollup.event_count, rollup.sum_of('amount')) async for rollup in model.objects.all()]
+            self.assertEqual(rollups, [(1, 5)])
+
+    async def test_retraction_of_unknown_log_changes_nothing(self):
+        writer = EventLogWriter()
+        await writer.flush(self.build_logs(1, args={'amount': 5}))
+
+        [unknown] = self.build_logs(1, network=await Network.objects.acreate(name='otra', rpc_url='http://127.0.0.1:8546', chain_id=1))
+        await writer.flush([LogRetraction(unknown)])
+
+        stats = await ContractEventStats.objects.aget(deployed_contract=self.deployed_contract, event_name='Deposit')
+        self.assertEqual((stats.event_count, stats.sum_of('amount')), (1, 5))
+
+
+class DecoderParityTests(TestCase):
+    """El decodificador precompilado da el mismo resultado que `process_log` de web3."""
+
+    def test_decoded_logs_match_web3(self):
+        decoder = EventDecoder(SYNTHETIC_ABI)
+        contract = offline_w3.eth.contract(abi=SYNTHETIC_ABI)
+        rng = random.Random(7)
+        for index, event_abi in enumerate(SYNTHETIC_ABI * 5):
+            raw_log = {
+                **synthetic_log(CONTRACT_ADDRESS, event_abi, rng),
+                'blockNumber': hex(index), 'blockHash': '0x' + 'b' * 64, 'transactionHash': '0x' + f'{index:064x}',
+                'transactionIndex': '0x0', 'logIndex': hex(index), 'removed': False,
+            }
+            log_receipt = normalize_log(raw_log)
+            with self.subTest(event=event_abi['name'], index=index):
+                expected = contract.events[event_abi['name']]().process_log(log_receipt)
+                decoded = decoder.decode_log(log_receipt)
+                self.assertEqual(decoded['args'], dict(expected['args']))
+                for key in ('event', 'logIndex', 'transactionIndex', 'transactionHash', 'address', 'blockHash', 'blockNumber'):
+                    self.assertEqual(decoded[key], expected[key])
+
+    def test_unknown_topic_is_not_decoded(self):
+        raw_log = {**synthetic_log(CONTRACT_ADDRESS, DEPOSIT_ABI, random.Random(1)), 'blockNumber': '0x1',
+                   'blockHash': '0x' + 'b' * 64, 'transactionHash': '0x' + 'c' * 64, 'transactionIndex': '0x0', 'logIndex': '0x0'}
+        self.assertIsNone(EventDecoder(SYNTHETIC_ABI[:1]).decode_log(normalize_log(raw_log)))
+
+
+class DispatchRoutingTests(EventLogWriterTestCase):
+    """La tabla de despacho enruta cada log por (dirección, topic0) a su suscripción."""
+
+    def log_receipt(self, address: str):
+        return normalize_log(self.raw_logs([1])[0] | {'address': address})
+
+    def test_routes_by_address_and_topic(self):
+        other_contract = DeployedContract.objects.create(
+            contract_version=self.version, network=self.network, base_contract=self.version.base_contract,
+            address='0x' + 'b' * 40, deployerAddress=self.deployed_contract.deployerAddress,
+        )
+        table = DispatchTable([self.subscription])
+
+        # Dirección en checksum: la tabla compara sin distinguir mayúsculas
+        subscription, spec = table.resolve(self.log_receipt(Web3.to_checksum_address(CONTRACT_ADDRESS)))
+        self.assertEqual((subscription.pk, spec.name), (self.subscription.pk, 'Deposit'))
+        # Mismo evento en un contrato sin suscripción: lo deja pasar el filtro, no la tabla
+        self.assertIsNone(table.resolve(self.log_receipt(other_contract.address)))
+        self.assertEqual(table.addresses, [Web3.to_checksum_address(CONTRACT_ADDRESS)])
+
+    def test_subscription_to_unknown_event_is_reported(self):
+        invalid = EventSubscription.objects.create(deployed_contract=self.deployed_contract, event_name='Withdraw')
+        reported = []
+
+        table = DispatchTable([self.subscription, invalid], on_invalid=lambda sub, error: reported.append(sub.pk))
+
+        self.assertEqual(len(table), 1)
+        self.assertEqual(reported, [invalid.pk])
+
+
+class KeysetPaginationTests(EventLogWriterTestCase):
+    """Recorrer la API por cursor devuelve cada log una vez, en orden, en ambos sentidos."""
+
+    def setUp(self):
+        super().setUp()
+        other_network = Network.objects.create(name='otra', rpc_url='http://127.0.0.1:8546', chain_id=1)
+        logs = self.build_logs(5) + self.build_logs(3, network=other_network)
+        # Mismo bloque e índice en dos redes: desempata el id
+        for extra in range(3):
+            log = self.build_logs(1)[0]
+            log.transaction_hash, log.block_number, log.log_index = f'{100 + extra:064x}', 2, extra + 1
+            logs.append(log)
+        GlobalEventLog.objects.bulk_create(logs)
+        self.ordered = list(GlobalEventLog.objects.order_by('block_number', 'log_index', 'id').values_list('id', flat=True))
+
+    def walk(self, **params) -> list[int]:
+        ids = []
+        url, query = reverse('events:logs'), {'limit': 3, **params}
+        while url:
+            page = self.client.get(url, query).json()
+            ids += [row['id'] for row in page['results']]
+            url, query = page['next'], None
+        return ids
+
+    def test_ascending_pages_have_no_duplicates_or_gaps(self):
+        self.assertEqual(self.walk(), self.ordered)
+
+    def test_descending_pages_have_no_duplicates_or_gaps(self):
+        self.assertEqual(self.walk(order='desc'), self.ordered[::-1])
+
+    def test_invalid_cursor_is_rejected(self):
+        self.assertEqual(self.client.get(reverse('events:logs'), {'cursor': 'no-es-un-cursor'}).status_code, 400)
+
+
+class ExportTests(EventLogWriterTestCase):
+    """La exportación recorre todos los logs por tramos, sin repetir ni saltar filas."""
+
+    def setUp(self):
+        super().setUp()
+        GlobalEventLog.objects.bulk_create(self.build_logs(7, args={'amount': 1}))
+
+    def test_rows_cross_chunk_boundaries_in_order(self):
+        rows = list(export_rows(chunk_size=2))
+
+        self.assertEqual([row[5] for row in rows], list(range(7)))
+
+    def test_gzip_csv_download(self):
+        response = self.client.get(reverse('events:export'), {'gzip': '1', 'from_block': 2})
+
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(len(lines), 1 + 5)
+
+    def test_ndjson_rows_keep_event_data(self):
+        response = self.client.get(reverse('events:export'), {'format': 'ndjson', 'to_block': 0})
+
+        [record] = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(record['event_data'], {'args': {'amount': 1}})
+
+
+class LeaseManagerTests(TestCase):
+    """Los workers se reparten las redes sin solaparse y heredan las de un worker que se va."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.network_ids = [
+            Network.objects.create(name=f'red-{index}', rpc_url=f'http://127.0.0.1:{8545 + index}', chain_id=index + 1).pk
+            for index in range(4)
+        ]
+
+    def test_networks_are_split_between_live_workers(self):
+        first, second = LeaseManager('worker-a'), LeaseManager('worker-b')
+        self.assertEqual(first.rebalance(self.network_ids), set(self.network_ids))
+
+        # El segundo worker no toma leases vigentes: espera a que el primero suelte su exceso
+        self.assertEqual(second.rebalance(self.network_ids), set())
+        owned_first = first.rebalance(self.network_ids)
+        owned_second = second.rebalance(self.network_ids)
+
+        self.assertEqual((len(owned_first), len(owned_second)), (2, 2))
+        self.assertEqual(owned_first | owned_second, set(self.network_ids))
+
+    def test_released_networks_go_to_the_remaining_worker(self):
+        first, second = LeaseManager('worker-a'), LeaseManager('worker-b')
+        first.rebalance(self.network_ids)
+        second.rebalance(self.network_ids)
+
+        first.release_all()
+
+        self.assertEqual(second.rebalance(self.network_ids), set(self.network_ids))
+
+    def test_crashed_worker_networks_are_taken_over(self):
+        LeaseManager('worker-a').rebalance(self.network_ids)
+        # El worker muere: deja de latir y sus leases vencen sin que los libere
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        SubscriberWorker.objects.filter(name='worker-a').update(heartbeat_at=an_hour_ago)
+        NetworkLease.objects.filter(owner='worker-a').update(expires_at=an_hour_ago)
+
+        self.assertEqual(LeaseManager('worker-b').rebalance(self.network_ids), set(self.network_ids))
+
+
+class ReconnectPolicyTests(TestCase):
+    """Backoff exponencial acotado, circuito abierto tras muchos fallos y reinicio tras una conexión estable."""
+
+    def setUp(self):
+        # Jitter en su máximo: la espera es el techo de cada intento
+        patcher = mock.patch('events.reconnect.random.uniform', side_effect=lambda low, high: high)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.policy = ReconnectPolicy(base_delay=1, max_delay=8, failure_threshold=6, open_seconds=100, stable_seconds=30)
+
+    def test_backoff_doubles_up_to_the_ceiling_then_opens_the_circuit(self):
+        results = [self.policy.record_failure() for _ in range(6)]
+
+        self.assertEqual(results[:5], [(ConnectionState.BACKING_OFF, delay) for delay in (1, 2, 4, 8, 8)])
+        self.assertEqual(results[5][0], ConnectionState.OPEN_CIRCUIT)
+        self.assertAlmostEqual(results[5][1], 110)
+
+    def test_stable_connection_resets_the_failure_count(self):
+        for _ in range(4):
+            self.policy.record_failure()
 
-# Create your tests here.
+        self.assertEqual(self.policy.record_failure(uptime=60), (ConnectionState.BACKING_OFF, 1))
+        self.assertEqual(self.policy.failures, 1)
@@ -1,3 +1,12 @@
+from django.urls import path
+from . import views
+
+app_name = 'events'
+
 urlpatterns = [
-    
+    path('stream/<int:deployed_contract_id>/', views.event_stream, name='stream'),
+    path('logs/', views.EventLogListView.as_view(), name='logs'),
+    path('participants/<str:address>/', views.ParticipantEventLogListView.as_view(), name='participant_logs'),
+    path('export/', views.event_export, name='export'),
+    path('rollups/<int:deployed_contract_id>/', views.event_rollups, name='rollups'),
 ]
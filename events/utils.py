@@ -0,0 +1,44 @@
+from django.db.models import Count, Max, Q
+
+from contractRegistry.models import DeployedContract, Network
+from events.models import EventSubscription
+
+
+def get_active_subscriptions():
+    """
+    Devuelve las suscripciones activas y válidas con todos sus datos relacionados.
+
+    Select related profundo para obtener todos los datos necesarios en pocas consultas:
+    DeployedContract -> Network y DeployedContract -> ContractVersion -> BaseContract.
+    """
+    return EventSubscription.objects.filter(is_active=True).select_related(
+        'deployed_contract',
+        'deployed_contract__network',
+        'deployed_contract__contract_version',
+        'deployed_contract__contract_version__base_contract',
+    ).exclude(
+        deployed_contract__address__isnull=True  # Excluir si la dirección final no está confirmada
+    )
+
+
+def get_subscriptions_fingerprint() -> tuple:
+    """
+    Huella barata del estado que determina qué escucha el suscriptor: cambia cuando se
+    crea, activa/desactiva o edita una suscripción, cuando se confirma un despliegue o
+    cuando cambia la URL WebSocket o las confirmaciones de una red. Sirve para decidir
+    si hay que recargar.
+    """
+    subscriptions = EventSubscription.objects.aggregate(
+        total=Count('id'),
+        active=Count('id', filter=Q(is_active=True)),
+        last_update=Max('updated_at'),
+    )
+    contracts = DeployedContract.objects.aggregate(last_update=Max('updated_at'))
+    networks = tuple(Network.objects.order_by('pk').values_list('pk', 'wss_url', 'confirmation_depth'))
+    return (
+        subscriptions['total'],
+        subscriptions['active'],
+        subscriptions['last_update'],
+        contracts['last_update'],
+        networks,
+    )
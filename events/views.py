@@ -1,3 +1,255 @@
-from django.shortcuts import render
+import re
+from datetime import timedelta, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
 
-# Create your views here.
+from django.conf import settings
+from django.db.models import CharField, F, Func
+from django.db.models.lookups import Exact
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
+
+from contractRegistry.models import DeployedContract
+
+from events.export import CONTENT_TYPES, export_blocks, export_lines, export_rows
+from events.models import EventParticipant, GlobalEventLog
+from events.pagination import EventLogKeysetPagination
+from events.pipeline import PROMOTED_ARGS
+from events.serializers import GlobalEventLogSerializer
+from events.stats import ROLLUP_MODELS, bucket_start
+
+# Máximo de intervalos que devuelve una serie (acota el costo de cada gráfico)
+ROLLUP_MAX_POINTS = getattr(settings, 'EVENT_ROLLUP_MAX_POINTS', 500)
+# Rango por defecto de una serie según el período
+ROLLUP_DEFAULT_RANGE = {
+    'hour': timedelta(hours=48),
+    'day': timedelta(days=90),
+}
+ROLLUP_PERIOD_LENGTH = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+
+def event_stream(request, deployed_contract_id):
+    """
+    Stream SSE de los logs nuevos de un DeployedContract. Bajo ASGI esta ruta la
+    atiende EventStreamApplication (kimi_backend/asgi.py) antes de llegar a Django;
+    aquí sólo se llega sirviendo por WSGI, donde una respuesta infinita ocuparía
+    un hilo del servidor por navegador.
+    """
+    return HttpResponse("El stream de eventos requiere servir la aplicación por ASGI.", status=501)
+
+
+def parse_moment(value: str):
+    """Fecha ISO 8601 del query string; sin zona horaria se toma como UTC."""
+    moment = parse_datetime(value.replace(' ', '+'))
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+@require_GET
+def event_rollups(request, deployed_contract_id):
+    """
+    Serie de un evento de un DeployedContract para gráficos, leída de los
+    acumulados por hora o por día (nunca de GlobalEventLog).
+
+    Parámetros: `event` (obligatorio), `period` (`hour` o `day`, por defecto `hour`)
+    y `from` / `to` en ISO 8601 (por defecto, las últimas 48 horas o 90 días).
+    Sólo se devuelven los intervalos con eventos; el rango no puede abarcar más de
+    ROLLUP_MAX_POINTS intervalos.
+    """
+    if not DeployedContract.objects.filter(pk=deployed_contract_id).exists():
+        return JsonResponse({'error': 'Contrato desplegado no encontrado.'}, status=404)
+
+    event_name = request.GET.get('event')
+    if not event_name:
+        return JsonResponse({'error': "Falta el parámetro 'event'."}, status=400)
+    period = request.GET.get('period', 'hour')
+    if period not in ROLLUP_MODELS:
+        return JsonResponse({'error': f"Período inválido: usar {' o '.join(ROLLUP_MODELS)}."}, status=400)
+
+    try:
+        end = parse_moment(request.GET['to']) if 'to' in request.GET else timezone.now()
+        start = parse_moment(request.GET['from']) if 'from' in request.GET else end - ROLLUP_DEFAULT_RANGE[period]
+    except ValueError:
+        start = end = None
+    if start is None or end is None or start > end:
+        return JsonResponse({'error': "Rango inválido: 'from' y 'to' deben ser fechas ISO 8601 con from <= to."}, status=400)
+
+    start = bucket_start(start, period)
+    if (end - start) / ROLLUP_PERIOD_LENGTH[period] >= ROLLUP_MAX_POINTS:
+        return JsonResponse({'error': f"El rango abarca más de {ROLLUP_MAX_POINTS} intervalos; usar un período mayor o acotarlo."}, status=400)
+
+    rows = ROLLUP_MODELS[period].objects.filter(
+        deployed_contract_id=deployed_contract_id, event_name=event_name, bucket__gte=start, bucket__lte=end,
+    ).values_list('bucket', 'event_count', 'sums')
+    return JsonResponse({
+        'deployed_contract': deployed_contract_id,
+        'event': event_name,
+        'period': period,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        # Las sumas viajan como texto: pueden superar el rango de los enteros de JavaScript
+        'series': [{'bucket': bucket.isoformat(), 'count': count, 'sums': sums} for bucket, count, sums in rows],
+    })
+
+
+@require_GET
+def event_export(request):
+    """
+    Exportación completa de logs en CSV o NDJSON, generada mientras se envía (la
+    memoria no depende de la cantidad de filas).
+
+    Parámetros: `contract`, `event`, `from_block`, `to_block`, `format` (`csv` o
+    `ndjson`, por defecto `csv`) y `gzip=1` para descargar el archivo comprimido.
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in CONTENT_TYPES:
+        return JsonResponse({'error': f"Formato inválido: usar {' o '.join(CONTENT_TYPES)}."}, status=400)
+    filters = {}
+    for param in ('contract', 'from_block', 'to_block'):
+        if param in request.GET:
+            try:
+                filters[param] = int(request.GET[param])
+            except ValueError:
+                return JsonResponse({'error': f"'{param}' debe ser un entero."}, status=400)
+    compress = request.GET.get('gzip') == '1'
+
+    rows = export_rows(
+        deployed_contract_id=filters.get('contract'), event_name=request.GET.get('event'),
+        from_block=filters.get('from_block'), to_block=filters.get('to_block'),
+    )
+    response = StreamingHttpResponse(
+        export_blocks(export_lines(rows, fmt), compress),
+        content_type='application/gzip' if compress else CONTENT_TYPES[fmt],
+    )
+    name = '-'.join(['eventos', str(filters.get('contract', 'todos')), request.GET.get('event', 'todos')])
+    response['Content-Disposition'] = f'attachment; filename="{name}.{fmt}{".gz" if compress else ""}"'
+    return response
+
+
+# --- API de logs ---
+
+# Nombre de argumento válido en los filtros `arg.<nombre>` (sin "__", que Django
+# interpretaría como otra búsqueda)
+ARG_NAME = re.compile(r'^(?!.*__)[A-Za-z_][A-Za-z0-9_]*$')
+ADDRESS = re.compile(r'^0x[0-9a-f]{40}$')
+INTEGER = re.compile(r'^-?[0-9]+$')
+
+
+class EventArgText(Func):
+    """
+    Texto JSON de `event_data['args'][nombre]` tal como está guardado. Los enteros se
+    comparan así porque la extracción JSON de SQLite (y la columna NUMERIC de
+    arg_amount) los convierte a REAL a partir de 2**64, y por encima de 2**53 un
+    uint256 coincidiría con todos sus vecinos. En SQLite requiere el operador `->`
+    (3.38 o posterior).
+    """
+    output_field = CharField()
+
+    def __init__(self, name: str):
+        super().__init__(F('event_data'))
+        self.arg_name = name
+
+    def as_sql(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"({sql} -> 'args' ->> %s)", [*params, self.arg_name]
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.source_expressions[0])
+        return f"({sql} -> %s)", [*params, f'$.args.{self.arg_name}']
+
+
+class EventLogListView(ListAPIView):
+    """
+    Logs de eventos paginados por cursor (ver EventLogKeysetPagination).
+
+    Filtros (query string): `contract`, `network`, `event`, `from_block`, `to_block`,
+    `address` y `amount_min` / `amount_max` (sobre los argumentos promovidos, con
+    índice) y `arg.<nombre>=<valor>` (cualquier argumento dentro de event_data).
+
+    En `arg.<nombre>` los valores numéricos se comparan como enteros, de forma exacta
+    aun para uint256 (ver EventArgText). Si `event` indica un evento cuyo monto
+    promovido (PROMOTED_ARGS) es ese argumento, además se filtra por `arg_amount`
+    para usar su índice.
+    """
+    serializer_class = GlobalEventLogSerializer
+    pagination_class = EventLogKeysetPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = GlobalEventLog.objects.all()
+
+        for param, lookup in (('contract', 'deployed_contract_id'), ('network', 'network_id'),
+                              ('from_block', 'block_number__gte'), ('to_block', 'block_number__lte')):
+            if param in params:
+                queryset = queryset.filter(**{lookup: self.int_param(param)})
+        if 'event' in params:
+            queryset = queryset.filter(event_name=params['event'])
+        if 'address' in params:
+            address = params['address'].lower()
+            if not ADDRESS.match(address):
+                raise ValidationError({'address': "Dirección inválida: se espera 0x seguido de 40 dígitos hexadecimales."})
+            queryset = queryset.filter(arg_address=address)
+        for param, lookup in (('amount_min', 'arg_amount__gte'), ('amount_max', 'arg_amount__lte')):
+            if param in params:
+                queryset = queryset.filter(**{lookup: self.amount_param(param)})
+
+        for param, value in params.items():
+            if not param.startswith('arg.'):
+                continue
+            name = param[len('arg.'):]
+            if not ARG_NAME.match(name):
+                raise ValidationError({param: "Nombre de argumento inválido."})
+            if not INTEGER.match(value):
+                queryset = queryset.filter(**{f'event_data__args__{name}': value})
+                continue
+            number = int(value)
+            if PROMOTED_ARGS.get(params.get('event'), {}).get('amount') == name:
+                queryset = queryset.filter(arg_amount=Decimal(number))
+            queryset = queryset.filter(Exact(EventArgText(name), str(number)))
+        return queryset
+
+    def int_param(self, name: str) -> int:
+        try:
+            return int(self.request.query_params[name])
+        except ValueError:
+            raise ValidationError({name: "Debe ser un entero."})
+
+    def amount_param(self, name: str) -> Decimal:
+        """Monto entero y finito que cabe en `arg_amount` (NaN, Infinity o 1.5 no)."""
+        error = ValidationError({name: "Debe ser un monto entero."})
+        try:
+            amount = Decimal(self.request.query_params[name])
+        except InvalidOperation:
+            raise error
+        max_digits = GlobalEventLog._meta.get_field('arg_amount').max_digits
+        if not amount.is_finite() or amount != amount.to_integral_value() or amount.adjusted() >= max_digits:
+            raise error
+        return amount.quantize(Decimal(1))
+
+
+class ParticipantEventLogListView(ListAPIView):
+    """
+    Logs de todos los contratos en los que participa una dirección (cualquier
+    argumento de tipo address), resueltos con el índice EventParticipant. Admite
+    `event` y la misma paginación por cursor que EventLogListView.
+    """
+    serializer_class = GlobalEventLogSerializer
+    pagination_class = EventLogKeysetPagination
+
+    def get_queryset(self):
+        address = self.kwargs['address'].lower()
+        if not ADDRESS.match(address):
+            raise ValidationError({'address': "Dirección inválida: se espera 0x seguido de 40 dígitos hexadecimales."})
+        queryset = GlobalEventLog.objects.filter(
+            id__in=EventParticipant.objects.filter(address=address).values('event_log_id'),
+        )
+        if 'event' in self.request.query_params:
+            queryset = queryset.filter(event_name=self.request.query_params['event'])
+        return queryset
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kimi_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Tras cargar Django: la ruta del stream SSE de eventos se atiende antes que las vistas
+from events.stream import EventStreamApplication  # noqa: E402
+
+application = EventStreamApplication(django_application)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -81,12 +82,43 @@ WSGI_APPLICATION = 'kimi_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# El suscriptor y los procesos web escriben a la vez. Por defecto se usa SQLite en
+# modo WAL (ver events/database.py); con DB_ENGINE=postgresql, PostgreSQL con los
+# datos de conexión de las variables POSTGRES_*.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'kimi'),
+            'USER': os.environ.get('POSTGRES_USER', 'kimi'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Conexiones persistentes: cada hilo reutiliza la suya en lugar de abrir una por petición
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            # Con PgBouncer en modo transacción (el pool compartido entre procesos) los
+            # cursores del lado del servidor no sobreviven entre transacciones
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_PGBOUNCER') == '1',
+            'OPTIONS': {
+                'connect_timeout': 5,
+                'application_name': os.environ.get('DB_APPLICATION_NAME', 'kimi_backend'),
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Segundos que una escritura espera a la otra antes de "database is locked"
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -0,0 +1,28 @@
+/**
+ * loadContractArtifact
+ *
+ * Descarga un artefacto de contrato (ABI o bytecode) desde la URL con hash de
+ * contenido que la plantilla deja en un script tag JSON (`{"url": "..."}`, ruta
+ * `contractRegistry:artifact`). La respuesta es inmutable, así que el navegador
+ * la sirve desde su caché en las visitas siguientes sin volver al servidor.
+ *
+ * @param {string} id - ID del script tag con la URL del artefacto.
+ * @returns {Promise<any|null>} El artefacto ya parseado (o null si falta o falla la descarga).
+ */
+const loadContractArtifact = async (id) => {
+    const el = document.getElementById(id);
+    if (!el) {
+        return null;
+    }
+    try {
+        const { url } = JSON.parse(el.textContent.trim());
+        const response = await fetch(url, { credentials: 'same-origin' });
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        return await response.json();
+    } catch (e) {
+        console.error(`Error al cargar el artefacto del elemento ${id}:`, e);
+        return null;
+    }
+};
@@ -0,0 +1,70 @@
+/**
+ * EventStreamTable
+ *
+ * Mantiene al día la tabla de eventos recientes de un panel con el stream SSE
+ * del contrato (ruta `events:stream`): inserta arriba cada log nuevo y quita los
+ * que una reorganización retira, sin recargar la página ni volver a consultar
+ * la base de datos.
+ *
+ * @param {string} url - URL del stream SSE del DeployedContract.
+ * @param {HTMLElement} tbody - Cuerpo de la tabla de eventos recientes.
+ * @param {number} maxRows - Filas que se conservan en la tabla.
+ * @returns {EventSource|null} La conexión abierta (o null si el navegador no soporta SSE).
+ */
+const EventStreamTable = (url, tbody, maxRows = 10) => {
+    if (!tbody || typeof EventSource === 'undefined') {
+        return null;
+    }
+
+    const rowKey = (message) => `${message.transaction_hash}-${message.log_index}`;
+
+    const buildRow = (message) => {
+        const row = document.createElement('tr');
+        row.dataset.key = rowKey(message);
+
+        const nameCell = document.createElement('td');
+        nameCell.className = 'fw-bold text-light';
+        nameCell.style.width = '20%';
+        nameCell.textContent = message.event_name;
+
+        const dataCell = document.createElement('td');
+        dataCell.className = 'text-dim';
+        dataCell.style.width = '60%';
+        const pre = document.createElement('pre');
+        pre.className = 'mb-0 p-0 text-dim';
+        pre.style.cssText = 'background: none; border: none; font-size: 0.8rem; overflow-x: auto; white-space: pre-wrap;';
+        pre.textContent = JSON.stringify(message.event_data, null, 2);
+        dataCell.appendChild(pre);
+
+        const timeCell = document.createElement('td');
+        timeCell.className = 'text-dim small';
+        timeCell.style.width = '20%';
+        const when = message.block_timestamp ? new Date(message.block_timestamp) : new Date();
+        timeCell.textContent = when.toISOString().replace('T', ' ').slice(0, 19);
+
+        row.append(nameCell, dataCell, timeCell);
+        return row;
+    };
+
+    const source = new EventSource(url);
+
+    source.addEventListener('event', (e) => {
+        const message = JSON.parse(e.data);
+        if (tbody.querySelector(`tr[data-key="${rowKey(message)}"]`)) {
+            return;
+        }
+        // La fila de "sin eventos" desaparece con el primero
+        tbody.querySelectorAll('tr:not([data-key])').forEach((row) => row.remove());
+        tbody.prepend(buildRow(message));
+        while (tbody.rows.length > maxRows) {
+            tbody.deleteRow(tbody.rows.length - 1);
+        }
+    });
+
+    source.addEventListener('retraction', (e) => {
+        const message = JSON.parse(e.data);
+        tbody.querySelector(`tr[data-key="${rowKey(message)}"]`)?.remove();
+    });
+
+    return source;
+};
@@ -1,8 +1,8 @@
 from django.shortcuts import render
 from kimi_backend.blockchainClient import w3
 from contractRegistry.models import DeployedContract, BaseContract
-from django.db.models import Sum 
-from events.models import GlobalEventLog
+from contractRegistry.cache import current_deployment
+from events.models import ContractEventStats, GlobalEventLog
 
 
 # Create your views here.
@@ -14,35 +14,31 @@ def index(request):
 def ticketDashboard(request):
     # Ejemplo: Obtener el número de bloque actual desde el cliente web3
     
-    try:
-        current_contract = DeployedContract.objects.filter(base_contract__name='TicketManager', is_current = True).latest('updated_at')
-    except DeployedContract.DoesNotExist:
+    # Despliegue actual y ABI en memoria del proceso (sin consultas tras la primera carga)
+    deployment = current_deployment('TicketManager')
+    if deployment is None:
         context = {
             'error_message': 'No se encontró un contrato "TicketManager" activo y vigente. Por favor, despliega uno.'
         }
         return render(request, 'tickets/dashboard.html', context)
     
+    current_contract = deployment.contract
     
     recent_events = GlobalEventLog.objects.filter(
         deployed_contract=current_contract
     ).order_by('-timestamp')[:10]
     
-    contract_abi = current_contract.contract_version.abi
     
     
-    total_ingresos = GlobalEventLog.objects.filter(
-        deployed_contract=current_contract, 
+    # Totales mantenidos por el suscriptor al guardar cada lote (una fila, sin agregar logs)
+    purchase_stats = ContractEventStats.objects.filter(
+        deployed_contract=current_contract,
         event_name='PurchasedTicket' # Usamos el evento específico de compra
-    ).aggregate(
-        # Sumamos el campo 'value' dentro del JSONField 'event_data'
-        total_amount=Sum('event_data__value') 
-    )['total_amount'] or 0
+    ).first()
     
-    # Contar la cantidad de eventos de tickets comprados (cada evento es un ticket o una compra)
-    total_tickets_comprados = GlobalEventLog.objects.filter(
-        deployed_contract=current_contract,
-        event_name='PurchasedTicket'
-    ).count()
+    # Suma del argumento 'value' (uint256, exacto) y cantidad de compras registradas
+    total_ingresos = purchase_stats.sum_of('value') if purchase_stats else 0
+    total_tickets_comprados = purchase_stats.event_count if purchase_stats else 0
     
     stats = {
         'total_tickets_vendidos': total_tickets_comprados,
@@ -53,7 +49,7 @@ def ticketDashboard(request):
     context = {
         'contract': current_contract,
         'recent_events': recent_events,
-        'abi': contract_abi,
+        'abi_url': deployment.abi_url,
         'stats': stats,
     }
     return render(request, 'tickets/dashboard.html', context)
\ No newline at end of file